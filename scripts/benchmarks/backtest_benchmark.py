@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import tempfile
+from argparse import ArgumentParser
+from datetime import date
+from functools import partial
+from typing import Any, Optional
+
+from scripts.benchmarks.synthetic_data import generate_archive
+from src.data_access.repositories.result_repository import ResultRepository
+from src.data_access.storage.day_file_cache import DayFileCache
+from src.domain.entities.enums import TypePari
+from src.models.backtest import favorite_simple_gagnant, run_backtests, season_files
+
+
+def looped_sweep(base_path: str, years: list[int], thresholds: list[Optional[float]]) -> dict[Any, float]:
+    """
+    Former path: one pass over every race per strategy, settled with get_result_by_race
+    """
+    repository = ResultRepository(base_path, cache=DayFileCache())
+    profits = {}
+    for cote_max in thresholds:
+        profit = 0.0
+        for year in years:
+            for file_path in season_files(base_path, year):
+                day, month, year_str = os.path.basename(file_path)[:-len(".json")].split("_")
+                race_date = date(int(year_str), int(month), int(day))
+                for race_id, race in repository._load_races_file(file_path).items():
+                    result = repository.get_result_by_race(race_id, race_date)
+                    if result is None or not result.rapports_definitifs:
+                        continue
+                    odds = {int(num): float(o[max(o, key=int)]) for num, o in race.get("rapports", {}).items() if o}
+                    if not odds:
+                        continue
+                    favorite = min(odds, key=odds.get)
+                    if cote_max is not None and odds[favorite] > cote_max:
+                        continue
+                    dividends = result.rapports_definitifs.get(TypePari.E_SIMPLE_GAGNANT, {})
+                    profit += dividends.get(str(favorite), 0.0) - 1.0
+        profits[cote_max] = profit
+    return profits
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Strategy sweep: per-race loop vs vectorized backtest engine")
+    parser.add_argument("--data-folder", help="Existing archive instead of a generated one")
+    parser.add_argument("--years", type=int, nargs="+", default=[2021, 2022])
+    parser.add_argument("--days-per-year", type=int, default=30)
+    parser.add_argument("--races-per-day", type=int, default=32)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--strategies", type=int, default=10, help="Number of cote_max thresholds swept")
+    parser.add_argument("--workers", type=int, help="Processes of the engine (one season each)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    thresholds = [None] + [1.5 + i for i in range(args.strategies - 1)]
+    with tempfile.TemporaryDirectory() as work_dir:
+        base_path = args.data_folder
+        if base_path is None:
+            base_path = os.path.join(work_dir, "raw")
+            generate_archive(base_path, args.years, args.days_per_year, args.races_per_day, args.runners, 5)
+
+        start = time.perf_counter()
+        looped = looped_sweep(base_path, args.years, thresholds)
+        looped_seconds = time.perf_counter() - start
+
+        strategies = {cote_max: partial(favorite_simple_gagnant, cote_max=cote_max) for cote_max in thresholds}
+        start = time.perf_counter()
+        reports = run_backtests(strategies, args.years, base_path, args.workers, musique_stats=False)
+        engine_seconds = time.perf_counter() - start
+
+    mismatches = [t for t in thresholds if abs(reports[t].profit - looped[t]) > 1e-6]
+    results = {
+        "strategies": len(thresholds),
+        "looped_seconds": round(looped_seconds, 3),
+        "engine_seconds": round(engine_seconds, 3),
+        "speedup": round(looped_seconds / engine_seconds, 2),
+        "mismatches": mismatches,
+    }
+    print(
+        f"{len(thresholds)} strategies: loop {looped_seconds:.2f}s, engine {engine_seconds:.2f}s "
+        f"(x{results['speedup']}), {len(mismatches)} mismatching profits"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
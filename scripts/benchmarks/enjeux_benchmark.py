@@ -0,0 +1,109 @@
+import os
+import json
+import random
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import date
+from itertools import combinations
+from typing import Any
+
+from scripts.benchmarks.synthetic_data import generate_day
+from src.data_access.mappers.pool_mapper import map_json_to_pool_features
+from src.data_access.storage.enjeux_codec import pack_day
+
+
+def full_trio_pools(data: dict[str, Any], seed: int = 0) -> None:
+    """
+    Replace each synthetic E_TRIO pool by every trio of the race, like real PMU pools
+    """
+    rng = random.Random(seed)
+    for race in data.values():
+        numbers = sorted(map(int, race["horse_features"]))
+        timestamps = sorted({ts for by_time in race["enjeux"]["E_SIMPLE_GAGNANT"].values() for ts in by_time}, key=int)
+        race["enjeux"]["E_TRIO"] = {
+            "-".join(map(str, trio)): {ts: rng.randint(0, 20000) for ts in timestamps}
+            for trio in combinations(numbers, 3)
+        }
+
+
+def dict_runner_shares(data: dict[str, Any]) -> dict[str, dict[int, dict[str, float]]]:
+    """
+    Former path: per-runner pool shares at the last snapshot, straight from the nested dicts
+    """
+    features = {}
+    for race_id, race in data.items():
+        numbers = [int(num) for num in race["horse_features"]]
+        race_features: dict[int, dict[str, float]] = {num: {} for num in numbers}
+        for bet_kind, amounts in race.get("enjeux", {}).items():
+            last = max((int(ts) for by_time in amounts.values() for ts in by_time), default=None)
+            by_runner = dict.fromkeys(numbers, 0.0)
+            total = 0.0
+            for combination, by_time in amounts.items():
+                amount = by_time.get(str(last), 0)
+                total += amount
+                for num in map(int, combination.split("-")):
+                    if num in by_runner:
+                        by_runner[num] += amount
+            for num in numbers:
+                race_features[num][f"part_enjeux_{bet_kind.lower()}"] = by_runner[num] / total if total else 0.0
+        features[race_id] = race_features
+    return features
+
+
+def measure(function: Any, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Day file size and pool feature time, nested vs packed enjeux")
+    parser.add_argument("--races-per-day", type=int, default=32)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--snapshots", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    nested = generate_day(date(2024, 6, 1), args.races_per_day, args.runners, args.snapshots)
+    full_trio_pools(nested)
+    packed = json.loads(json.dumps(nested))
+    pack_day(packed)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, data in (("nested", nested), ("packed", packed)):
+            file_path = os.path.join(work_dir, f"{name}.json")
+            with open(file_path, "w", encoding="utf-8") as f:
+                # As written by the scraper, and by compact_day(pack=True)
+                json.dump(data, f, indent=2 if name == "nested" else None)
+
+            def load(file_path: str = file_path) -> Any:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            results[name] = {"bytes": os.path.getsize(file_path), "load_seconds": round(measure(load), 4)}
+
+    results["nested"]["features_seconds"] = round(measure(lambda: dict_runner_shares(nested)), 4)
+    results["packed"]["features_seconds"] = round(measure(
+        lambda: {race_id: map_json_to_pool_features(race) for race_id, race in packed.items()}
+    ), 4)
+
+    # Same features on both paths
+    expected = dict_runner_shares(nested)
+    for race_id, race in packed.items():
+        for num, values in map_json_to_pool_features(race).items():
+            for column, value in values.items():
+                assert abs(value - expected[race_id][num][column]) < 1e-9, (race_id, num, column)
+
+    for name, result in results.items():
+        print(
+            f"{name:<7} {result['bytes'] / 2**20:>7.2f} MiB  load {result['load_seconds']:.3f}s  "
+            f"features {result['features_seconds']:.3f}s"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,121 @@
+import os
+import gc
+import json
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import contextmanager, nullcontext
+from dataclasses import fields, make_dataclass
+from typing import Any, Iterator
+
+from scripts.benchmarks.synthetic_data import generate_archive
+from src.data_access.mappers import horse_mapper, race_mapper, result_mapper
+from src.data_access.storage.columnar_store import list_day_files
+from src.data_access.storage.snapshot_log import load_day_file
+from src.domain.entities.horse import Horse, HorseFeatures
+from src.domain.entities.race import Hippodrome, Race, Weather
+from src.domain.entities.result import RaceResult
+
+
+def dict_backed(cls: type) -> type:
+    """
+    Same fields as the entity, as a plain @dataclass with a per-instance __dict__
+    """
+    return make_dataclass(cls.__name__, [(f.name, f.type, f) for f in fields(cls)])
+
+
+@contextmanager
+def former_entities() -> Iterator[None]:
+    """
+    Mappers building the former representation: dict-backed entities, no string interning
+    """
+    patches = [
+        (horse_mapper, "Horse", dict_backed(Horse)),
+        (horse_mapper, "HorseFeatures", dict_backed(HorseFeatures)),
+        (horse_mapper, "intern_str", lambda value: value),
+        (race_mapper, "Race", dict_backed(Race)),
+        (race_mapper, "Hippodrome", dict_backed(Hippodrome)),
+        (race_mapper, "Weather", dict_backed(Weather)),
+        (race_mapper, "intern_str", lambda value: value),
+        (result_mapper, "RaceResult", dict_backed(RaceResult)),
+        (result_mapper, "intern_str", lambda value: value),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+
+
+def retained_memory(file_paths: list[str]) -> dict[str, Any]:
+    """
+    Memory still allocated once every day file is mapped to entities and the JSON released
+    """
+    gc.collect()
+    tracemalloc.start()
+    races, horses, results = [], [], []
+    for file_path in file_paths:
+        date_str = os.path.splitext(os.path.basename(file_path))[0]
+        data = load_day_file(file_path)
+        for race_id, race_data in data.items():
+            races.append(race_mapper.map_json_to_race(race_id, race_data, date_str))
+            horses.extend(horse_mapper.map_json_to_horses(race_id, race_data))
+            result = result_mapper.map_json_to_result(race_id, race_data)
+            if result:
+                results.append(result)
+        del data
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "races": len(races),
+        "horses": len(horses),
+        "results": len(results),
+        "retained_bytes": current,
+        "peak_bytes": peak,
+        "bytes_per_horse": round(current / max(1, len(horses)), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Memory held by the domain entities, compared with dict-backed entities")
+    parser.add_argument("--data-folder", help="Existing archive instead of a generated one")
+    parser.add_argument("--years", type=int, nargs="+", default=[2022])
+    parser.add_argument("--days-per-year", type=int, default=30)
+    parser.add_argument("--races-per-day", type=int, default=32)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--snapshots", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        base_path = args.data_folder
+        if base_path is None:
+            base_path = os.path.join(work_dir, "raw")
+            generate_archive(
+                base_path, args.years, args.days_per_year, args.races_per_day, args.runners, args.snapshots
+            )
+        file_paths = [
+            os.path.join(base_path, str(year), file_name)
+            for year in args.years
+            for file_name in list_day_files(os.path.join(base_path, str(year)))
+        ]
+
+        # Dict-backed first: the slotted run interns strings for the rest of the process
+        results = {}
+        for name, context in (("dict-backed", former_entities()), ("slotted + interned", nullcontext())):
+            with context:
+                results[name] = retained_memory(file_paths)
+
+    reference = results["dict-backed"]["retained_bytes"]
+    for name, result in results.items():
+        print(
+            f"{name:<20} {result['horses']:>9} horses {result['retained_bytes'] / 2**20:>9.1f} MiB retained "
+            f"{result['bytes_per_horse']:>8.0f} B/horse ({result['retained_bytes'] / reference:.0%})"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,388 @@
+import os
+import json
+import time
+import random
+from argparse import ArgumentParser
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from asyncio import run
+from httpx import AsyncClient, Response
+
+from scripts.scraping.scraper import BASE_URL, COMBINATION_JOIN, scrap_day
+
+PROGRAMME_PATH = "/rest/client/61/programme"
+RACE_ENDPOINTS = ("participants", "combinaisons", "rapports-definitifs")
+
+DISCIPLINES = [("ATTELE", "TROT_ATTELE"), ("MONTE", "TROT_MONTE"), ("PLAT", "GALOP_PLAT"), ("OBSTACLE", "GALOP_OBSTACLE")]
+BET_TYPES = ["E_SIMPLE_GAGNANT", "E_SIMPLE_PLACE", "E_COUPLE_GAGNANT", "E_TRIO"]
+
+
+def parse_endpoint(path: str) -> Optional[tuple[str, Optional[str], str]]:
+    """
+    (DDMMYYYY, race key or None, endpoint) of a PMU API path, None if unknown
+    """
+    if not path.startswith(PROGRAMME_PATH + "/"):
+        return None
+    parts = path[len(PROGRAMME_PATH) + 1:].strip("/").split("/")
+    if len(parts) == 1:
+        return parts[0], None, "programme"
+    if len(parts) == 4 and parts[3] in RACE_ENDPOINTS:
+        return parts[0], parts[1] + parts[2], parts[3]
+    return None
+
+
+class SyntheticProgram:
+    """
+    Deterministic synthetic PMU responses: same date and race, same program.
+    Days before today are finished, odds get a new timestamp on every call
+    """
+
+    def __init__(self, meetings: int = 4, races_per_meeting: int = 8, runners: int = 14):
+        self.meetings = meetings
+        self.races_per_meeting = races_per_meeting
+        self.runners = runners
+
+    def _race_random(self, day: str, race_key: str) -> random.Random:
+        return random.Random(f"{day}-{race_key}")
+
+    def _is_finished(self, day: str) -> bool:
+        return datetime.strptime(day, "%d%m%Y").date() < date.today()
+
+    def _arrival(self, day: str, race_key: str) -> list[int]:
+        numbers = list(range(1, self.runners + 1))
+        self._race_random(day, race_key + "-arrival").shuffle(numbers)
+        return numbers
+
+    def programme(self, day: str) -> dict[str, Any]:
+        start = datetime.strptime(day, "%d%m%Y").replace(hour=13)
+        finished = self._is_finished(day)
+        meetings = []
+        for r in range(1, self.meetings + 1):
+            courses = []
+            for c in range(1, self.races_per_meeting + 1):
+                rng = self._race_random(day, f"R{r}C{c}")
+                discipline, specialite = rng.choice(DISCIPLINES)
+                course = {
+                    "numReunion": r,
+                    "numOrdre": c,
+                    "heureDepart": int((start + timedelta(minutes=30 * c + 7 * r)).timestamp() * 1000),
+                    "montantPrix": rng.choice([15000, 22000, 40000, 90000]),
+                    "distance": rng.choice([1600, 2100, 2700, 2850, 3600]),
+                    "discipline": discipline,
+                    "specialite": specialite,
+                    "nombreDeclaresPartants": self.runners,
+                    "conditionSexe": rng.choice(["MALES_ET_HONGRES", "FEMELLES", "MIXTE"]),
+                    "grandPrixNationalTrot": False,
+                    "montantOffert1er": 9000,
+                    "montantOffert2eme": 5000,
+                    "montantOffert3eme": 2500,
+                    "rapportsDefinitifsDisponibles": finished,
+                }
+                if finished:
+                    course["ordreArrivee"] = [[n] for n in self._arrival(day, f"R{r}C{c}")]
+                courses.append(course)
+            meetings.append({
+                "nature": "DIURNE",
+                "hippodrome": {"code": f"H{r:02d}", "libelleCourt": f"HIPPO {r}", "libelleLong": f"HIPPODROME {r}"},
+                "meteo": {
+                    "datePrevision": int(start.timestamp() * 1000),
+                    "nebulositeCode": "P1",
+                    "nebulositeLibelleCourt": "Peu nuageux",
+                    "nebulositeLibelleLong": "Peu nuageux",
+                    "temperature": 14,
+                    "forceVent": 10,
+                    "directionVent": "NO",
+                },
+                "courses": courses,
+            })
+        return {"programme": {"reunions": meetings}}
+
+    def participants(self, day: str, race_key: str) -> dict[str, Any]:
+        rng = self._race_random(day, race_key)
+        now = int(time.time() * 1000)
+        participants = []
+        horses = rng.sample(range(1, 3001), self.runners)
+        for n in range(1, self.runners + 1):
+            odds = round(rng.uniform(1.5, 60) * random.uniform(0.9, 1.1), 1)
+            participants.append({
+                "numPmu": n,
+                "nom": f"CHEVAL {horses[n - 1]}",
+                "sexe": ["MALES", "FEMELLES", "HONGRES"][horses[n - 1] % 3],
+                "nomPere": f"ETALON {horses[n - 1] % 150}",
+                "nomMere": f"JUMENT {horses[n - 1]}",
+                "musique": " ".join(f"{rng.choice('123456789D0')}a" for _ in range(5)),
+                "age": rng.randint(3, 10),
+                "oeilleres": rng.choice(["SANS_OEILLERES", "OEILLERES_AUSTRALIENNES"]),
+                "deferre": rng.choice(["DEFERRE_ANTERIEURS", "DEFERRE_POSTERIEURS", "DEFERRE_ANTERIEURS_POSTERIEURS"]),
+                "nombreCourses": rng.randint(0, 60),
+                "nombreVictoires": rng.randint(0, 10),
+                "nombrePlaces": rng.randint(0, 20),
+                "nombrePlacesSecond": rng.randint(0, 8),
+                "nombrePlacesTroisieme": rng.randint(0, 8),
+                "driverChange": rng.random() < 0.1,
+                "avisEntraineur": rng.choice(["POSITIF", "NEUTRE", "NEGATIF"]),
+                "indicateurInedit": False,
+                "driver": f"DRIVER {rng.randint(1, 300)}",
+                "entraineur": f"ENTRAINEUR {rng.randint(1, 200)}",
+                "gainsParticipant": {
+                    "gainsCarriere": rng.randint(0, 500000),
+                    "gainsVictoires": rng.randint(0, 300000),
+                    "gainsPlace": rng.randint(0, 200000),
+                    "gainsAnneeEnCours": rng.randint(0, 50000),
+                    "gainsAnneePrecedente": rng.randint(0, 80000),
+                },
+                "dernierRapportDirect": {"dateRapport": now, "rapport": odds},
+                "dernierRapportReference": {"dateRapport": now - 60000, "rapport": odds},
+            })
+        return {"participants": participants}
+
+    def combinaisons(self, day: str, race_key: str) -> dict[str, Any]:
+        rng = self._race_random(day, race_key)
+        now = int(time.time() * 1000)
+        combinations = []
+        for bet_type in BET_TYPES:
+            size = {"E_COUPLE_GAGNANT": 2, "E_TRIO": 3}.get(bet_type, 1)
+            numbers = range(1, self.runners + 1)
+            combos = [[n] for n in numbers] if size == 1 else [
+                sorted(rng.sample(numbers, size)) for _ in range(self.runners * 3)
+            ]
+            combinations.append({
+                "pariType": bet_type,
+                "updateTime": now,
+                "listeCombinaisons": [
+                    {"combinaison": combo, "totalEnjeu": rng.randint(100, 500000)} for combo in combos
+                ],
+            })
+        return {"combinaisons": combinations}
+
+    def rapports_definitifs(self, day: str, race_key: str) -> list[dict[str, Any]]:
+        arrival = self._arrival(day, race_key)
+        rng = self._race_random(day, race_key + "-final")
+        return [
+            {"typePari": "E_SIMPLE_GAGNANT", "rapports": [
+                {"combinaison": str(arrival[0]), "dividendePourUnEuro": rng.randint(110, 5000)}
+            ]},
+            {"typePari": "E_SIMPLE_PLACE", "rapports": [
+                {"combinaison": str(n), "dividendePourUnEuro": rng.randint(100, 1500)} for n in arrival[:3]
+            ]},
+            {"typePari": "E_TRIO", "rapports": [
+                {"combinaison": COMBINATION_JOIN.join(map(str, sorted(arrival[:3]))),
+                 "dividendePourUnEuro": rng.randint(1000, 500000)}
+            ]},
+        ]
+
+    def respond(self, day: str, race_key: Optional[str], endpoint: str) -> Any:
+        if endpoint == "programme":
+            return self.programme(day)
+        if endpoint == "participants":
+            return self.participants(day, race_key)
+        if endpoint == "combinaisons":
+            return self.combinaisons(day, race_key)
+        return self.rapports_definitifs(day, race_key)
+
+
+class Fixtures:
+    """
+    Recorded PMU responses, one <DDMMYYYY>.json file per day:
+    {"programme": ..., "races": {"R1C1": {"participants": ..., "combinaisons": ..., "rapports-definitifs": ...}}}
+    """
+
+    def __init__(self, fixtures_dir: str):
+        self.fixtures_dir = fixtures_dir
+        self._days: dict[str, Optional[dict[str, Any]]] = {}
+
+    def _day(self, day: str) -> Optional[dict[str, Any]]:
+        if day not in self._days:
+            path = os.path.join(self.fixtures_dir, f"{day}.json")
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    self._days[day] = json.load(f)
+            else:
+                self._days[day] = None
+        return self._days[day]
+
+    def get(self, day: str, race_key: Optional[str], endpoint: str) -> Optional[Any]:
+        fixture = self._day(day)
+        if fixture is None:
+            return None
+        if endpoint == "programme":
+            return fixture.get("programme")
+        return fixture.get("races", {}).get(race_key, {}).get(endpoint)
+
+
+class RecordingClient:
+    """
+    Wraps an AsyncClient and records every PMU response into fixtures
+    """
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self.fixtures: dict[str, dict[str, Any]] = {}
+
+    async def get(self, url: str, **kwargs: Any) -> Response:
+        response = await self.client.get(url, **kwargs)
+        parsed = parse_endpoint(urlsplit(url).path)
+        if parsed is not None and response.status_code == 200:
+            day, race_key, endpoint = parsed
+            fixture = self.fixtures.setdefault(day, {"programme": None, "races": {}})
+            if endpoint == "programme":
+                fixture["programme"] = response.json()
+            else:
+                fixture["races"].setdefault(race_key, {})[endpoint] = response.json()
+        return response
+
+    def save(self, fixtures_dir: str) -> None:
+        os.makedirs(fixtures_dir, exist_ok=True)
+        for day, fixture in self.fixtures.items():
+            with open(os.path.join(fixtures_dir, f"{day}.json"), "w") as f:
+                json.dump(fixture, f)
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog (5) drops connections when a backfill opens 50-100 at once
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class PMUStandIn:
+    """
+    Local HTTP stand-in of the PMU programme API, for offline benchmarks and tests.
+    Serves recorded fixtures when available, synthetic data otherwise, with a
+    configurable latency and rate of 503 errors
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixtures_dir: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        program: Optional[SyntheticProgram] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.program = program or SyntheticProgram()
+        self.fixtures = Fixtures(fixtures_dir) if fixtures_dir else None
+        self.requests = 0
+        self.errors = 0
+        self._lock = Lock()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread: Optional[Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{PROGRAMME_PATH}"
+
+    def _handler_class(self) -> type:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                status, body = stand_in.handle(urlsplit(self.path).path)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def handle(self, path: str) -> tuple[int, Any]:
+        with self._lock:
+            self.requests += 1
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return 503, {"error": "Service Unavailable"}
+
+        parsed = parse_endpoint(path)
+        if parsed is None:
+            return 404, {"error": "Not Found"}
+
+        body = self.fixtures.get(*parsed) if self.fixtures else None
+        if body is None:
+            body = self.program.respond(*parsed)
+        return 200, body
+
+    def start(self) -> "PMUStandIn":
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "PMUStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+async def record_day(_date: date, fixtures_dir: str, data_folder: str, base_url: str = BASE_URL) -> None:
+    """
+    Scrap one day from the PMU API and save every response as a fixture
+    """
+    os.makedirs(data_folder, exist_ok=True)
+    async with AsyncClient() as client:
+        recorder = RecordingClient(client)
+        await scrap_day(_date, data_folder, client=recorder, base_url=base_url)
+    recorder.save(fixtures_dir)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Local stand-in of the PMU API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Serve fixtures or synthetic data")
+    serve.add_argument("--port", type=int, default=8061)
+    serve.add_argument("--fixtures", help="Fixtures directory")
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    serve.add_argument("--jitter", type=float, default=0.0)
+    serve.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    serve.add_argument("--meetings", type=int, default=4)
+    serve.add_argument("--races-per-meeting", type=int, default=8)
+    serve.add_argument("--runners", type=int, default=14)
+
+    record = subparsers.add_parser("record", help="Record one day of the PMU API as fixtures")
+    record.add_argument("--date", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    record.add_argument("--fixtures", default="data/fixtures")
+    record.add_argument("--data-folder", default="data/fixtures/raw")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        run(record_day(args.date, args.fixtures, args.data_folder))
+    else:
+        program = SyntheticProgram(args.meetings, args.races_per_meeting, args.runners)
+        stand_in = PMUStandIn(
+            port=args.port, fixtures_dir=args.fixtures, latency=args.latency, jitter=args.jitter,
+            error_rate=args.error_rate, program=program,
+        )
+        print(f"Serving on {stand_in.base_url}")
+        try:
+            stand_in.serve_forever()
+        except KeyboardInterrupt:
+            stand_in._server.server_close()
@@ -0,0 +1,158 @@
+import os
+import json
+import random
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import date
+from http.client import HTTPConnection
+from multiprocessing import Process, Queue
+from threading import Event, Thread
+from typing import Any
+
+import numpy as np
+
+from scripts.benchmarks.synthetic_data import generate_day
+from src.data_access.storage.snapshot_log import append_snapshot, load_day_file
+from src.models.features import runner_features
+from src.models.prediction_service import ImpliedOddsModel, PredictionService, Predictor, make_server
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    values = np.array(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def cold_latencies(file_path: str, race_ids: list[str], predictor: Predictor, n: int) -> list[float]:
+    """
+    Former path: every prediction reloads the day file and rebuilds the features
+    """
+    date_str = os.path.basename(file_path).replace(".json", "")
+    latencies = []
+    for race_id in race_ids[:n]:
+        start = time.perf_counter()
+        data = load_day_file(file_path)
+        predictor.predict(runner_features([(date_str, {race_id: data[race_id]})]))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def odds_updater(file_path: str, race_ids: list[str], runners: int, interval: float, stop: Event) -> None:
+    """
+    Appends an odds snapshot for a few races every interval, like the scraper in snapshot log mode
+    """
+    rng = random.Random(0)
+    while not stop.wait(interval):
+        now = str(int(time.time() * 1000))
+        snapshot = {
+            race_id: {"rapports": {str(num): {now: round(rng.uniform(1.5, 40), 1)} for num in range(1, runners + 1)}}
+            for race_id in rng.sample(race_ids, min(3, len(race_ids)))
+        }
+        append_snapshot(file_path, snapshot)
+
+
+def serve(base_path: str, race_date: date, ready: Queue) -> None:
+    """
+    Service in its own process, as deployed: the load generator does not compete for its GIL
+    """
+    service = PredictionService(Predictor(ImpliedOddsModel()), base_path, race_date, refresh_interval=0.1)
+    start = time.perf_counter()
+    service.preload()
+    preload_seconds = time.perf_counter() - start
+    server = make_server(service, port=0)
+    ready.put((server.server_address[1], preload_seconds))
+    server.serve_forever()
+
+
+def load(port: int, race_ids: list[str], requests: int, concurrency: int) -> tuple[list[float], float]:
+    """
+    concurrency clients, one persistent connection each, sharing the requests
+    (stdlib clients: httpx's async pool becomes the bottleneck above a few connections)
+    """
+    latencies: list[float] = []
+
+    def client(worker: int) -> None:
+        connection = HTTPConnection("127.0.0.1", port)
+        for i in range(worker, requests, concurrency):
+            start = time.perf_counter()
+            connection.request("GET", f"/races/{race_ids[i % len(race_ids)]}")
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            assert response.status == 200, response.status
+        connection.close()
+
+    threads = [Thread(target=client, args=(worker,)) for worker in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Prediction service latency under concurrent load")
+    parser.add_argument("--races-per-day", type=int, default=40)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--snapshots", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--update-interval", type=float, default=0.5,
+                        help="Seconds between odds snapshots appended during the run (0 to disable)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    race_date = date(2024, 6, 1)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as base_path:
+        os.makedirs(os.path.join(base_path, str(race_date.year)))
+        file_path = os.path.join(base_path, str(race_date.year), race_date.strftime("%d_%m_%Y") + ".json")
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(generate_day(race_date, args.races_per_day, args.runners, args.snapshots), f, indent=2)
+
+        predictor = Predictor(ImpliedOddsModel())
+        race_ids = sorted(load_day_file(file_path))
+        results["cold"] = percentiles(cold_latencies(file_path, race_ids, predictor, 20))
+
+        ready: Queue = Queue()
+        server = Process(target=serve, args=(base_path, race_date, ready), daemon=True)
+        server.start()
+        port, preload_seconds = ready.get()
+        results["preload_seconds"] = round(preload_seconds, 3)
+        stop = Event()
+        if args.update_interval > 0:
+            Thread(
+                target=odds_updater, args=(file_path, race_ids, args.runners, args.update_interval, stop), daemon=True
+            ).start()
+
+        latencies, elapsed = load(port, race_ids, args.requests, args.concurrency)
+        stop.set()
+        results["warm"] = percentiles(latencies) | {"requests_per_second": round(args.requests / elapsed, 1)}
+        connection = HTTPConnection("127.0.0.1", port)
+        connection.request("GET", "/health")
+        health = json.loads(connection.getresponse().read())
+        connection.close()
+        server.terminate()
+        results["segments_merged"] = health["segments_fusionnes"]
+        results["full_reloads"] = health["rechargements"]
+
+    print(f"preload          {results['preload_seconds']:.3f}s")
+    for name in ("cold", "warm"):
+        stats = results[name]
+        print(
+            f"{name:<6} p50 {stats['p50_ms']:>8.3f} ms  p95 {stats['p95_ms']:>8.3f} ms  "
+            f"p99 {stats['p99_ms']:>8.3f} ms  max {stats['max_ms']:>8.3f} ms"
+        )
+    print(
+        f"{results['warm']['requests_per_second']} req/s at concurrency {args.concurrency}, "
+        f"{results['segments_merged']} odds segments merged, {results['full_reloads']} full reload(s)"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
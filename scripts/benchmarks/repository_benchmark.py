@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import asdict
+from datetime import date
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from scripts.benchmarks.synthetic_data import (
+    driver_name, generate_archive, hippodrome_code, iter_days, trainer_name
+)
+from src.data_access.mappers import (
+    diagnostics, map_json_to_horse, map_json_to_horses, map_json_to_odds_panel, map_json_to_race, map_json_to_result,
+    races_to_dataframe, results_to_dataframe, runners_to_dataframe
+)
+from src.data_access.repositories import HorseRepository, RaceRepository, ResultRepository
+from src.data_access.storage import ColumnarStore, DayFileCache, RaceCatalog
+from src.data_access.storage.snapshot_log import load_day_file
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "repository_benchmark.json")
+
+# Benchmark: () -> number of items produced (races, horses, results...)
+Benchmark = Callable[[], int]
+
+
+def count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, (list, dict, set, tuple)):
+        return len(result)
+    return 1
+
+
+def repository_benchmarks(
+    base_path: str, years: list[int], backend: str, storage_path: str
+) -> dict[str, Callable[[], Benchmark]]:
+    """
+    Benchmarks of every public repository method. Each factory builds fresh repositories
+    with an empty day file cache so that every run reads the files again
+    """
+    first_day = next(iter_days(years, 1))
+    year = years[0]
+    hippodrome = hippodrome_code(first_day, 1)
+    columnar_store = None
+    catalog_path = None
+    if backend == "columnar":
+        columnar_store = ColumnarStore(base_path, os.path.join(storage_path, "columnar"))
+        for y in years:
+            columnar_store.compact_year(y)
+    elif backend == "catalog":
+        catalog_path = os.path.join(storage_path, "catalog.sqlite")
+        RaceCatalog(base_path, catalog_path).refresh()
+
+    def repository(cls: type) -> Any:
+        catalog = RaceCatalog(base_path, catalog_path) if catalog_path else None
+        return cls(base_path, columnar_store=columnar_store, catalog=catalog, cache=DayFileCache())
+
+    def bench(cls: type, method: str, *args: Any) -> Callable[[], Benchmark]:
+        def factory() -> Benchmark:
+            bound = getattr(repository(cls), method)
+            return lambda: count(bound(*args))
+        return factory
+
+    return {
+        "RaceRepository.get_race_by_id": bench(RaceRepository, "get_race_by_id", "R1C1", first_day),
+        "RaceRepository.get_races_by_date": bench(RaceRepository, "get_races_by_date", first_day),
+        "RaceRepository.get_races_by_hippodrome": bench(
+            RaceRepository, "get_races_by_hippodrome", hippodrome, year
+        ),
+        "RaceRepository.get_races_by_hippodrome (all years)": bench(
+            RaceRepository, "get_races_by_hippodrome", hippodrome
+        ),
+        "RaceRepository.get_races_by_distance_range": bench(
+            RaceRepository, "get_races_by_distance_range", 2000, 2800, year
+        ),
+        "RaceRepository.get_all_hippodromes": bench(RaceRepository, "get_all_hippodromes"),
+        "HorseRepository.get_horses_by_race": bench(HorseRepository, "get_horses_by_race", "R1C1", first_day),
+        "HorseRepository.get_horse_by_number_in_race": bench(
+            HorseRepository, "get_horse_by_number_in_race", "R1C1", 1, first_day
+        ),
+        "HorseRepository.get_horses_by_driver": bench(HorseRepository, "get_horses_by_driver", driver_name(1), year),
+        "HorseRepository.get_horses_by_trainer": bench(
+            HorseRepository, "get_horses_by_trainer", trainer_name(1), year
+        ),
+        "ResultRepository.get_result_by_race": bench(ResultRepository, "get_result_by_race", "R1C1", first_day),
+        "ResultRepository.get_results_by_date": bench(ResultRepository, "get_results_by_date", first_day),
+        "ResultRepository.get_winning_horses": bench(ResultRepository, "get_winning_horses", year),
+        "ResultRepository.get_placed_horses": bench(ResultRepository, "get_placed_horses", year),
+    }
+
+
+def mapper_benchmarks(base_path: str, years: list[int]) -> dict[str, Callable[[], Benchmark]]:
+    """
+    Benchmarks of the map_json_to_* mappers over every race of the first year, already in memory
+    """
+    days = []
+    for day in iter_days(years[:1], 366):
+        file_path = os.path.join(base_path, str(day.year), f"{day.strftime('%d_%m_%Y')}.json")
+        if os.path.exists(file_path):
+            days.append((day.strftime("%d_%m_%Y"), load_day_file(file_path)))
+    races = [(date_str, race_id, race_data) for date_str, data in days for race_id, race_data in data.items()]
+
+    def map_races() -> int:
+        return count([map_json_to_race(race_id, race_data, date_str) for date_str, race_id, race_data in races])
+
+    def map_horses() -> int:
+        return sum(len(map_json_to_horses(race_id, race_data)) for _, race_id, race_data in races)
+
+    def map_horse() -> int:
+        n = 0
+        for _, race_id, race_data in races:
+            rapports = race_data.get("rapports", {})
+            for num_str, features in race_data.get("horse_features", {}).items():
+                map_json_to_horse(race_id, int(num_str), features, rapports.get(num_str, {}))
+                n += 1
+        return n
+
+    def map_results() -> int:
+        return count([map_json_to_result(race_id, race_data) for _, race_id, race_data in races])
+
+    def horses_dataframe() -> int:
+        # Former training table path: dataclasses flattened back into pandas
+        rows = []
+        for date_str, race_id, race_data in races:
+            for horse in map_json_to_horses(race_id, race_data):
+                row = asdict(horse.features)
+                row.update(date=date_str, race_id=race_id, numero=horse.numero, horse_id=horse.id)
+                rows.append(row)
+        return len(pd.DataFrame(rows))
+
+    def odds_as_of_dicts() -> int:
+        # Odds 5 minutes before the off by parsing and sorting the dict keys of every runner
+        n = 0
+        for _, race_id, race_data in races:
+            target = race_data["heureDepart"] - 5 * 60 * 1000
+            for horse in map_json_to_horses(race_id, race_data):
+                before = [int(ts) for ts in horse.odds if int(ts) <= target]
+                if before:
+                    horse.odds[str(max(before))]
+                n += 1
+        return n
+
+    def odds_as_of_panel() -> int:
+        panel = map_json_to_odds_panel((race_id, race_data) for _, race_id, race_data in races)
+        return len(panel.as_of(panel.heures_depart - 5 * 60 * 1000))
+
+    return {
+        "map_json_to_race": lambda: map_races,
+        "map_json_to_horses": lambda: map_horses,
+        "map_json_to_horse": lambda: map_horse,
+        "map_json_to_result": lambda: map_results,
+        "map_json_to_horses -> DataFrame": lambda: horses_dataframe,
+        "odds at H-5min (dicts)": lambda: odds_as_of_dicts,
+        "odds at H-5min (OddsPanel)": lambda: odds_as_of_panel,
+        "races_to_dataframe": lambda: lambda: len(races_to_dataframe(days)),
+        "runners_to_dataframe": lambda: lambda: len(runners_to_dataframe(days)),
+        "results_to_dataframe": lambda: lambda: len(results_to_dataframe(days)),
+    }
+
+
+def run_benchmark(factory: Callable[[], Benchmark], repeat: int) -> dict[str, Any]:
+    """
+    Best time over repeat runs, then one extra run under tracemalloc for the peak memory
+    """
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        benchmark = factory()
+        start = time.perf_counter()
+        items = benchmark()
+        timings.append(time.perf_counter() - start)
+
+    benchmark = factory()
+    tracemalloc.start()
+    try:
+        benchmark()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "seconds": round(best, 6),
+        "items": items,
+        "items_per_second": round(items / best, 1) if best > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], tolerance: float
+) -> list[str]:
+    """
+    Benchmarks slower or using more memory than the baseline by more than tolerance
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric in ("seconds", "peak_memory_bytes"):
+            if reference[metric] and result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {result[metric]} vs baseline {reference[metric]} "
+                    f"(+{result[metric] / reference[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def load_baseline(path: str, config: dict[str, Any]) -> Optional[dict[str, dict[str, Any]]]:
+    if not os.path.exists(path):
+        print(f"No baseline at {path}, not compared (record one with --save-baseline)")
+        return None
+    with open(path, "r") as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"Baseline {path} was recorded with another configuration, not compared")
+        return None
+    return baseline["results"]
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Repositories and mappers benchmark on a synthetic archive")
+    parser.add_argument("--data-folder", help="Existing archive to benchmark instead of a generated one")
+    parser.add_argument("--years", type=int, nargs="+", default=[2022, 2023])
+    parser.add_argument("--days-per-year", type=int, default=30)
+    parser.add_argument("--races-per-day", type=int, default=32)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--snapshots", type=int, default=10)
+    parser.add_argument("--backend", choices=["json", "columnar", "catalog"], default="json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", help="Only run the benchmarks whose name contains this string")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Record these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before reporting a regression")
+    args = parser.parse_args()
+
+    config = {
+        "data_folder": args.data_folder,
+        "years": args.years,
+        "days_per_year": args.days_per_year,
+        "races_per_day": args.races_per_day,
+        "runners": args.runners,
+        "snapshots": args.snapshots,
+        "backend": args.backend,
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        base_path = args.data_folder
+        if base_path is None:
+            base_path = os.path.join(work_dir, "raw")
+            start = time.perf_counter()
+            n_files = generate_archive(
+                base_path, args.years, args.days_per_year, args.races_per_day, args.runners, args.snapshots
+            )
+            print(f"{n_files} synthetic day files generated in {time.perf_counter() - start:.1f}s")
+
+        benchmarks = {
+            **repository_benchmarks(base_path, args.years, args.backend, work_dir),
+            **mapper_benchmarks(base_path, args.years),
+        }
+        results = {}
+        for name, factory in benchmarks.items():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = run_benchmark(factory, args.repeat)
+            result = results[name]
+            print(
+                f"{name:<52} {result['seconds'] * 1000:>10.2f} ms {result['items']:>8} items "
+                f"{result['items_per_second'] or 0:>12.0f} items/s {result['peak_memory_bytes'] / 2**20:>8.1f} MiB"
+            )
+
+    report = diagnostics.report()
+    if report:
+        print(f"Mapping diagnostics:\n{report}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "date": date.today().isoformat(), "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    else:
+        baseline = load_baseline(args.baseline, config)
+        if baseline is not None:
+            regressions = compare(results, baseline, args.tolerance)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                sys.exit(1)
+            print(f"No regression against {args.baseline}")
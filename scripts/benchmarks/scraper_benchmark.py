@@ -0,0 +1,88 @@
+import json
+import time
+import tempfile
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from typing import Any
+
+from asyncio import run
+
+from scripts.benchmarks.pmu_stand_in import PMUStandIn, SyntheticProgram
+from scripts.scraping.scraper import scrap_day
+from scripts.scraping.scrap_previous_data import backfill
+from src.utils import metrics
+
+
+async def sequential_days(stand_in: PMUStandIn, start: date, n_days: int, data_folder: str) -> None:
+    """
+    Former backfill path: one scrap_day per day, each with its own client
+    """
+    for i in range(n_days):
+        await scrap_day(start + timedelta(days=i), data_folder, base_url=stand_in.base_url)
+
+
+def measure(stand_in: PMUStandIn, name: str, coroutine: Any, n_days: int) -> dict[str, Any]:
+    requests_before = stand_in.requests
+    start = time.perf_counter()
+    run(coroutine)
+    elapsed = time.perf_counter() - start
+    requests = stand_in.requests - requests_before
+    return {
+        "name": name,
+        "days": n_days,
+        "seconds": round(elapsed, 3),
+        "days_per_second": round(n_days / elapsed, 2),
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Scraper throughput against the local PMU stand-in")
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--meetings", type=int, default=4)
+    parser.add_argument("--races-per-meeting", type=int, default=8)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--metrics-prometheus", help="Write the scraper metrics to this Prometheus text file")
+    parser.add_argument("--metrics-jsonl", help="Append the scraper metrics to this JSON lines file")
+    args = parser.parse_args()
+
+    sink = metrics.configure(args.metrics_prometheus, args.metrics_jsonl)
+
+    program = SyntheticProgram(args.meetings, args.races_per_meeting, args.runners)
+    start = date(2020, 1, 1)
+    results = []
+    with PMUStandIn(latency=args.latency, error_rate=args.error_rate, program=program) as stand_in:
+        with tempfile.TemporaryDirectory() as folder:
+            if args.error_rate == 0:
+                # Without retries, the sequential path only makes sense on a reliable server
+                results.append(measure(
+                    stand_in, "scrap_day sequential", sequential_days(stand_in, start, args.days, folder), args.days
+                ))
+        with tempfile.TemporaryDirectory() as folder:
+            results.append(measure(
+                stand_in,
+                "backfill",
+                backfill(
+                    start, start + timedelta(days=args.days - 1), folder,
+                    day_concurrency=args.days, max_concurrency=args.concurrency, rate=args.rate,
+                    base_url=stand_in.base_url,
+                ),
+                args.days,
+            ))
+
+    sink.close()
+
+    for result in results:
+        print(
+            f"{result['name']:<22} {result['days_per_second']:>8} days/s "
+            f"{result['requests_per_second']:>9} req/s ({result['requests']} requests in {result['seconds']}s)"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,204 @@
+import os
+import json
+import random
+from argparse import ArgumentParser
+from datetime import date, datetime, timedelta
+from typing import Any, Iterator
+
+from scripts.benchmarks.pmu_stand_in import DISCIPLINES
+
+HIPPODROMES = [f"H{i:02d}" for i in range(1, 41)]
+N_DRIVERS = 400
+N_TRAINERS = 250
+N_HORSES = 3000
+BET_SIZES = {"E_SIMPLE_GAGNANT": 1, "E_SIMPLE_PLACE": 1, "E_COUPLE_GAGNANT": 2, "E_TRIO": 3}
+
+
+def driver_name(i: int) -> str:
+    return f"DRIVER {i}"
+
+
+def trainer_name(i: int) -> str:
+    return f"ENTRAINEUR {i}"
+
+
+def horse_identity(i: int) -> dict[str, str]:
+    """
+    Participant fields identifying synthetic horse i across races
+    """
+    return {
+        "nom": f"CHEVAL {i}",
+        "sexe": ["MALES", "FEMELLES", "HONGRES"][i % 3],
+        "race": "TROTTEUR FRANCAIS",
+        "nomPere": f"ETALON {i % 150}",
+        "nomMere": f"JUMENT {i}",
+        "nomPereMere": f"ETALON {(i * 7) % 150}",
+        "eleveur": f"ELEVEUR {i % 90}",
+    }
+
+
+def hippodrome_code(day: date, meeting: int) -> str:
+    return HIPPODROMES[(day.toordinal() * 7 + meeting) % len(HIPPODROMES)]
+
+
+def race_days(year: int, days_per_year: int) -> list[date]:
+    """
+    days_per_year dates spread evenly over the year (every day if days_per_year >= 365)
+    """
+    first = date(year, 1, 1)
+    n_days = (date(year + 1, 1, 1) - first).days
+    days_per_year = min(days_per_year, n_days)
+    return [first + timedelta(days=i * n_days // days_per_year) for i in range(days_per_year)]
+
+
+def generate_race(
+    rng: random.Random, day: date, meeting: int, race: int, runners: int, snapshots: int
+) -> dict[str, Any]:
+    """
+    One race in the layout written by the scraper: metadata, odds and pool snapshots,
+    runner features, arrival and final dividends
+    """
+    discipline, specialite = rng.choice(DISCIPLINES)
+    hippodrome = hippodrome_code(day, meeting)
+    off = datetime(day.year, day.month, day.day, 13) + timedelta(minutes=30 * race + 7 * meeting)
+    off_ms = int(off.timestamp() * 1000)
+    # Snapshots every 5 minutes until the off
+    timestamps = [str(off_ms - (snapshots - i) * 5 * 60 * 1000) for i in range(snapshots)]
+
+    horse_features = {}
+    rapports = {}
+    horses = rng.sample(range(1, N_HORSES + 1), runners)
+    for n in range(1, runners + 1):
+        horse_features[str(n)] = horse_identity(horses[n - 1]) | {
+            "musique": " ".join(f"{rng.choice('123456789D0')}a" for _ in range(5)),
+            "age": rng.randint(3, 10),
+            "oeilleres": rng.choice(["SANS_OEILLERES", "OEILLERES_AUSTRALIENNES", "OEILLERES_AMERICAINES"]),
+            "deferre": rng.choice([None, "DEFERRE_ANTERIEURS", "DEFERRE_POSTERIEURS", "DEFERRE_ANTERIEURS_POSTERIEURS"]),
+            "nombreCourses": rng.randint(0, 60),
+            "nombreVictoires": rng.randint(0, 10),
+            "nombrePlaces": rng.randint(0, 20),
+            "nombrePlacesSecond": rng.randint(0, 8),
+            "nombrePlacesTroisieme": rng.randint(0, 8),
+            "driverChange": rng.random() < 0.1,
+            "avisEntraineur": rng.choice(["POSITIF", "NEUTRE", "NEGATIF"]),
+            "indicateurInedit": rng.random() < 0.05,
+            "driver": driver_name(rng.randint(1, N_DRIVERS)),
+            "entraineur": trainer_name(rng.randint(1, N_TRAINERS)),
+            "gainsCarriere": rng.randint(0, 500000),
+            "gainsVictoires": rng.randint(0, 300000),
+            "gainsPlace": rng.randint(0, 200000),
+            "gainsAnneeEnCours": rng.randint(0, 50000),
+            "gainsAnneePrecedente": rng.randint(0, 80000),
+        }
+        odds = rng.uniform(1.5, 60)
+        series = {}
+        for ts in timestamps:
+            odds = max(1.1, odds * rng.uniform(0.9, 1.1))
+            series[ts] = round(odds, 1)
+        rapports[str(n)] = series
+
+    numbers = list(range(1, runners + 1))
+    enjeux = {}
+    for bet_type, size in BET_SIZES.items():
+        combinations = [[n] for n in numbers] if size == 1 else [
+            sorted(rng.sample(numbers, size)) for _ in range(runners * 3)
+        ]
+        enjeux[bet_type] = {
+            "-".join(map(str, combo)): {ts: rng.randint(100, 500000) for ts in timestamps}
+            for combo in combinations
+        }
+
+    arrival = numbers[:]
+    rng.shuffle(arrival)
+    return {
+        "heureDepart": off_ms,
+        "montantPrix": rng.choice([15000, 22000, 40000, 90000]),
+        "distance": rng.choice([1600, 2100, 2700, 2850, 3600]),
+        "discipline": discipline,
+        "specialite": specialite,
+        "nombreDeclaresPartants": runners,
+        "conditionSexe": rng.choice(["MALES_ET_HONGRES", "FEMELLES", "MIXTE"]),
+        "grandPrixNationalTrot": False,
+        "montantOffert1er": 9000,
+        "montantOffert2eme": 5000,
+        "montantOffert3eme": 2500,
+        "nature": rng.choice(["DIURNE", "NOCTURNE"]),
+        "hippodrome": {"code": hippodrome, "libelleCourt": f"HIPPO {hippodrome}", "libelleLong": f"HIPPODROME {hippodrome}"},
+        "meteo": {
+            "datePrevision": int(off.replace(hour=8).timestamp() * 1000),
+            "nebulositeCode": rng.choice(["P0", "P1", "P2", "P3", "P4", "P5"]),
+            "nebulositeLibelleCourt": "Peu nuageux",
+            "nebulositeLibelleLong": "Peu nuageux",
+            "temperature": rng.randint(-5, 35),
+            "forceVent": rng.randint(0, 60),
+            "directionVent": rng.choice(["N", "NE", "E", "SE", "S", "SO", "O", "NO"]),
+        },
+        "rapports": rapports,
+        "enjeux": enjeux,
+        "horse_features": horse_features,
+        "ordreArrivee": [[n] for n in arrival],
+        "rapportsDefinitifs": {
+            "E_SIMPLE_GAGNANT": {str(arrival[0]): round(rng.uniform(1.1, 50), 2)},
+            "E_SIMPLE_PLACE": {str(n): round(rng.uniform(1.0, 15), 2) for n in arrival[:3]},
+            "E_TRIO": {"-".join(map(str, sorted(arrival[:3]))): round(rng.uniform(10, 5000), 2)},
+        },
+    }
+
+
+def generate_day(
+    day: date, races_per_day: int = 32, runners: int = 14, snapshots: int = 10, seed: int = 0
+) -> dict[str, Any]:
+    """
+    Content of one day file, deterministic for a given day and seed
+    """
+    rng = random.Random(f"{seed}-{day.isoformat()}")
+    races_per_meeting = 8
+    data = {}
+    for i in range(races_per_day):
+        meeting, race = i // races_per_meeting + 1, i % races_per_meeting + 1
+        data[f"R{meeting}C{race}"] = generate_race(rng, day, meeting, race, runners, snapshots)
+    return data
+
+
+def iter_days(years: list[int], days_per_year: int) -> Iterator[date]:
+    for year in years:
+        yield from race_days(year, days_per_year)
+
+
+def generate_archive(
+    base_path: str,
+    years: list[int],
+    days_per_year: int = 30,
+    races_per_day: int = 32,
+    runners: int = 14,
+    snapshots: int = 10,
+    seed: int = 0,
+) -> int:
+    """
+    Writes data/raw/<year>/DD_MM_YYYY.json files, returns the number of files written
+    """
+    n_files = 0
+    for day in iter_days(years, days_per_year):
+        year_dir = os.path.join(base_path, str(day.year))
+        os.makedirs(year_dir, exist_ok=True)
+        with open(os.path.join(year_dir, f"{day.strftime('%d_%m_%Y')}.json"), "w") as f:
+            json.dump(generate_day(day, races_per_day, runners, snapshots, seed), f, indent=2)
+        n_files += 1
+    return n_files
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Generate a synthetic archive of day files")
+    parser.add_argument("--output", default="data/synthetic/raw")
+    parser.add_argument("--years", type=int, nargs="+", default=[2022, 2023])
+    parser.add_argument("--days-per-year", type=int, default=30)
+    parser.add_argument("--races-per-day", type=int, default=32)
+    parser.add_argument("--runners", type=int, default=14)
+    parser.add_argument("--snapshots", type=int, default=10, help="Odds and pool snapshots per runner")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n_files = generate_archive(
+        args.output, args.years, args.days_per_year, args.races_per_day, args.runners, args.snapshots, args.seed
+    )
+    print(f"{n_files} day files written to {args.output}")
@@ -0,0 +1,133 @@
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from typing import Any, List, Optional
+
+from asyncio import Lock, Queue, sleep
+from httpx import AsyncBaseTransport, AsyncClient, Limits, Response, TransportError, create_ssl_context
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Statuses whose Retry-After header tells how long the server wants us to wait
+RETRY_AFTER_STATUS = {429, 503}
+
+
+def retry_after_delay(response: Response) -> Optional[float]:
+    """
+    Seconds to wait from the Retry-After header (delay in seconds or HTTP date),
+    None when the header is missing or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Rate limit of `rate` requests per second, with bursts up to `capacity`
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimitedClient:
+    """
+    Shared HTTP client: connection pool, global concurrency limit, request rate
+    limit and retries with exponential backoff on transient errors. On 429/503 the
+    Retry-After header, when present, replaces the backoff (capped at max_retry_after)
+
+    Each request checks out one of max_concurrency single-connection clients, which
+    keeps its connection alive for the next request. A single httpx pool hands a burst
+    of requests to the same idle keep-alive connection, where they queue behind each
+    other: at 50-100 concurrent requests, backfill was slower than sequential scraping
+
+    Exposes the same `get` method as httpx.AsyncClient, which is all the scraper uses
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        rate: Optional[float] = 20.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        max_retry_after: float = 60.0,
+        transport: Optional[AsyncBaseTransport] = None,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self._transport = transport
+        self._ssl_context = create_ssl_context()
+        self._clients: List[AsyncClient] = []
+        # Free clients, None for a slot whose client is not created yet: also the concurrency limit
+        self._free: Queue[Optional[AsyncClient]] = Queue()
+        for _ in range(max_concurrency):
+            self._free.put_nowait(None)
+        self._bucket = TokenBucket(rate) if rate else None
+
+    def _new_client(self) -> AsyncClient:
+        client = AsyncClient(
+            limits=Limits(max_connections=1, max_keepalive_connections=1),
+            timeout=self.timeout,
+            verify=self._ssl_context,
+            transport=self._transport,
+        )
+        self._clients.append(client)
+        return client
+
+    async def get(self, url: str, **kwargs: Any) -> Response:
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2**attempt
+            if self._bucket:
+                await self._bucket.acquire()
+            client = await self._free.get()
+            try:
+                if client is None:
+                    client = self._new_client()
+                response = await client.get(url, **kwargs)
+            except TransportError:
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.retries:
+                    return response
+                if response.status_code in RETRY_AFTER_STATUS:
+                    retry_after = retry_after_delay(response)
+                    if retry_after is not None:
+                        delay = min(retry_after, self.max_retry_after)
+            finally:
+                self._free.put_nowait(client)
+            await sleep(delay)
+
+    async def aclose(self) -> None:
+        for client in self._clients:
+            await client.aclose()
+
+    async def __aenter__(self) -> "RateLimitedClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+from argparse import ArgumentParser
+from datetime import date
+from typing import Any, Optional
+
+from asyncio import Lock, gather, run, sleep
+from httpx import AsyncClient
+
+from scripts.scraping.scraper import (
+    BASE_URL,
+    SUFFIX,
+    EndpointTimer,
+    decode_json,
+    fetch_finished_race,
+    fetch_planned_race,
+    get_day_filepath,
+    get_race_key,
+    get_race_output,
+    init_day_data,
+    save_races,
+    timed_get,
+)
+from scripts.scraping.http_client import RateLimitedClient
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.catalog import DEFAULT_DB_PATH, RaceCatalog
+from src.utils import metrics
+
+# (seconds before the off, polling interval in seconds): the first threshold
+# the race is above gives the interval, closest to the off the densest
+DEFAULT_SCHEDULE = [
+    (60 * 60, 15 * 60),
+    (15 * 60, 5 * 60),
+    (5 * 60, 60),
+    (0, 15),
+]
+
+
+def next_poll_delay(seconds_to_off: float, schedule: list[tuple[float, float]] = DEFAULT_SCHEDULE) -> float:
+    """
+    Delay before the next odds poll of a race, never past the next schedule threshold
+    """
+    for threshold, interval in schedule:
+        if seconds_to_off > threshold:
+            return min(interval, seconds_to_off - threshold)
+    return schedule[-1][1]
+
+
+class LivePoller:
+    """
+    Long running poller of one race day: each race is polled on its own according
+    to its heureDepart, sparse early in the day and denser in the last minutes.
+    Once the off is past, the program is watched until rapportsDefinitifsDisponibles
+    flips, then the race is fetched one last time with fetch_finished_race and dropped.
+    The program is fetched at most once per program_max_age, shared by all the races
+    """
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        data_folder: str = "data/raw",
+        schedule: list[tuple[float, float]] = DEFAULT_SCHEDULE,
+        result_check_interval: float = 60,
+        give_up_after: float = 3 * 60 * 60,
+        program_max_age: float = 60,
+        retry_delay: float = 5,
+        max_retry_delay: float = 5 * 60,
+        snapshot_log: bool = True,
+        catalog: Optional[RaceCatalog] = None,
+        timer: Optional[EndpointTimer] = None,
+        base_url: str = BASE_URL,
+        metrics_flush_interval: float = 15,
+    ):
+        self.client = client
+        self.base_url = base_url
+        self.data_folder = data_folder
+        self.schedule = schedule
+        self.result_check_interval = result_check_interval
+        self.give_up_after = give_up_after
+        self.program_max_age = program_max_age
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.snapshot_log = snapshot_log
+        self.catalog = catalog
+        self.timer = timer
+        self.requests = 0
+        self.metrics_flush_interval = metrics_flush_interval
+        self._metrics_flushed_at = time.monotonic()
+
+        self._program_lock = Lock()
+        self._meetings: list[dict[str, Any]] = []
+        self._program_races: dict[str, dict[str, Any]] = {}
+        self._program_fetched_at = 0.0
+
+    async def _refresh_program(self, program_url: str, max_age: float) -> dict[str, dict[str, Any]]:
+        """
+        Races of the program, fetched at most once per max_age for all the races waiting for results
+        """
+        async with self._program_lock:
+            if time.monotonic() - self._program_fetched_at >= max_age:
+                response = await timed_get(self.client, program_url + SUFFIX + "&meteo=true", "programme", self.timer)
+                self.requests += 1
+                self._meetings = decode_json(response, "programme")["programme"]["reunions"]
+                self._program_races = {
+                    get_race_key(race): race for meeting in self._meetings for race in meeting["courses"]
+                }
+                self._program_fetched_at = time.monotonic()
+        return self._program_races
+
+    def _save(self, race_key: str, race_output: dict[str, Any]) -> None:
+        self._save_races([(race_key, race_output)])
+
+    def _save_races(self, fetched_races: list[tuple[str, dict[str, Any]]]) -> None:
+        save_races(self.filepath, self.data, fetched_races, self.is_new_file, self.snapshot_log, self.catalog)
+        self.is_new_file = False
+        # The poller runs for hours, metrics are written along the way
+        if metrics.enabled() and time.monotonic() - self._metrics_flushed_at >= self.metrics_flush_interval:
+            metrics.flush()
+            self._metrics_flushed_at = time.monotonic()
+
+    async def _poll_once(
+        self, program_url: str, race_key: str, race_input: dict[str, Any], off: float
+    ) -> Optional[float]:
+        """
+        One poll of a race: odds before the off, final results after it.
+        Returns the delay before the next poll, None once the results are saved
+        """
+        seconds_to_off = off - time.time()
+        if seconds_to_off > 0:
+            race_output = get_race_output(self.data, race_key, self.snapshot_log)
+            await fetch_planned_race(self.client, program_url, race_input, race_output, self.timer)
+            self.requests += 2
+            self._save(race_key, race_output)
+            seconds_to_off = off - time.time()
+            return next_poll_delay(seconds_to_off, self.schedule) if seconds_to_off > 0 else 0
+
+        if race_input.get("rapportsDefinitifsDisponibles", False) and "ordreArrivee" in race_input:
+            race_output = get_race_output(self.data, race_key, self.snapshot_log)
+            await fetch_finished_race(self.client, program_url, race_input, race_output, self.timer)
+            self.requests += 1
+            self._save(race_key, race_output)
+            return None
+        return self.result_check_interval
+
+    async def _poll_race(self, program_url: str, race_key: str) -> None:
+        """
+        Polls one race until its final results are saved, it leaves the program or give_up_after passes.
+        heureDepart is read from the program on every pass, so a delayed off is followed. A failed poll
+        (retries exhausted, invalid JSON...) is reported and retried with exponential backoff: it never
+        stops the other races
+        """
+        off = self._program_races[race_key]["heureDepart"] / 1000
+        failures = 0
+        while time.time() - off < self.give_up_after:
+            try:
+                race_input = (await self._refresh_program(program_url, self.program_max_age)).get(race_key)
+                if race_input is None:
+                    print(f"{race_key}: no longer in the program, stopping")
+                    return
+                off = race_input["heureDepart"] / 1000
+                delay = await self._poll_once(program_url, race_key, race_input, off)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                delay = min(self.retry_delay * 2 ** (failures - 1), self.max_retry_delay)
+                metrics.increment("live_poller_errors_total", error=type(e).__name__)
+                print(f"\033[91m{race_key}: {type(e).__name__}: {e}, retry {failures} in {delay:.0f}s\033[0m")
+            if delay is None:
+                return
+            await sleep(delay)
+
+        print(f"{race_key}: no final results after {self.give_up_after / 60:.0f} minutes, giving up")
+
+    async def run(self, _date: date) -> None:
+        program_url = f"{self.base_url}/{_date.strftime('%d%m%Y')}"
+        await self._refresh_program(program_url, 0)
+
+        self.filepath = get_day_filepath(_date, self.data_folder)
+        self.is_new_file = not os.path.exists(self.filepath)
+        if self.is_new_file:
+            self.data = init_day_data(self._meetings)
+        else:
+            with open(self.filepath, "r") as f:
+                self.data = json.load(f)
+
+        pending = [
+            race_key for race_key in self._program_races
+            if race_key in self.data and "ordreArrivee" not in self.data[race_key]
+        ]
+        if self.is_new_file:
+            # Write the day metadata right away, before the first race poll
+            self._save_races([])
+
+        outcomes = await gather(
+            *[self._poll_race(program_url, race_key) for race_key in pending], return_exceptions=True
+        )
+        for race_key, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"\033[91m{race_key}: polling stopped, {type(outcome).__name__}: {outcome}\033[0m")
+
+
+async def poll_day(
+    _date: date,
+    base_folder: str = "data/raw",
+    snapshot_log: bool = True,
+    max_concurrency: int = 20,
+    rate: float = 20.0,
+    base_url: str = BASE_URL,
+    catalog_path: Optional[str] = None,
+) -> None:
+    """
+    catalog_path: SQLite catalog updated after every write (none by default)
+    """
+    data_folder = os.path.join(base_folder, str(_date.year))
+    os.makedirs(data_folder, exist_ok=True)
+    timer = EndpointTimer()
+    catalog = RaceCatalog(base_folder, catalog_path) if catalog_path else None
+    try:
+        async with RateLimitedClient(max_concurrency, rate) as client:
+            poller = LivePoller(
+                client, data_folder, snapshot_log=snapshot_log, catalog=catalog, timer=timer, base_url=base_url
+            )
+            await poller.run(_date)
+    finally:
+        if catalog is not None:
+            catalog.close()
+
+    print(f"Done, {poller.requests} requests")
+    for endpoint, stats in timer.summary().items():
+        print(f"{endpoint}: {stats['count']} calls, mean {stats['mean']:.3f}s, p95 {stats['p95']:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Poll today's races until all the results are in")
+    parser.add_argument("--data-folder", default="data/raw")
+    parser.add_argument("--no-snapshot-log", action="store_true", help="Rewrite the whole day file on every poll")
+    parser.add_argument("--base-url", default=BASE_URL, help="PMU API programme URL")
+    parser.add_argument("--catalog", action="store_true", help=f"Update the {DEFAULT_DB_PATH} catalog")
+    parser.add_argument("--catalog-path", help="Update this SQLite catalog instead (implies --catalog)")
+    parser.add_argument("--metrics-prometheus", help="Write metrics to this Prometheus text file")
+    parser.add_argument("--metrics-jsonl", help="Append metrics to this JSON lines file")
+    args = parser.parse_args()
+
+    sink = metrics.configure(args.metrics_prometheus, args.metrics_jsonl)
+    try:
+        run(poll_day(
+            date.today(), args.data_folder, not args.no_snapshot_log, base_url=args.base_url,
+            catalog_path=args.catalog_path or (DEFAULT_DB_PATH if args.catalog else None),
+        ))
+    finally:
+        report = diagnostics.report()
+        if report:
+            print(f"Mapping diagnostics:\n{report}")
+        sink.close()
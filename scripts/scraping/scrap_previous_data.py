@@ -1,23 +1,80 @@
 import os
+from argparse import ArgumentParser
 from datetime import date, timedelta
-from asyncio import run
+from asyncio import Semaphore, gather, run
+from typing import Optional
 
-from scripts.scraping.scraper import scrap_day
+from scripts.scraping.scraper import BASE_URL, scrap_day
+from scripts.scraping.http_client import RateLimitedClient
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.catalog import DEFAULT_DB_PATH, RaceCatalog
+from src.utils import metrics
+
+
+async def backfill(
+    start_date: date,
+    end_date: date,
+    base_folder: str = "data/raw",
+    day_concurrency: int = 8,
+    max_concurrency: int = 20,
+    rate: float = 20.0,
+    retries: int = 3,
+    base_url: str = BASE_URL,
+    catalog_path: Optional[str] = None,
+) -> None:
+    """
+    Scrap every day between start_date and end_date (inclusive) in a single event loop,
+    over one pooled and rate limited client
+    catalog_path: SQLite catalog updated after every day file write (none by default)
+    """
+    catalog = RaceCatalog(base_folder, catalog_path) if catalog_path else None
+    days = Semaphore(day_concurrency)
+
+    async def scrap_one(client: RateLimitedClient, current_date: date) -> None:
+        data_folder = os.path.join(base_folder, str(current_date.year))
+        os.makedirs(data_folder, exist_ok=True)
+        async with days:
+            print(f"Scraping {current_date}")
+            try:
+                await scrap_day(current_date, data_folder, catalog, client, base_url=base_url)
+            except Exception as e:
+                metrics.increment("scraper_failed_days_total")
+                print(f"\033[91m{current_date}: {e}\033[0m")
+
+    n_days = (end_date - start_date).days + 1
+    try:
+        async with RateLimitedClient(max_concurrency, rate, retries) as client:
+            await gather(*[scrap_one(client, start_date + timedelta(days=i)) for i in range(n_days)])
+    finally:
+        if catalog is not None:
+            catalog.close()
 
 
 if __name__ == "__main__":
-    year = 2020
-    start_date = date(year, 1, 1)
-    end_date = date(year, 12, 31)
-    data_folder = f"data/raw/{year}"
-    os.makedirs(data_folder, exist_ok=True)
-
-    current_date = start_date
-    while current_date < end_date:
-        print(f"Scraping {current_date}")
-        try:
-            run(scrap_day(current_date, data_folder))
-        except BaseException as e:
-            print(f"\033[91m{e}\033[0m")
-
-        current_date += timedelta(days=1)
+    parser = ArgumentParser(description="Backfill PMU data between two dates")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2020, 1, 1), help="YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2020, 12, 31), help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--data-folder", default="data/raw")
+    parser.add_argument("--days", type=int, default=8, help="Days scraped at once")
+    parser.add_argument("--concurrency", type=int, default=20, help="Max simultaneous requests")
+    parser.add_argument("--rate", type=float, default=20.0, help="Max requests per second")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--base-url", default=BASE_URL, help="PMU API programme URL")
+    parser.add_argument("--catalog", action="store_true", help=f"Update the {DEFAULT_DB_PATH} catalog")
+    parser.add_argument("--catalog-path", help="Update this SQLite catalog instead (implies --catalog)")
+    parser.add_argument("--metrics-prometheus", help="Write metrics to this Prometheus text file")
+    parser.add_argument("--metrics-jsonl", help="Append metrics to this JSON lines file")
+    args = parser.parse_args()
+
+    catalog_path = args.catalog_path or (DEFAULT_DB_PATH if args.catalog else None)
+    sink = metrics.configure(args.metrics_prometheus, args.metrics_jsonl)
+    try:
+        run(backfill(
+            args.start, args.end, args.data_folder, args.days, args.concurrency, args.rate, args.retries, args.base_url,
+            catalog_path,
+        ))
+    finally:
+        report = diagnostics.report()
+        if report:
+            print(f"Mapping diagnostics:\n{report}")
+        sink.close()
@@ -1,10 +1,19 @@
 import os
 import json
-from typing import Any
+from time import perf_counter
+from argparse import ArgumentParser
+from typing import Any, Optional
 from datetime import date, datetime
+from collections import defaultdict
 
 from asyncio import gather, run
-from httpx import AsyncClient
+from httpx import AsyncClient, Response
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.catalog import RaceCatalog
+from src.data_access.storage.enjeux_codec import unpack_enjeux
+from src.data_access.storage.snapshot_log import SNAPSHOT_KEYS, append_snapshot, write_json_atomic
+from src.utils import metrics
 
 
 BASE_URL = "https://online.turfinfo.api.pmu.fr/rest/client/61/programme"
@@ -21,15 +30,70 @@ def get_race_key(race_input: dict[str, Any]) -> str:
     return f"R{race_input['numReunion']}C{race_input['numOrdre']}"
 
 
+class EndpointTimer:
+    """
+    Latencies (in seconds) of the calls to each PMU endpoint
+    """
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self.latencies[endpoint].append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        summary = {}
+        for endpoint, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            summary[endpoint] = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1],
+            }
+        return summary
+
+
+async def timed_get(client: AsyncClient, url: str, endpoint: str, timer: Optional[EndpointTimer] = None) -> Response:
+    """
+    GET with its latency recorded in the timer and in the metrics sink, per endpoint
+    """
+    if timer is None and not metrics.enabled():
+        return await client.get(url)
+
+    start = perf_counter()
+    response = await client.get(url)
+    seconds = perf_counter() - start
+    if timer is not None:
+        timer.record(endpoint, seconds)
+    metrics.timing("scraper_http_seconds", seconds, endpoint=endpoint)
+    metrics.increment("scraper_http_requests_total", endpoint=endpoint, status=response.status_code)
+    return response
+
+
+def decode_json(response: Response, endpoint: str) -> Any:
+    with metrics.timer("scraper_json_decode_seconds", endpoint=endpoint):
+        return response.json()
+
+
 async def fetch_planned_race(
-    client: AsyncClient, program_url: str, race_input: dict[str, Any], race_output: dict[str, Any]
+    client: AsyncClient,
+    program_url: str,
+    race_input: dict[str, Any],
+    race_output: dict[str, Any],
+    timer: Optional[EndpointTimer] = None,
 ) -> tuple[str, dict[str, Any]]:
     """
     Fetch a race that is not finished yet
     """
     race_url = f"{program_url}/R{race_input['numReunion']}/C{race_input['numOrdre']}"
-    response = await client.get(race_url + "/participants" + SUFFIX)
-    participants = response.json()["participants"]
+    # Both endpoints are independent, fetch them at once
+    participants_response, combinations_response = await gather(
+        timed_get(client, race_url + "/participants" + SUFFIX, "participants", timer),
+        timed_get(client, race_url + "/combinaisons" + SUFFIX, "combinaisons", timer),
+    )
+    participants = decode_json(participants_response, "participants")["participants"]
 
     # Odds
     race_output["rapports"] = race_output.get("rapports", {})
@@ -52,9 +116,9 @@ async def fetch_planned_race(
             race_output["rapports"][p][odds_date] = odds
 
     # Betting amounts
-    response = await client.get(race_url + "/combinaisons" + SUFFIX)
-    combinations = response.json()["combinaisons"]
-    betting_amounts = race_output.get("enjeux", {})
+    combinations = decode_json(combinations_response, "combinaisons")["combinaisons"]
+    # A compacted day file holds packed amounts, back to the nested format before adding snapshots
+    betting_amounts = unpack_enjeux(race_output.get("enjeux", {}))
     for bet in combinations:
         bet_kind = bet["pariType"]
         betting_amounts[bet_kind] = betting_amounts.get(bet_kind, {})
@@ -89,6 +153,14 @@ async def fetch_planned_race(
                 "indicateurInedit",
                 "driver",
                 "entraineur",
+                # Horse identity, see src/data_access/mappers/horse_identity.py
+                "nom",
+                "sexe",
+                "race",
+                "nomPere",
+                "nomMere",
+                "nomPereMere",
+                "eleveur",
             ]
         } | participant.get("gainsParticipant", {})
 
@@ -96,7 +168,11 @@ async def fetch_planned_race(
 
 
 async def fetch_finished_race(
-    client: AsyncClient, program_url: str, race_input: dict[str, Any], race_output: dict[str, Any]
+    client: AsyncClient,
+    program_url: str,
+    race_input: dict[str, Any],
+    race_output: dict[str, Any],
+    timer: Optional[EndpointTimer] = None,
 ) -> tuple[str, dict[str, Any]]:
     """
     Fetch a race that is finished
@@ -106,8 +182,8 @@ async def fetch_finished_race(
 
     # Final odds
     race_url = f"{program_url}/R{race_input['numReunion']}/C{race_input['numOrdre']}"
-    response = await client.get(race_url + "/rapports-definitifs" + SUFFIX)
-    final_odds = response.json()
+    response = await timed_get(client, race_url + "/rapports-definitifs" + SUFFIX, "rapports-definitifs", timer)
+    final_odds = decode_json(response, "rapports-definitifs")
     race_output["rapportsDefinitifs"] = {}
     for bet in final_odds:
         bet_kind = bet["typePari"]
@@ -118,79 +194,190 @@ async def fetch_finished_race(
     return get_race_key(race_input), race_output
 
 
-async def scrap_day(_date: date, data_folder: str = DATA_FOLDER) -> None:
-    program_url = f"{BASE_URL}/{_date.strftime('%d%m%Y')}"
+def is_newly_finished(race_input: dict[str, Any], race_output: dict[str, Any]) -> bool:
+    return (
+        race_input.get("rapportsDefinitifsDisponibles", False)
+        and ("ordreArrivee" not in race_output)
+        and ("ordreArrivee" in race_input)
+    )
+
+
+async def fetch_race(
+    client: AsyncClient,
+    program_url: str,
+    race_input: dict[str, Any],
+    race_output: dict[str, Any],
+    timer: Optional[EndpointTimer] = None,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Fetch every endpoint of a race at once. Planned and finished fetches fill
+    distinct keys of race_output, so they can run concurrently
+    """
+    fetches = [fetch_planned_race(client, program_url, race_input, race_output, timer)]
+    if is_newly_finished(race_input, race_output):
+        fetches.append(fetch_finished_race(client, program_url, race_input, race_output, timer))
+
+    await gather(*fetches)
+    return get_race_key(race_input), race_output
+
+
+def get_day_filepath(_date: date, data_folder: str = DATA_FOLDER) -> str:
+    return os.path.join(data_folder, _date.strftime("%d_%m_%Y") + ".json")
+
+
+def init_day_data(meetings: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Build the day data from the program metadata
+    """
+    race_metadata = [
+        "heureDepart",
+        "montantPrix",
+        "distance",
+        "discipline",
+        "specialite",
+        "nombreDeclaresPartants",
+        "conditionSexe",
+        "grandPrixNationalTrot",
+        "montantOffert1er",
+        "montantOffert2eme",
+        "montantOffert3eme",
+    ]
+    meeting_metadata = ["nature", "hippodrome", "meteo"]
+    return {
+        get_race_key(race): (sub_dict(race, race_metadata) | sub_dict(meeting, meeting_metadata))
+        for meeting in meetings
+        for race in meeting["courses"]
+    }
+
+
+def get_race_output(data: dict[str, Any], race_key: str, snapshot_log: bool = False) -> dict[str, Any]:
+    """
+    Dict a race is fetched into. In snapshot log mode, odds and betting amounts
+    start empty so that they only hold the new snapshot
+    """
+    if not snapshot_log:
+        return data[race_key]
+    return {k: v for k, v in data[race_key].items() if k not in SNAPSHOT_KEYS}
+
+
+def save_races(
+    filepath: str,
+    data: dict[str, Any],
+    fetched_races: list[tuple[str, dict[str, Any]]],
+    is_new_file: bool,
+    snapshot_log: bool = False,
+    catalog: Optional[RaceCatalog] = None,
+) -> None:
+    """
+    Merge fetched races into the day data and persist them
+    """
+    if snapshot_log:
+        snapshot = {
+            race_key: {key: race_output.pop(key, {}) for key in SNAPSHOT_KEYS}
+            for race_key, race_output in fetched_races
+        }
+        # The day file is only rewritten when something else than odds changed
+        changed = is_new_file or any(
+            data[race_key].get(key) != value
+            for race_key, race_output in fetched_races
+            for key, value in race_output.items()
+        )
+        for race_key, race_output in fetched_races:
+            data[race_key].update(race_output)
+
+        if changed:
+            with metrics.timer("scraper_write_seconds", kind="day_file"):
+                write_json_atomic(filepath, data, indent=2)
+        with metrics.timer("scraper_write_seconds", kind="snapshot"):
+            append_snapshot(filepath, snapshot)
+    else:
+        # Update data
+        for race_key, race_output in fetched_races:
+            data[race_key] = race_output
+
+        with metrics.timer("scraper_write_seconds", kind="day_file"):
+            write_json_atomic(filepath, data, indent=2)
+
+    if catalog:
+        with metrics.timer("scraper_write_seconds", kind="catalog"):
+            catalog.update_file(filepath, data)
+
+
+async def scrap_day(
+    _date: date,
+    data_folder: str = DATA_FOLDER,
+    catalog: Optional[RaceCatalog] = None,
+    client: Optional[AsyncClient] = None,
+    timer: Optional[EndpointTimer] = None,
+    snapshot_log: bool = False,
+    base_url: str = BASE_URL,
+) -> None:
+    """
+    Scrap one day. A shared client (AsyncClient or RateLimitedClient) can be
+    given to reuse its connection pool across days, and a timer to collect
+    the latency of each endpoint.
+    With snapshot_log, odds and betting amounts are appended to the day log
+    instead of rewriting the whole day file on every poll.
+    base_url allows to target another PMU API, e.g. the local stand-in
+    """
+    if client is None:
+        async with AsyncClient() as client:
+            return await scrap_day(_date, data_folder, catalog, client, timer, snapshot_log, base_url)
+
+    program_url = f"{base_url}/{_date.strftime('%d%m%Y')}"
 
     # Fetch the program of the day
-    async with AsyncClient() as client:
-        response = await client.get(program_url + SUFFIX + "&meteo=true")
-        meetings = response.json()["programme"]["reunions"]
-        races = [race for meeting in meetings for race in meeting["courses"]]
+    response = await timed_get(client, program_url + SUFFIX + "&meteo=true", "programme", timer)
+    meetings = decode_json(response, "programme")["programme"]["reunions"]
+    races = [race for meeting in meetings for race in meeting["courses"]]
 
     # Init data or load current version
-    filepath = os.path.join(data_folder, _date.strftime("%d_%m_%Y") + ".json")
-    if os.path.exists(filepath):
-        with open(filepath, "r+") as f:
+    filepath = get_day_filepath(_date, data_folder)
+    is_new_file = not os.path.exists(filepath)
+    if not is_new_file:
+        with metrics.timer("scraper_read_seconds"), open(filepath, "r+") as f:
             data = json.load(f)
 
         if all("ordreArrivee" in v for k, v in data.items()):
             # We already have all that we need
             return
     else:
-        race_metadata = [
-            "heureDepart",
-            "montantPrix",
-            "distance",
-            "discipline",
-            "specialite",
-            "nombreDeclaresPartants",
-            "conditionSexe",
-            "grandPrixNationalTrot",
-            "montantOffert1er",
-            "montantOffert2eme",
-            "montantOffert3eme",
+        data = init_day_data(meetings)
+
+    # Fetch races data, all endpoints of all races at once
+    fetched_races = await gather(
+        *[
+            fetch_race(client, program_url, race, get_race_output(data, get_race_key(race), snapshot_log), timer)
+            for race in races
+            # if race["categorieStatut"] == "A_PARTIR"
         ]
-        meeting_metadata = ["nature", "hippodrome", "meteo"]
-        data = {
-            get_race_key(race): (sub_dict(race, race_metadata) | sub_dict(meeting, meeting_metadata))
-            for meeting in meetings
-            for race in meeting["courses"]
-        }
-
-    # Fetch races data
-    async with AsyncClient() as client:
-        planned_races = await gather(
-            *[
-                fetch_planned_race(client, program_url, race, data[get_race_key(race)])
-                for race in races
-                # if race["categorieStatut"] == "A_PARTIR"
-            ]
-        )
-
-        finished_races = await gather(
-            *[
-                fetch_finished_race(client, program_url, race, data[get_race_key(race)])
-                for race in races
-                if (
-                    race.get("rapportsDefinitifsDisponibles", False)
-                    and ("ordreArrivee" not in data[get_race_key(race)])
-                    and ("ordreArrivee" in race)
-                )
-            ]
-        )
-
-    # Update data
-    for race_key, race_output in planned_races + finished_races:
-        data[race_key] = race_output
+    )
 
-    with open(filepath, "w+") as f:
-        json.dump(data, f, indent=2)
+    save_races(filepath, data, fetched_races, is_new_file, snapshot_log, catalog)
+    metrics.increment("scraper_races_total", len(fetched_races))
 
 
 if __name__ == "__main__":
+    parser = ArgumentParser(description="Scrap today's races")
+    parser.add_argument(
+        "--snapshot-log", action="store_true", help="Append odds and betting amounts to the day log"
+    )
+    parser.add_argument("--metrics-prometheus", help="Write metrics to this Prometheus text file")
+    parser.add_argument("--metrics-jsonl", help="Append metrics to this JSON lines file")
+    args = parser.parse_args()
+
+    sink = metrics.configure(args.metrics_prometheus, args.metrics_jsonl)
+    timer = EndpointTimer()
     try:
-        run(scrap_day(date.today()))
+        run(scrap_day(date.today(), timer=timer, snapshot_log=args.snapshot_log))
+        for endpoint, stats in timer.summary().items():
+            print(f"{endpoint}: {stats['count']} calls, mean {stats['mean']:.3f}s, p95 {stats['p95']:.3f}s")
     except Exception as e:
         print(e)
         with open(DATA_FOLDER + date.today().strftime("%d_%m_%Y") + ".txt", "a+") as f:
             f.write(f"{datetime.now().strftime('%H:%M %Ss')} - {e}\n")
+    finally:
+        report = diagnostics.report()
+        if report:
+            print(f"Mapping diagnostics:\n{report}")
+        sink.close()
@@ -0,0 +1,36 @@
+from argparse import ArgumentParser
+from datetime import date
+
+from src.models.prediction_service import (
+    DEFAULT_REFRESH_INTERVAL, ImpliedOddsModel, PredictionService, Predictor, load_model, make_server
+)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Service HTTP local de prédiction des courses du jour")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--date", type=date.fromisoformat, help="Jour servi, YYYY-MM-DD (aujourd'hui par défaut)")
+    parser.add_argument(
+        "--model", help="Fichier pickle/joblib ou URI MLflow (runs:/..., models:/...), probabilités implicites des cotes par défaut"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--refresh-interval", type=float, default=DEFAULT_REFRESH_INTERVAL,
+                        help="Secondes entre deux vérifications du fichier jour")
+    parser.add_argument("--no-musique-stats", action="store_true", help="Sans les statistiques de musique")
+    args = parser.parse_args()
+
+    model = load_model(args.model) if args.model else ImpliedOddsModel()
+    service = PredictionService(
+        Predictor(model), args.base_path, args.date, not args.no_musique_stats, args.refresh_interval
+    )
+    print(f"{service.preload()} courses préchargées")
+
+    server = make_server(service, args.host, args.port)
+    print(f"En écoute sur http://{args.host}:{server.server_address[1]} (GET /races, /races/<RxCy>, /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,21 @@
+from argparse import ArgumentParser
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.catalog import DEFAULT_DB_PATH, RaceCatalog
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Construit ou met à jour le catalogue SQLite des fichiers jour")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH)
+    parser.add_argument("--year", type=int, help="Année à indexer (toutes par défaut)")
+    args = parser.parse_args()
+
+    catalog = RaceCatalog(args.base_path, args.db_path)
+    updated = catalog.refresh(args.year)
+    print(f"{updated} fichiers réindexés")
+    catalog.close()
+
+    ignored = diagnostics.report()
+    if ignored:
+        print(f"Valeurs ignorées par les mappers :\n{ignored}")
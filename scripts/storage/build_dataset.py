@@ -0,0 +1,27 @@
+from argparse import ArgumentParser
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.models.dataset import DatasetBuilder
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Construit ou met à jour le dataset d'entraînement (un shard .npz par jour)")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--output", default="data/datasets/runners")
+    parser.add_argument("--years", type=int, nargs="*", help="Années à construire (toutes par défaut)")
+    parser.add_argument("--workers", type=int, help="Processus de construction (nombre de coeurs par défaut)")
+    parser.add_argument("--no-musique-stats", action="store_true", help="Sans les statistiques de musique")
+    args = parser.parse_args()
+
+    builder = DatasetBuilder(args.base_path, args.output, not args.no_musique_stats, args.workers)
+    report = builder.build(args.years or None)
+    print(
+        f"{report.built} shards construits ({report.runners} partants), {report.skipped} à jour, "
+        f"{report.removed} supprimés (version des features {builder.version[:12]})"
+    )
+    for relpath, error in report.failed.items():
+        print(f"Échec {relpath} : {error}")
+
+    ignored = diagnostics.report()
+    if ignored:
+        print(f"Valeurs ignorées par les mappers :\n{ignored}")
@@ -0,0 +1,26 @@
+from argparse import ArgumentParser
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.feature_store import FeatureStore
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Construit ou met à jour le magasin de features point-in-time")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--db-path", default="data/features.sqlite")
+    parser.add_argument("--year", type=int, help="Année à indexer (toutes par défaut)")
+    parser.add_argument("--export", help="Écrit les features de l'année (--year) dans ce fichier parquet")
+    args = parser.parse_args()
+
+    store = FeatureStore(args.base_path, args.db_path, auto_refresh=False)
+    updated = store.refresh(args.year)
+    print(f"{updated} fichiers réindexés")
+    if args.export and args.year:
+        frame = store.training_frame([args.year])
+        frame.to_parquet(args.export, index=False)
+        print(f"{len(frame)} partants exportés dans {args.export}")
+    store.close()
+
+    ignored = diagnostics.report()
+    if ignored:
+        print(f"Valeurs ignorées par les mappers :\n{ignored}")
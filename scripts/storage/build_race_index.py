@@ -0,0 +1,28 @@
+import os
+from argparse import ArgumentParser
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.columnar_store import list_day_files
+from src.data_access.storage.race_index import load_race_index
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Construit les index de courses (.json.idx) des fichiers jour qui n'en ont pas d'à jour")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--year", type=int, help="Année à indexer (toutes par défaut)")
+    args = parser.parse_args()
+
+    years = [str(args.year)] if args.year else sorted(
+        item for item in os.listdir(args.base_path)
+        if item.isdigit() and os.path.isdir(os.path.join(args.base_path, item))
+    )
+    indexed = 0
+    for year in years:
+        year_dir = os.path.join(args.base_path, year)
+        for file_name in list_day_files(year_dir):
+            indexed += load_race_index(os.path.join(year_dir, file_name)) is not None
+    print(f"{indexed} fichiers jour indexés")
+
+    ignored = diagnostics.report()
+    if ignored:
+        print(f"Valeurs ignorées par les mappers :\n{ignored}")
@@ -0,0 +1,31 @@
+import os
+from argparse import ArgumentParser
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.columnar_store import ColumnarStore
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compacte les fichiers jour JSON en stockage colonnaire par année")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--columnar-path", default="data/columnar")
+    parser.add_argument("--years", type=int, nargs="*", help="Années à compacter (toutes par défaut)")
+    args = parser.parse_args()
+
+    years = args.years or sorted(
+        int(item) for item in os.listdir(args.base_path)
+        if item.isdigit() and os.path.isdir(os.path.join(args.base_path, item))
+    )
+
+    store = ColumnarStore(args.base_path, args.columnar_path)
+    for year in years:
+        if store.has_year(year):
+            print(f"{year} déjà à jour")
+            continue
+        print(f"Compaction de {year}")
+        n_races = store.compact_year(year)
+        print(f"{year}: {n_races} courses")
+
+    ignored = diagnostics.report()
+    if ignored:
+        print(f"Valeurs ignorées par les mappers :\n{ignored}")
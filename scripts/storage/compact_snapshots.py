@@ -0,0 +1,30 @@
+import os
+from argparse import ArgumentParser
+from datetime import date
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.data_access.storage.columnar_store import list_day_files, parse_day_file_name
+from src.data_access.storage.snapshot_log import compact_day
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Réintègre les journaux de cotes et d'enjeux dans les fichiers jour")
+    parser.add_argument("--base-path", default="data/raw")
+    parser.add_argument("--include-today", action="store_true", help="Compacte aussi le jour en cours de scraping")
+    parser.add_argument("--pack-enjeux", action="store_true", help="Convertit les enjeux au format compact")
+    args = parser.parse_args()
+
+    for year in sorted(os.listdir(args.base_path)):
+        year_dir = os.path.join(args.base_path, year)
+        if not (year.isdigit() and os.path.isdir(year_dir)):
+            continue
+        for file_name in list_day_files(year_dir):
+            if parse_day_file_name(file_name) == date.today() and not args.include_today:
+                continue
+            merged = compact_day(os.path.join(year_dir, file_name), args.pack_enjeux)
+            if merged:
+                print(f"{file_name}: {merged} segments fusionnés")
+
+    ignored = diagnostics.report()
+    if ignored:
+        print(f"Valeurs ignorées par les mappers :\n{ignored}")
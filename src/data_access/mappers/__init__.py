@@ -1,10 +1,41 @@
+from src.data_access.mappers.common_mapper import diagnostics, enum_lookup, MappingDiagnostics, EnumLookup
 from src.data_access.mappers.race_mapper import map_json_to_race
-from src.data_access.mappers.horse_mapper import map_json_to_horses, map_json_to_horse
+from src.data_access.mappers.horse_mapper import map_json_to_horses, map_json_to_horse, map_json_to_odds_panel
 from src.data_access.mappers.result_mapper import map_json_to_result
+from src.data_access.mappers.pool_mapper import map_json_to_pool, map_json_to_pools, map_json_to_pool_features
+from src.data_access.mappers.musique_parser import (
+    parse_musique, musique_features, musique_features_batch, ParsedMusique
+)
+from src.data_access.mappers.batch_mapper import (
+    races_to_columns, runners_to_columns, results_to_columns, dividends_to_columns,
+    races_to_dataframe, runners_to_dataframe, results_to_dataframe, dividends_to_dataframe,
+    map_day_files_to_dataframes
+)
 
 __all__ = [
     'map_json_to_race',
     'map_json_to_horses',
     'map_json_to_horse',
-    'map_json_to_result'
+    'map_json_to_odds_panel',
+    'map_json_to_result',
+    'map_json_to_pool',
+    'map_json_to_pools',
+    'map_json_to_pool_features',
+    'races_to_columns',
+    'runners_to_columns',
+    'results_to_columns',
+    'dividends_to_columns',
+    'races_to_dataframe',
+    'runners_to_dataframe',
+    'results_to_dataframe',
+    'dividends_to_dataframe',
+    'map_day_files_to_dataframes',
+    'parse_musique',
+    'musique_features',
+    'musique_features_batch',
+    'ParsedMusique',
+    'diagnostics',
+    'enum_lookup',
+    'MappingDiagnostics',
+    'EnumLookup'
 ]
\ No newline at end of file
@@ -0,0 +1,372 @@
+import os
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from src.domain.entities.enums import (
+    ConditionSexe, Discipline, Nature, NebulositeCode, Specialite, TypeDeferre, TypeOeilleres
+)
+from src.data_access.mappers.common_mapper import diagnostics, enum_lookup
+from src.data_access.mappers.horse_identity import resolve_horse_id
+from src.data_access.mappers.musique_parser import musique_features_batch
+from src.data_access.storage.snapshot_log import load_day_file
+
+# Jour à convertir : (date "DD_MM_YYYY", contenu du fichier jour)
+DayData = Tuple[str, Dict[str, Any]]
+
+MISSING_CODE = -1
+
+# Colonne -> (énumération, valeur par défaut), mêmes défauts que les mappers unitaires
+ENUM_COLUMNS: Dict[str, Tuple[Type[Enum], Optional[Enum]]] = {
+    "discipline": (Discipline, Discipline.ATTELE),
+    "specialite": (Specialite, Specialite.TROT_ATTELE),
+    "condition_sexe": (ConditionSexe, ConditionSexe.MIXTE),
+    "nature": (Nature, None),
+    "meteo_nebulosite_code": (NebulositeCode, NebulositeCode.P0),
+    "oeilleres": (TypeOeilleres, TypeOeilleres.SANS_OEILLERES),
+    "deferre": (TypeDeferre, TypeDeferre.NON_DEFERRE),
+}
+
+
+def enum_categories(enum_class: Type[Enum]) -> List[str]:
+    """Catégories d'une énumération (noms des membres), dans l'ordre des codes"""
+    return [member.name for member in enum_class]
+
+
+_LOOKUPS = {column: enum_lookup(enum_class) for column, (enum_class, _) in ENUM_COLUMNS.items()}
+_DEFAULT_CODES = {
+    column: _LOOKUPS[column].code(default) if default is not None else MISSING_CODE
+    for column, (_, default) in ENUM_COLUMNS.items()
+}
+# Nom du champ JSON dans les diagnostics, le même que celui des mappers unitaires
+_FIELDS = {"condition_sexe": "conditionSexe", "meteo_nebulosite_code": "meteo.nebulositeCode"}
+
+
+def _encode_column(column: str, values: List[Any]) -> np.ndarray:
+    return _LOOKUPS[column].encode_column(values, _DEFAULT_CODES[column], _FIELDS.get(column, column))
+
+
+def _optional_int(values: List[Optional[int]], field: str = "entier") -> np.ndarray:
+    """Entiers optionnels en float64, NaN pour les valeurs absentes (null) ou invalides"""
+    try:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    except (ValueError, TypeError):
+        out = np.full(len(values), np.nan, dtype=np.float64)
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            try:
+                out[i] = value
+            except (ValueError, TypeError):
+                diagnostics.record(field, value)
+        return out
+
+
+def _timestamps(values: List[Optional[int]], field: str = "timestamp") -> np.ndarray:
+    """Timestamps en millisecondes vers datetime64[ms] (UTC), NaT pour les valeurs absentes ou invalides"""
+    nat = np.iinfo(np.int64).min
+    try:
+        out = np.array([nat if value is None else value for value in values], dtype=np.int64)
+    except (ValueError, TypeError, OverflowError):
+        out = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            if value is None:
+                out[i] = nat
+                continue
+            try:
+                out[i] = value
+            except (ValueError, TypeError, OverflowError):
+                diagnostics.record(field, value)
+                out[i] = nat
+    return out.view("datetime64[ms]")
+
+
+def _dates(date_strs: List[str]) -> np.ndarray:
+    """Dates "DD_MM_YYYY" vers datetime64[D], une conversion par jour distinct"""
+    converted: Dict[str, np.datetime64] = {}
+    out = np.empty(len(date_strs), dtype="datetime64[D]")
+    for i, date_str in enumerate(date_strs):
+        value = converted.get(date_str)
+        if value is None:
+            day, month, year = date_str.split("_")
+            value = converted[date_str] = np.datetime64(f"{year}-{month}-{day}", "D")
+        out[i] = value
+    return out
+
+
+def races_to_columns(days: Iterable[DayData]) -> Dict[str, np.ndarray]:
+    """Une ligne par course, colonnes NumPy (énumérations encodées en entiers)"""
+    date_strs, race_ids = [], []
+    heure_depart, montant_prix, distance, nombre_participants = [], [], [], []
+    discipline, specialite, condition_sexe, nature = [], [], [], []
+    hippodrome_code, hippodrome_libelle_court = [], []
+    nebulosite, temperature, force_vent, direction_vent = [], [], [], []
+    grand_prix, offert_1er, offert_2eme, offert_3eme = [], [], [], []
+
+    for date_str, data in days:
+        for race_id, race in data.items():
+            date_strs.append(date_str)
+            race_ids.append(race_id)
+            heure_depart.append(race.get("heureDepart"))
+            montant_prix.append(race.get("montantPrix", 0))
+            distance.append(race.get("distance", 0))
+            nombre_participants.append(race.get("nombreDeclaresPartants", 0))
+            discipline.append(race.get("discipline"))
+            specialite.append(race.get("specialite"))
+            condition_sexe.append(race.get("conditionSexe"))
+            nature.append(race.get("nature"))
+            hippodrome = race.get("hippodrome") or {}
+            hippodrome_code.append(hippodrome.get("code", ""))
+            hippodrome_libelle_court.append(hippodrome.get("libelleCourt", ""))
+            meteo = race.get("meteo") or {}
+            nebulosite.append(meteo.get("nebulositeCode"))
+            temperature.append(meteo.get("temperature", 0))
+            force_vent.append(meteo.get("forceVent", 0))
+            direction_vent.append(meteo.get("directionVent", ""))
+            grand_prix.append(race.get("grandPrixNationalTrot", False))
+            offert_1er.append(race.get("montantOffert1er"))
+            offert_2eme.append(race.get("montantOffert2eme"))
+            offert_3eme.append(race.get("montantOffert3eme"))
+
+    return {
+        "date": _dates(date_strs),
+        "race_id": np.array(race_ids, dtype=object),
+        "heure_depart": _timestamps(heure_depart, "heureDepart"),
+        "montant_prix": _optional_int(montant_prix, "montantPrix"),
+        "distance": _optional_int(distance, "distance"),
+        "discipline": _encode_column("discipline", discipline),
+        "specialite": _encode_column("specialite", specialite),
+        "nombre_participants": _optional_int(nombre_participants, "nombreDeclaresPartants"),
+        "condition_sexe": _encode_column("condition_sexe", condition_sexe),
+        "hippodrome_code": np.array(hippodrome_code, dtype=object),
+        "hippodrome_libelle_court": np.array(hippodrome_libelle_court, dtype=object),
+        "meteo_nebulosite_code": _encode_column("meteo_nebulosite_code", nebulosite),
+        "meteo_temperature": _optional_int(temperature, "meteo.temperature"),
+        "meteo_force_vent": _optional_int(force_vent, "meteo.forceVent"),
+        "meteo_direction_vent": np.array(direction_vent, dtype=object),
+        "grand_prix_national_trot": np.array(grand_prix, dtype=bool),
+        "montant_offert_1er": _optional_int(offert_1er, "montantOffert1er"),
+        "montant_offert_2eme": _optional_int(offert_2eme, "montantOffert2eme"),
+        "montant_offert_3eme": _optional_int(offert_3eme, "montantOffert3eme"),
+        "nature": _encode_column("nature", nature),
+    }
+
+
+# Colonne -> (clé JSON, valeur par défaut) des caractéristiques numériques des partants
+RUNNER_INT_FIELDS = {
+    "age": ("age", 0),
+    "nombre_courses": ("nombreCourses", 0),
+    "nombre_victoires": ("nombreVictoires", 0),
+    "nombre_places": ("nombrePlaces", 0),
+    "nombre_places_second": ("nombrePlacesSecond", 0),
+    "nombre_places_troisieme": ("nombrePlacesTroisieme", 0),
+    "gains_carriere": ("gainsCarriere", 0),
+    "gains_victoires": ("gainsVictoires", 0),
+    "gains_place": ("gainsPlace", 0),
+    "gains_annee_en_cours": ("gainsAnneeEnCours", 0),
+    "gains_annee_precedente": ("gainsAnneePrecedente", 0),
+}
+RUNNER_BOOL_FIELDS = {
+    "driver_change": ("driverChange", False),
+    "indicateur_inedit": ("indicateurInedit", False),
+}
+RUNNER_STR_FIELDS = {
+    "musique": ("musique", ""),
+    "avis_entraineur": ("avisEntraineur", None),
+    "driver": ("driver", ""),
+    "entraineur": ("entraineur", ""),
+    "nom": ("nom", None),
+    "sexe": ("sexe", None),
+    "nom_pere": ("nomPere", None),
+    "nom_mere": ("nomMere", None),
+}
+
+
+def runners_to_columns(days: Iterable[DayData], musique_stats: bool = False,
+                       odds_lead_time: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Une ligne par partant, colonnes NumPy
+    Les cotes sont résumées par la dernière cote relevée et le nombre de relevés, au plus tard
+    odds_lead_time secondes avant l'heure de départ : le scraper continue de relever les cotes
+    des courses commencées, qui ne sont pas connues avant la course
+    musique_stats ajoute les statistiques de forme de la musique (musique_parser.FEATURE_NAMES)
+    """
+    date_strs, race_ids, numeros, horse_ids = [], [], [], []
+    runners: List[Dict[str, Any]] = []
+    derniere_cote, nombre_cotes = [], []
+
+    for date_str, data in days:
+        for race_id, race in data.items():
+            rapports = race.get("rapports", {})
+            heure_depart = race.get("heureDepart")
+            cutoff = heure_depart - odds_lead_time * 1000 if isinstance(heure_depart, (int, float)) else None
+            for num_str, features in race.get("horse_features", {}).items():
+                num = int(num_str)
+                date_strs.append(date_str)
+                race_ids.append(race_id)
+                numeros.append(num)
+                horse_ids.append(resolve_horse_id(features, num))
+                runners.append(features)
+
+                odds = rapports.get(num_str)
+                if odds and cutoff is not None:
+                    odds = {timestamp: cote for timestamp, cote in odds.items() if int(timestamp) <= cutoff}
+                if odds:
+                    cote = odds[max(odds, key=int)]
+                    derniere_cote.append(np.nan if cote is None else float(cote))
+                    nombre_cotes.append(len(odds))
+                else:
+                    derniere_cote.append(np.nan)
+                    nombre_cotes.append(0)
+
+    # Une compréhension par champ plutôt qu'un append par champ et par partant
+    def field(key: str, default: Any) -> List[Any]:
+        return [features.get(key, default) for features in runners]
+
+    ints = {column: field(key, default) for column, (key, default) in RUNNER_INT_FIELDS.items()}
+    bools = {column: field(key, default) for column, (key, default) in RUNNER_BOOL_FIELDS.items()}
+    strs = {column: field(key, default) for column, (key, default) in RUNNER_STR_FIELDS.items()}
+    oeilleres, deferre = field("oeilleres", None), field("deferre", None)
+
+    columns = {
+        "date": _dates(date_strs),
+        "race_id": np.array(race_ids, dtype=object),
+        "numero": np.array(numeros, dtype=np.int64),
+        "horse_id": np.array(horse_ids, dtype=object),
+        "oeilleres": _encode_column("oeilleres", oeilleres),
+        "deferre": _encode_column("deferre", deferre),
+    }
+    # Le scraper écrit null pour une caractéristique absente : NaN plutôt qu'une erreur sur tout le lot
+    columns.update({
+        column: _optional_int(values, RUNNER_INT_FIELDS[column][0]) for column, values in ints.items()
+    })
+    columns.update({column: np.array(values, dtype=bool) for column, values in bools.items()})
+    columns.update({column: np.array(values, dtype=object) for column, values in strs.items()})
+    columns["derniere_cote"] = np.array(derniere_cote, dtype=np.float64)
+    columns["nombre_cotes"] = np.array(nombre_cotes, dtype=np.int64)
+    if musique_stats:
+        columns.update(musique_features_batch(strs["musique"]))
+    return columns
+
+
+def results_to_columns(days: Iterable[DayData]) -> Dict[str, np.ndarray]:
+    """
+    Une ligne par cheval classé des courses terminées (les ex aequo partagent la position),
+    avec ses rapports simple gagnant et simple placé (NaN s'il n'y en a pas)
+    """
+    date_strs, race_ids, numeros, positions = [], [], [], []
+    rapport_gagnant, rapport_place = [], []
+
+    for date_str, data in days:
+        for race_id, race in data.items():
+            ordre_arrivee = race.get("ordreArrivee")
+            if ordre_arrivee is None:
+                continue
+            rapports = race.get("rapportsDefinitifs", {})
+            gagnant = rapports.get("E_SIMPLE_GAGNANT", {})
+            place = rapports.get("E_SIMPLE_PLACE", {})
+            for position, group in enumerate(ordre_arrivee, start=1):
+                for num in group:
+                    date_strs.append(date_str)
+                    race_ids.append(race_id)
+                    numeros.append(num)
+                    positions.append(position)
+                    rapport_gagnant.append(gagnant.get(str(num), np.nan))
+                    rapport_place.append(place.get(str(num), np.nan))
+
+    return {
+        "date": _dates(date_strs),
+        "race_id": np.array(race_ids, dtype=object),
+        "numero": np.array(numeros, dtype=np.int64),
+        "position": np.array(positions, dtype=np.int64),
+        "rapport_simple_gagnant": np.array(rapport_gagnant, dtype=np.float64),
+        "rapport_simple_place": np.array(rapport_place, dtype=np.float64),
+    }
+
+
+# Paris dont la combinaison ne dépend pas de l'ordre d'arrivée
+UNORDERED_PARIS = frozenset({"E_COUPLE_GAGNANT", "E_COUPLE_PLACE", "E_TRIO"})
+
+
+def normalize_combinaison(type_pari: str, combinaison: str) -> str:
+    """Combinaison canonique ("7-3" -> "3-7" pour un pari non ordonné), "" si elle n'est pas numérique"""
+    try:
+        numeros = [int(num) for num in str(combinaison).split("-")]
+    except ValueError:
+        return ""
+    if type_pari in UNORDERED_PARIS:
+        numeros.sort()
+    return "-".join(map(str, numeros))
+
+
+def dividends_to_columns(days: Iterable[DayData]) -> Dict[str, np.ndarray]:
+    """Une ligne par rapport définitif (course, type de pari, combinaison canonique), dividende pour 1 euro"""
+    date_strs, race_ids, types_pari, combinaisons, dividendes = [], [], [], [], []
+
+    for date_str, data in days:
+        for race_id, race in data.items():
+            for type_pari, rapports in race.get("rapportsDefinitifs", {}).items():
+                for combinaison, dividende in rapports.items():
+                    date_strs.append(date_str)
+                    race_ids.append(race_id)
+                    types_pari.append(type_pari)
+                    combinaisons.append(normalize_combinaison(type_pari, combinaison))
+                    dividendes.append(dividende)
+
+    return {
+        "date": _dates(date_strs),
+        "race_id": np.array(race_ids, dtype=object),
+        "type_pari": np.array(types_pari, dtype=object),
+        "combinaison": np.array(combinaisons, dtype=object),
+        "dividende": np.array(dividendes, dtype=np.float64),
+    }
+
+
+def columns_to_dataframe(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """DataFrame des colonnes, les colonnes énumérées deviennent des Categorical partagés"""
+    frame = {}
+    for column, values in columns.items():
+        if column in ENUM_COLUMNS:
+            enum_class, _ = ENUM_COLUMNS[column]
+            frame[column] = pd.Categorical.from_codes(values, categories=enum_categories(enum_class))
+        else:
+            frame[column] = values
+    return pd.DataFrame(frame)
+
+
+def races_to_dataframe(days: Iterable[DayData]) -> pd.DataFrame:
+    return columns_to_dataframe(races_to_columns(days))
+
+
+def runners_to_dataframe(days: Iterable[DayData], musique_stats: bool = False,
+                         odds_lead_time: float = 0.0) -> pd.DataFrame:
+    return columns_to_dataframe(runners_to_columns(days, musique_stats, odds_lead_time))
+
+
+def results_to_dataframe(days: Iterable[DayData]) -> pd.DataFrame:
+    return columns_to_dataframe(results_to_columns(days))
+
+
+def dividends_to_dataframe(days: Iterable[DayData]) -> pd.DataFrame:
+    return columns_to_dataframe(dividends_to_columns(days))
+
+
+def load_days(file_paths: Iterable[str]) -> List[DayData]:
+    """Charge des fichiers jour (journal de cotes compris) au format attendu par les fonctions batch"""
+    days = []
+    for file_path in file_paths:
+        date_str = os.path.splitext(os.path.basename(file_path))[0]
+        days.append((date_str, load_day_file(file_path)))
+    return days
+
+
+def map_day_files_to_dataframes(file_paths: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """DataFrames races, runners et results d'un ou plusieurs fichiers jour"""
+    days = load_days(file_paths)
+    return {
+        "races": races_to_dataframe(days),
+        "runners": runners_to_dataframe(days),
+        "results": results_to_dataframe(days),
+    }
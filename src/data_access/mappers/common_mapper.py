@@ -1,28 +1,170 @@
+import sys
+from collections import Counter
+from collections.abc import Hashable
 from datetime import datetime
-from typing import Any, Dict, Optional, TypeVar, Type, Callable
+from enum import Enum
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar, Type
+
+import numpy as np
 
 T = TypeVar('T')
+E = TypeVar('E', bound=Enum)
+
+# Nombre de valeurs inconnues les plus fréquentes listées par champ dans le résumé
+SUMMARY_TOP_VALUES = 5
+
+
+class MappingDiagnostics:
+    """
+    Compteurs des valeurs ignorées par les mappers (valeurs d'énumération inconnues,
+    timestamps ou dates invalides), par champ, à la place d'un avertissement par ligne
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()  # (champ, valeur) -> occurrences
+        self._lock = Lock()
+
+    def record(self, field: str, value: Any, count: int = 1) -> None:
+        key = (field, value if isinstance(value, (str, int, float, bool, type(None))) else repr(value))
+        with self._lock:
+            self._counts[key] += count
+
+    def counts(self) -> Dict[str, Dict[Any, int]]:
+        """{champ: {valeur: occurrences}}"""
+        by_field: Dict[str, Dict[Any, int]] = {}
+        with self._lock:
+            items = list(self._counts.items())
+        for (field, value), count in items:
+            by_field.setdefault(field, {})[value] = count
+        return by_field
+
+    def merge(self, counts: Dict[str, Dict[Any, int]]) -> None:
+        """Ajoute des compteurs au format de counts() (ceux d'un processus de travail)"""
+        with self._lock:
+            for field, values in counts.items():
+                for value, count in values.items():
+                    self._counts[(field, value)] += count
+
+    def summary(self) -> List[Tuple[str, int, List[Tuple[Any, int]]]]:
+        """(champ, occurrences, valeurs les plus fréquentes) par champ, du plus fréquent au moins fréquent"""
+        rows = []
+        for field, values in self.counts().items():
+            top = sorted(values.items(), key=lambda item: -item[1])[:SUMMARY_TOP_VALUES]
+            rows.append((field, sum(values.values()), top))
+        return sorted(rows, key=lambda row: -row[1])
+
+    def report(self) -> str:
+        """Résumé lisible, chaîne vide si rien n'a été ignoré"""
+        lines = []
+        for field, total, top in self.summary():
+            values = ", ".join(f"{value!r} x{count}" for value, count in top)
+            lines.append(f"{field}: {total} valeurs ignorées ({values})")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+# Compteurs partagés par tous les mappers
+diagnostics = MappingDiagnostics()
 
-def safe_enum_parse(enum_class: Type[T], value: Any, default: Optional[T] = None) -> Optional[T]:
-    """Parse en toute sécurité une valeur vers une énumération"""
-    if value is None:
-        return default
-    try:
-        return enum_class(value)
-    except (ValueError, KeyError):
-        print(f"Warning: Valeur non reconnue {value} pour {enum_class.__name__}")
-        return default
 
-def parse_timestamp(timestamp: Optional[int]) -> Optional[datetime]:
-    """Convertit un timestamp en millisecondes en datetime"""
+def with_diagnostics(func: Callable[..., T], *args: Any) -> Tuple[T, Dict[str, Dict[Any, int]]]:
+    """
+    Appelle func dans un processus d'un pool : (résultat, compteurs des diagnostics de l'appel)
+    Les compteurs d'un processus de travail sont perdus à sa fin, le parent les ajoute aux siens avec merge
+    """
+    diagnostics.reset()
+    result = func(*args)
+    return result, diagnostics.counts()
+
+
+class EnumLookup(Generic[E]):
+    """
+    Table précompilée valeur JSON -> membre (et -> code entier) d'une énumération
+    Les codes suivent l'ordre de déclaration des membres
+    """
+
+    __slots__ = ("enum_class", "members", "codes")
+
+    def __init__(self, enum_class: Type[E]):
+        self.enum_class = enum_class
+        self.members: Dict[Any, E] = {member.value: member for member in enum_class}
+        self.codes: Dict[Any, int] = {member.value: code for code, member in enumerate(enum_class)}
+
+    def parse(self, value: Any, default: Optional[E] = None, field: Optional[str] = None) -> Optional[E]:
+        """Membre de la valeur, default si elle est absente ou inconnue (compté dans diagnostics)"""
+        if value is None:
+            return default
+        try:
+            member = self.members.get(value)
+        except TypeError:  # Liste ou dictionnaire à la place d'une valeur simple
+            member = None
+        if member is None:
+            if isinstance(value, self.enum_class):
+                return value
+            diagnostics.record(field or self.enum_class.__name__, value)
+            return default
+        return member
+
+    def code(self, member: Optional[E]) -> int:
+        return self.codes[member.value] if member is not None else -1
+
+    def encode_column(self, values: List[Any], default_code: int, field: Optional[str] = None) -> np.ndarray:
+        """Codes entiers (int8) d'une colonne, default_code pour les valeurs absentes ou inconnues"""
+        codes = self.codes
+        try:
+            out = np.fromiter(
+                (default_code if value is None else codes.get(value, -2) for value in values),
+                dtype=np.int8, count=len(values),
+            )
+        except TypeError:  # Liste ou dictionnaire à la place d'une valeur simple : inconnue
+            out = np.fromiter(
+                (default_code if value is None else codes.get(value, -2) if isinstance(value, Hashable) else -2
+                 for value in values),
+                dtype=np.int8, count=len(values),
+            )
+        unknown = out == -2
+        if unknown.any():
+            unknown_values = [values[i] for i in np.flatnonzero(unknown)]
+            try:
+                counted = Counter(unknown_values).items()
+            except TypeError:
+                counted = [(value, 1) for value in unknown_values]
+            for value, count in counted:
+                diagnostics.record(field or self.enum_class.__name__, value, count)
+            out[unknown] = default_code
+        return out
+
+
+@lru_cache(maxsize=None)
+def enum_lookup(enum_class: Type[E]) -> EnumLookup[E]:
+    """Table de l'énumération, construite une fois et partagée"""
+    return EnumLookup(enum_class)
+
+
+def safe_enum_parse(enum_class: Type[T], value: Any, default: Optional[T] = None,
+                    field: Optional[str] = None) -> Optional[T]:
+    """Parse en toute sécurité une valeur vers une énumération (valeurs inconnues comptées dans diagnostics)"""
+    return enum_lookup(enum_class).parse(value, default, field)
+
+def parse_timestamp(timestamp: Optional[int], field: str = "timestamp") -> Optional[datetime]:
+    """Convertit un timestamp en millisecondes en datetime (timestamps invalides comptés dans diagnostics)"""
     if timestamp is None:
         return None
     try:
         return datetime.fromtimestamp(timestamp/1000)
     except (ValueError, TypeError, OverflowError):
-        print(f"Warning: Impossible de convertir le timestamp {timestamp}")
+        diagnostics.record(field, timestamp)
         return None
 
 def extract_subdict(data: Dict[str, Any], keys: list[str]) -> Dict[str, Any]:
     """Extrait un sous-dictionnaire à partir des clés spécifiées"""
-    return {k: data.get(k) for k in keys if k in data}
\ No newline at end of file
+    return {k: data.get(k) for k in keys if k in data}
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Interne une chaîne répétée (driver, entraîneur, hippodrome...) pour n'en garder qu'une copie en mémoire"""
+    return sys.intern(value) if isinstance(value, str) else value
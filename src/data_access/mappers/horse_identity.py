@@ -0,0 +1,40 @@
+import hashlib
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# Champs des partants identifiant un cheval d'une course à l'autre
+IDENTITY_FIELDS = ("nom", "nomPere", "nomMere")
+
+
+@lru_cache(maxsize=1 << 16)
+def normalize_name(name: Optional[str]) -> str:
+    """Nom sans accents, en majuscules et aux espaces normalisés (mémorisé : les noms reviennent d'une course à l'autre)"""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(ascii_name.upper().split())
+
+
+def identity_key(features: Dict[str, Any]) -> Optional[str]:
+    """Clé d'identité (nom, père, mère normalisés), None si le nom du cheval n'a pas été relevé"""
+    if not features.get("nom"):
+        return None
+    return "|".join(normalize_name(features.get(field)) for field in IDENTITY_FIELDS)
+
+
+def legacy_horse_id(features: Dict[str, Any], num: int) -> str:
+    """Ancien identifiant driver-entraineur-numéro, propre à une course"""
+    return f"{features.get('driver', '')}-{features.get('entraineur', '')}-{num}"
+
+
+def resolve_horse_id(features: Dict[str, Any], num: int) -> str:
+    """
+    Identifiant durable d'un cheval : empreinte de son nom et de ceux de ses parents
+    Les fichiers jour antérieurs au relevé du nom gardent l'ancien identifiant
+    """
+    key = identity_key(features)
+    if key is None:
+        return legacy_horse_id(features, num)
+    return "H" + hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
@@ -1,56 +1,72 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Tuple
+
+import numpy as np
 
 from src.domain.entities.horse import Horse, HorseFeatures
+from src.domain.entities.odds import OddsPanel, OddsSeries
 from src.domain.entities.enums import TypeOeilleres, TypeDeferre
-from src.data_access.mappers.common_mapper import safe_enum_parse
+from src.data_access.mappers.common_mapper import enum_lookup, intern_str
+from src.data_access.mappers.horse_identity import resolve_horse_id
+
+_OEILLERES = enum_lookup(TypeOeilleres)
+_DEFERRE = enum_lookup(TypeDeferre)
 
 def map_json_to_horse_features(data: Dict[str, Any]) -> HorseFeatures:
     """Convertit les données JSON en objet HorseFeatures"""
     return HorseFeatures(
         musique=data.get("musique", ""),
         age=data.get("age", 0),
-        oeilleres=safe_enum_parse(TypeOeilleres, data.get("oeilleres"), TypeOeilleres.SANS_OEILLERES),
-        deferre=safe_enum_parse(TypeDeferre, data.get("deferre"), TypeDeferre.NON_DEFERRE),
+        oeilleres=_OEILLERES.parse(data.get("oeilleres"), TypeOeilleres.SANS_OEILLERES, "oeilleres"),
+        deferre=_DEFERRE.parse(data.get("deferre"), TypeDeferre.NON_DEFERRE, "deferre"),
         nombre_courses=data.get("nombreCourses", 0),
         nombre_victoires=data.get("nombreVictoires", 0),
         nombre_places=data.get("nombrePlaces", 0),
         nombre_places_second=data.get("nombrePlacesSecond", 0),
         nombre_places_troisieme=data.get("nombrePlacesTroisieme", 0),
         driver_change=data.get("driverChange", False),
-        avis_entraineur=data.get("avisEntraineur"),
+        avis_entraineur=intern_str(data.get("avisEntraineur")),
         indicateur_inedit=data.get("indicateurInedit", False),
-        driver=data.get("driver", ""),
-        entraineur=data.get("entraineur", ""),
+        driver=intern_str(data.get("driver", "")),
+        entraineur=intern_str(data.get("entraineur", "")),
         gains_carriere=data.get("gainsCarriere", 0),
         gains_victoires=data.get("gainsVictoires", 0),
         gains_place=data.get("gainsPlace", 0),
         gains_annee_en_cours=data.get("gainsAnneeEnCours", 0),
-        gains_annee_precedente=data.get("gainsAnneePrecedente", 0)
+        gains_annee_precedente=data.get("gainsAnneePrecedente", 0),
+        nom=data.get("nom"),
+        sexe=intern_str(data.get("sexe")),
+        nom_pere=intern_str(data.get("nomPere")),
+        nom_mere=data.get("nomMere")
     )
 
-def map_json_to_horse(race_id: str, num: int, features_data: Dict[str, Any], odds_data: Dict[str, Any] = None) -> Horse:
-    """Convertit les données JSON en objet Horse"""
-    # Créer un ID unique pour le cheval (à améliorer si possible)
-    driver = features_data.get("driver", "")
-    entraineur = features_data.get("entraineur", "")
-    horse_id = f"{driver}-{entraineur}-{num}"
+def map_json_to_horse(race_id: str, num: int, features_data: Dict[str, Any], odds_data: Dict[str, Any] = None,
+                      odds_series: bool = False) -> Horse:
+    """
+    Convertit les données JSON en objet Horse
+    odds_series : cotes sous forme d'OddsSeries (tableaux triés) plutôt que de dictionnaire
+    """
+    horse_id = resolve_horse_id(features_data, num)
     
     features = map_json_to_horse_features(features_data)
     
     # Récupérer les cotes
-    odds = {}
-    if odds_data:
-        odds = {ts: float(val) for ts, val in odds_data.items()}
+    if odds_series:
+        odds = OddsSeries.from_dict(odds_data)
+    else:
+        odds = {}
+        if odds_data:
+            # Cote nulle (suspendue) : NaN, comme dans batch_mapper
+            odds = {ts: np.nan if val is None else float(val) for ts, val in odds_data.items()}
     
     return Horse(
         id=horse_id,
         numero=num,
-        race_id=race_id,
+        race_id=intern_str(race_id),
         features=features,
         odds=odds
     )
 
-def map_json_to_horses(race_id: str, data: Dict[str, Any]) -> List[Horse]:
+def map_json_to_horses(race_id: str, data: Dict[str, Any], odds_series: bool = False) -> List[Horse]:
     """Convertit les données JSON en liste d'objets Horse"""
     horses = []
     
@@ -61,7 +77,42 @@ def map_json_to_horses(race_id: str, data: Dict[str, Any]) -> List[Horse]:
         num = int(num_str)
         odds_data = rapports.get(num_str, {})
         
-        horse = map_json_to_horse(race_id, num, features, odds_data)
+        horse = map_json_to_horse(race_id, num, features, odds_data, odds_series)
         horses.append(horse)
     
-    return horses
\ No newline at end of file
+    return horses
+
+def map_json_to_odds_panel(races: Iterable[Tuple[str, Dict[str, Any]]]) -> OddsPanel:
+    """
+    Convertit les cotes de plusieurs courses (race_id, données JSON) en OddsPanel
+    Un partant par numéro de horse_features, dans l'ordre du fichier jour
+    """
+    race_ids, numeros, heures_depart, counts = [], [], [], []
+    timestamps: List[str] = []
+    values: List[float] = []
+
+    for race_id, data in races:
+        rapports = data.get("rapports", {})
+        heure_depart = data.get("heureDepart", 0)
+        for num_str in data.get("horse_features", {}):
+            odds = rapports.get(num_str) or {}
+            race_ids.append(race_id)
+            numeros.append(int(num_str))
+            heures_depart.append(heure_depart)
+            counts.append(len(odds))
+            timestamps.extend(odds)
+            values.extend(odds.values())
+
+    counts_array = np.array(counts, dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts_array)
+    # Les clés sont des timestamps en chaîne, convertis d'un coup puis triés à l'intérieur de chaque partant
+    timestamps_array = np.fromiter(map(int, timestamps), dtype=np.int64, count=len(timestamps))
+    values_array = np.array(values, dtype=np.float64)
+    runners = np.repeat(np.arange(len(counts), dtype=np.int64), counts_array)
+    unsorted = (runners[1:] == runners[:-1]) & (timestamps_array[1:] < timestamps_array[:-1])
+    if unsorted.any():
+        order = np.lexsort((timestamps_array, runners))
+        timestamps_array, values_array = timestamps_array[order], values_array[order]
+
+    return OddsPanel(race_ids, numeros, offsets, timestamps_array, values_array, heures_depart)
\ No newline at end of file
@@ -0,0 +1,150 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Lettre de discipline d'une course de la musique -> code
+DISCIPLINES = {"a": 0, "m": 1, "p": 2, "h": 3, "s": 4, "c": 5}
+DISCIPLINE_NAMES = ("ATTELE", "MONTE", "PLAT", "HAIES", "STEEPLE", "CROSS")
+UNKNOWN_DISCIPLINE = -1
+
+# Place non numérique -> code d'incident (0 : pas d'incident)
+INCIDENTS = {"D": 1, "A": 2, "T": 3, "R": 4}
+INCIDENT_NAMES = ("", "DISQUALIFIE", "ARRETE", "TOMBE", "RETROGRADE")
+UNKNOWN_INCIDENT = len(INCIDENT_NAMES)
+
+# Position des chevaux non classés ("0" : au-delà de la 9e place)
+UNPLACED_POSITION = 10
+NO_POSITION = -1
+
+RECENT_RUNS = 5
+CACHE_SIZE = 1 << 16
+
+_TOKEN = re.compile(r"\((\d+)\)|([0-9A-Z])([a-z]?)")
+
+
+@dataclass(slots=True, frozen=True)
+class ParsedMusique:
+    """
+    Musique décodée, de la course la plus récente à la plus ancienne
+    positions : 1 à 9, UNPLACED_POSITION pour "0", NO_POSITION en cas d'incident
+    seasons : 0 pour l'année en cours, +1 à chaque séparateur d'année "(19)"
+    """
+    positions: np.ndarray
+    disciplines: np.ndarray
+    incidents: np.ndarray
+    seasons: np.ndarray
+    years: Tuple[int, ...]  # Années des séparateurs, dans l'ordre de la musique
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def _frozen(values: list, dtype: type) -> np.ndarray:
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_musique(musique: Optional[str]) -> ParsedMusique:
+    """
+    Décode une musique ("1a 3a Da (19) 2a"). Le résultat est mémorisé et partagé :
+    ses tableaux sont en lecture seule
+    """
+    positions, disciplines, incidents, seasons, years = [], [], [], [], []
+    season = 0
+    for match in _TOKEN.finditer(musique or ""):
+        year, place, discipline = match.groups()
+        if year is not None:
+            season += 1
+            years.append(int(year))
+            continue
+        if place.isdigit():
+            position = int(place)
+            positions.append(position if position > 0 else UNPLACED_POSITION)
+            incidents.append(0)
+        else:
+            positions.append(NO_POSITION)
+            incidents.append(INCIDENTS.get(place, UNKNOWN_INCIDENT))
+        disciplines.append(DISCIPLINES.get(discipline, UNKNOWN_DISCIPLINE))
+        seasons.append(season)
+
+    return ParsedMusique(
+        positions=_frozen(positions, np.int8),
+        disciplines=_frozen(disciplines, np.int8),
+        incidents=_frozen(incidents, np.int8),
+        seasons=_frozen(seasons, np.int8),
+        years=tuple(years),
+    )
+
+
+# Statistiques de forme dérivées de la musique, dans l'ordre de musique_features
+FEATURE_NAMES = (
+    "musique_courses",
+    "musique_courses_annee",
+    "musique_derniere_position",
+    "musique_position_moyenne",
+    "musique_victoires",
+    "musique_podiums",
+    "musique_incidents",
+)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def musique_features(musique: Optional[str], recent: int = RECENT_RUNS) -> np.ndarray:
+    """
+    Statistiques de forme (FEATURE_NAMES) d'une musique, sur ses `recent` dernières courses
+    pour la position moyenne, les victoires, podiums et incidents (NaN sans course classée)
+    """
+    parsed = parse_musique(musique)
+    positions = parsed.positions[:recent]
+    placed = positions[positions != NO_POSITION]
+    features = np.array([
+        len(parsed),
+        np.count_nonzero(parsed.seasons == 0),
+        parsed.positions[0] if len(parsed) and parsed.positions[0] != NO_POSITION else np.nan,
+        placed.mean() if len(placed) else np.nan,
+        np.count_nonzero(positions == 1),
+        np.count_nonzero((positions >= 1) & (positions <= 3)),
+        np.count_nonzero(parsed.incidents[:recent]),
+    ], dtype=np.float64)
+    features.flags.writeable = False
+    return features
+
+
+def musique_features_batch(musiques: Iterable[Optional[str]], recent: int = RECENT_RUNS) -> Dict[str, np.ndarray]:
+    """
+    Statistiques de forme d'une colonne de musiques, {nom: tableau}
+    Chaque musique distincte n'est décodée qu'une fois (et reste en cache d'un appel à l'autre)
+    """
+    index: Dict[Optional[str], int] = {}
+    codes = np.fromiter((index.setdefault(m, len(index)) for m in musiques), dtype=np.int64)
+    if not index:
+        return {name: np.empty(0, dtype=np.float64) for name in FEATURE_NAMES}
+
+    matrix = np.vstack([musique_features(m, recent) for m in index])[codes]
+    return {name: matrix[:, i] for i, name in enumerate(FEATURE_NAMES)}
+
+
+def musique_features_encoded(codes: np.ndarray, dictionary: Sequence[str],
+                             recent: int = RECENT_RUNS) -> Dict[str, np.ndarray]:
+    """
+    Statistiques de forme d'une colonne encodée par dictionnaire (stockage colonnaire)
+    Un code négatif (musique absente ou nulle) vaut une musique vide
+    """
+    codes = np.asarray(codes)
+    distinct, inverse = np.unique(codes, return_inverse=True)
+    if not len(distinct):
+        return {name: np.empty(0, dtype=np.float64) for name in FEATURE_NAMES}
+
+    matrix = np.vstack([musique_features(dictionary[code] if code >= 0 else "", recent) for code in distinct])
+    matrix = matrix[inverse.reshape(-1)]
+    return {name: matrix[:, i] for i, name in enumerate(FEATURE_NAMES)}
+
+
+def clear_cache() -> None:
+    parse_musique.cache_clear()
+    musique_features.cache_clear()
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.domain.entities.odds import Times
+from src.domain.entities.pool import BetPool
+from src.data_access.storage.enjeux_codec import COMBINATION_SEPARATOR, is_packed
+
+
+def map_json_to_pool(amounts: Dict[str, Any]) -> Optional[BetPool]:
+    """Enjeux d'un type de pari (format du scraper ou compact) -> BetPool, None s'ils ne sont pas numériques"""
+    if is_packed(amounts):
+        return BetPool.from_matrix(amounts["combinaisons"], amounts["timestamps"], amounts["montants"])
+    try:
+        return BetPool.from_dict(amounts, COMBINATION_SEPARATOR)
+    except ValueError:
+        return None
+
+
+def map_json_to_pools(data: Dict[str, Any]) -> Dict[str, BetPool]:
+    """Pools de tous les types de pari d'une course, par type de pari"""
+    pools = {}
+    for bet_kind, amounts in data.get("enjeux", {}).items():
+        pool = map_json_to_pool(amounts)
+        if pool is not None:
+            pools[bet_kind] = pool
+    return pools
+
+
+def map_json_to_pool_features(data: Dict[str, Any], at: Optional[Times] = None) -> Dict[int, Dict[str, float]]:
+    """
+    Part des enjeux de chaque partant pour chaque type de pari : part_enjeux_<type de pari>
+    at : instant de lecture (ms), dernier relevé par défaut (NaN sans relevé avant at)
+    """
+    numbers = [int(num) for num in data.get("horse_features", {})]
+    features: Dict[int, Dict[str, float]] = {num: {} for num in numbers}
+    for bet_kind, pool in map_json_to_pools(data).items():
+        time = pool.timestamps[-1] if at is None and len(pool.timestamps) else at
+        read = time is not None and len(pool.timestamps) and pool.timestamps[0] <= time
+        column = f"part_enjeux_{bet_kind.lower()}"
+        shares = pool.runner_shares(numbers, time) if read else {}
+        for num in numbers:
+            features[num][column] = float(shares[num][0]) if read else np.nan
+    return features
@@ -5,14 +5,20 @@ from src.domain.entities.race import Race, Hippodrome, Weather
 from src.domain.entities.enums import (
     Discipline, Specialite, ConditionSexe, Nature, NebulositeCode
 )
-from src.data_access.mappers.common_mapper import safe_enum_parse, parse_timestamp
+from src.data_access.mappers.common_mapper import diagnostics, enum_lookup, intern_str, parse_timestamp
+
+_NEBULOSITE = enum_lookup(NebulositeCode)
+_DISCIPLINE = enum_lookup(Discipline)
+_SPECIALITE = enum_lookup(Specialite)
+_CONDITION_SEXE = enum_lookup(ConditionSexe)
+_NATURE = enum_lookup(Nature)
 
 def map_json_to_hippodrome(data: Dict[str, Any]) -> Hippodrome:
     """Convertit les données JSON en objet Hippodrome"""
     return Hippodrome(
-        code=data.get("code", ""),
-        libelle_court=data.get("libelleCourt", ""),
-        libelle_long=data.get("libelleLong", "")
+        code=intern_str(data.get("code", "")),
+        libelle_court=intern_str(data.get("libelleCourt", "")),
+        libelle_long=intern_str(data.get("libelleLong", ""))
     )
 
 def map_json_to_weather(data: Dict[str, Any]) -> Optional[Weather]:
@@ -21,13 +27,13 @@ def map_json_to_weather(data: Dict[str, Any]) -> Optional[Weather]:
         return None
         
     return Weather(
-        date_prevision=parse_timestamp(data.get("datePrevision")),
-        nebulosite_code=safe_enum_parse(NebulositeCode, data.get("nebulositeCode"), NebulositeCode.P0),
-        nebulosite_libelle=data.get("nebulositeLibelleCourt", ""),
-        nebulosite_description=data.get("nebulositeLibelleLong"),
+        date_prevision=parse_timestamp(data.get("datePrevision"), "meteo.datePrevision"),
+        nebulosite_code=_NEBULOSITE.parse(data.get("nebulositeCode"), NebulositeCode.P0, "meteo.nebulositeCode"),
+        nebulosite_libelle=intern_str(data.get("nebulositeLibelleCourt", "")),
+        nebulosite_description=intern_str(data.get("nebulositeLibelleLong")),
         temperature=data.get("temperature", 0),
         force_vent=data.get("forceVent", 0),
-        direction_vent=data.get("directionVent", "")
+        direction_vent=intern_str(data.get("directionVent", ""))
     )
 
 def map_json_to_race(race_key: str, data: Dict[str, Any], date_str: str) -> Race:
@@ -37,27 +43,27 @@ def map_json_to_race(race_key: str, data: Dict[str, Any], date_str: str) -> Race
         race_date = datetime(year, month, day).date()
     except (ValueError, IndexError):
         # En cas d'erreur de parsing de la date, utiliser la date actuelle
-        print(f"Warning: Impossible de parser la date {date_str}")
+        diagnostics.record("date", date_str)
         race_date = datetime.now().date()
     
     hippodrome = map_json_to_hippodrome(data.get("hippodrome", {}))
     weather = map_json_to_weather(data.get("meteo"))
     
     return Race(
-        id=race_key,
+        id=intern_str(race_key),
         date=race_date,
-        heure_depart=parse_timestamp(data.get("heureDepart")),
+        heure_depart=parse_timestamp(data.get("heureDepart"), "heureDepart"),
         montant_prix=data.get("montantPrix", 0),
         distance=data.get("distance", 0),
-        discipline=safe_enum_parse(Discipline, data.get("discipline"), Discipline.ATTELE),
-        specialite=safe_enum_parse(Specialite, data.get("specialite"), Specialite.TROT_ATTELE),
+        discipline=_DISCIPLINE.parse(data.get("discipline"), Discipline.ATTELE, "discipline"),
+        specialite=_SPECIALITE.parse(data.get("specialite"), Specialite.TROT_ATTELE, "specialite"),
         nombre_participants=data.get("nombreDeclaresPartants", 0),
-        condition_sexe=safe_enum_parse(ConditionSexe, data.get("conditionSexe"), ConditionSexe.MIXTE),
+        condition_sexe=_CONDITION_SEXE.parse(data.get("conditionSexe"), ConditionSexe.MIXTE, "conditionSexe"),
         hippodrome=hippodrome,
         meteo=weather,
         grand_prix_national_trot=data.get("grandPrixNationalTrot", False),
         montant_offert_1er=data.get("montantOffert1er"),
         montant_offert_2eme=data.get("montantOffert2eme"),
         montant_offert_3eme=data.get("montantOffert3eme"),
-        nature=safe_enum_parse(Nature, data.get("nature"))
+        nature=_NATURE.parse(data.get("nature"), None, "nature")
     )
\ No newline at end of file
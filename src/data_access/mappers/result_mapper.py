@@ -2,7 +2,7 @@ from typing import Dict, Any, Optional
 
 from src.domain.entities.result import RaceResult
 from src.domain.entities.enums import TypePari
-from src.data_access.mappers.common_mapper import safe_enum_parse
+from src.data_access.mappers.common_mapper import intern_str, safe_enum_parse
 
 def map_json_to_result(race_id: str, data: Dict[str, Any]) -> Optional[RaceResult]:
     """Convertit les données JSON en objet RaceResult"""
@@ -13,7 +13,7 @@ def map_json_to_result(race_id: str, data: Dict[str, Any]) -> Optional[RaceResul
     rapports_definitifs = {}
     for pari_type_str, rapports in data.get("rapportsDefinitifs", {}).items():
         try:
-            pari_type = safe_enum_parse(TypePari, pari_type_str)
+            pari_type = safe_enum_parse(TypePari, pari_type_str, field="rapportsDefinitifs")
             if pari_type:  # Ignorer les valeurs None (types de paris non reconnus)
                 rapports_definitifs[pari_type] = rapports
         except (ValueError, KeyError):
@@ -21,7 +21,7 @@ def map_json_to_result(race_id: str, data: Dict[str, Any]) -> Optional[RaceResul
             continue
     
     return RaceResult(
-        race_id=race_id,
+        race_id=intern_str(race_id),
         ordre_arrivee=data["ordreArrivee"],
         rapports_definitifs=rapports_definitifs
     )
\ No newline at end of file
@@ -1,9 +1,17 @@
 from src.data_access.repositories.race_repository import RaceRepository
 from src.data_access.repositories.horse_repository import HorseRepository
 from src.data_access.repositories.result_repository import ResultRepository
+from src.data_access.repositories.race_filter import RaceFilter
+from src.data_access.repositories.async_repository import (
+    AsyncRaceRepository, AsyncHorseRepository, AsyncResultRepository
+)
 
 __all__ = [
     'RaceRepository',
     'HorseRepository',
-    'ResultRepository'
+    'ResultRepository',
+    'RaceFilter',
+    'AsyncRaceRepository',
+    'AsyncHorseRepository',
+    'AsyncResultRepository'
 ]
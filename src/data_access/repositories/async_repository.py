@@ -0,0 +1,228 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import date
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Generic, Hashable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from src.domain.entities.horse import Horse
+from src.domain.entities.race import Race
+from src.domain.entities.result import RaceResult
+from src.data_access.repositories.base_repository import BaseRepository
+from src.data_access.repositories.horse_repository import HorseRepository
+from src.data_access.repositories.race_filter import RacePredicate
+from src.data_access.repositories.race_repository import RaceRepository
+from src.data_access.repositories.result_repository import ResultRepository
+from src.data_access.storage.race_index import load_race_index
+
+T = TypeVar('T')
+R = TypeVar('R', bound=BaseRepository)
+
+DEFAULT_MAX_WORKERS = 4
+# Éléments convertis par passage dans l'executor pour les itérateurs asynchrones
+DEFAULT_BATCH_SIZE = 256
+
+
+class _InFlight:
+    """Chargement en cours partagé par tous les appels identiques qui l'attendent"""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: "asyncio.Future[Any]"):
+        self.future = future
+        self.waiters = 0
+
+
+def _prepare_race_reads(repository: BaseRepository, file_path: str) -> None:
+    """Index du fichier jour à jour pour les lectures de courses isolées, sauf si le fichier est en cache"""
+    if repository.cache.peek(file_path) is None:
+        load_race_index(file_path)
+
+
+def _next_batch(iterator: Iterator[T], size: int) -> List[T]:
+    batch = []
+    for item in iterator:
+        batch.append(item)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+class AsyncRepository(Generic[R]):
+    """
+    Version asyncio d'un repository : lectures de fichiers et conversions exécutées dans un executor borné,
+    sans bloquer la boucle d'événements
+
+    Les appels identiques simultanés (même méthode et mêmes arguments) sont regroupés en un seul chargement,
+    dont le résultat est partagé : il ne doit pas être modifié. Les lectures d'un même fichier jour sont
+    aussi regroupées : un seul chargement du fichier (ou construction de son index pour les lectures
+    d'une course) pour tous les appels simultanés qui le lisent, quelle que soit la course demandée.
+    Annuler un appel ne fait qu'abandonner l'attente ; le travail est annulé s'il n'a pas encore démarré
+    et que plus aucun appel ne l'attend. Les itérateurs s'arrêtent entre deux paquets de batch_size éléments.
+    """
+
+    def __init__(self, repository: R, executor: Optional[Executor] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE):
+        """executor : partagé entre plusieurs repositories si précisé, sinon un pool de max_workers threads"""
+        self.repository = repository
+        self._owns_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=type(repository).__name__
+        )
+        self.batch_size = batch_size
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+
+    async def _coalesce(self, key: Hashable, function: Callable[..., T], *args: Any) -> T:
+        """Exécute function(*args) dans l'executor, ou attend l'exécution en cours pour la même clé"""
+        entry = self._in_flight.get(key)
+        if entry is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args))
+            entry = self._in_flight[key] = _InFlight(future)
+
+            def forget(_: "asyncio.Future[Any]", entry: _InFlight = entry) -> None:
+                if self._in_flight.get(key) is entry:
+                    del self._in_flight[key]
+
+            future.add_done_callback(forget)
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.future)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.future.done():
+                # Dernier appel annulé : le travail est abandonné s'il attend encore un thread
+                entry.future.cancel()
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        return await self._coalesce((method, args), getattr(self.repository, method), *args)
+
+    async def load_day(self, race_date: date) -> Dict:
+        """Fichier jour (via le cache partagé), un seul chargement pour les appels simultanés"""
+        file_path = self.repository._get_file_path(race_date)
+        return await self._coalesce(("file", file_path), self.repository._load_races_file, file_path)
+
+    async def _call_on_day(self, method: str, race_date: date) -> Any:
+        """
+        Conversion de tout le fichier jour par method(data, race_date) : chargement regroupé par fichier,
+        puis conversion des données chargées (sans relecture si le fichier dépasse le budget du cache)
+        """
+        data = await self.load_day(race_date)
+        return await self._coalesce((method, race_date), getattr(self.repository, method), data, race_date)
+
+    async def _call_on_race(self, method: str, race_date: date, *args: Any) -> Any:
+        """
+        Méthode qui lit une seule course du fichier jour : l'index du fichier est vérifié (et construit)
+        une fois pour tous les appels simultanés sur ce jour, puis chaque appel lit sa course
+        """
+        file_path = self.repository._get_file_path(race_date)
+        await self._coalesce(("index", file_path), _prepare_race_reads, self.repository, file_path)
+        return await self._call(method, *args)
+
+    async def _iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Itérateur asynchrone sur un générateur du repository, avancé par paquets dans l'executor"""
+        loop = asyncio.get_running_loop()
+        pending: Optional["asyncio.Future[List[T]]"] = None
+        try:
+            while True:
+                pending = loop.run_in_executor(self.executor, _next_batch, iterator, self.batch_size)
+                batch = await pending
+                if not batch:
+                    return
+                for item in batch:
+                    yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                if pending is not None and not pending.done():
+                    # Annulé pendant un paquet : le générateur est fermé quand le thread l'a rendu
+                    pending.add_done_callback(lambda _: close())
+                else:
+                    close()
+
+    def close(self) -> None:
+        """Arrête l'executor s'il a été créé par ce repository"""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncRepository[R]":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AsyncRaceRepository(AsyncRepository[RaceRepository]):
+    def __init__(self, repository: Optional[RaceRepository] = None, executor: Optional[Executor] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(repository or RaceRepository(), executor, max_workers, batch_size)
+
+    async def get_race_by_id(self, race_id: str, race_date: date) -> Optional[Race]:
+        return await self._call_on_race("get_race_by_id", race_date, race_id, race_date)
+
+    async def get_races_by_date(self, race_date: date) -> List[Race]:
+        return await self._call_on_day("_map_day_races", race_date)
+
+    async def get_races_by_hippodrome(self, hippodrome_code: str, year: Optional[int] = None) -> List[Race]:
+        return await self._call("get_races_by_hippodrome", hippodrome_code, year)
+
+    async def get_races_by_distance_range(self, min_distance: int, max_distance: int,
+                                          year: Optional[int] = None) -> List[Race]:
+        return await self._call("get_races_by_distance_range", min_distance, max_distance, year)
+
+    async def get_all_hippodromes(self) -> List[str]:
+        return await self._call("get_all_hippodromes")
+
+    def iter_races(self, start: Optional[date] = None, end: Optional[date] = None,
+                   where: Optional[RacePredicate] = None) -> AsyncIterator[Race]:
+        return self._iterate(self.repository.iter_races(start, end, where))
+
+
+class AsyncHorseRepository(AsyncRepository[HorseRepository]):
+    def __init__(self, repository: Optional[HorseRepository] = None, executor: Optional[Executor] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(repository or HorseRepository(), executor, max_workers, batch_size)
+
+    async def get_horses_by_race(self, race_id: str, race_date: date) -> List[Horse]:
+        return await self._call_on_race("get_horses_by_race", race_date, race_id, race_date)
+
+    async def get_horse_by_number_in_race(self, race_id: str, horse_number: int,
+                                          race_date: date) -> Optional[Horse]:
+        return await self._call_on_race(
+            "get_horse_by_number_in_race", race_date, race_id, horse_number, race_date
+        )
+
+    async def get_horses_by_driver(self, driver_name: str, year: int) -> List[Horse]:
+        return await self._call("get_horses_by_driver", driver_name, year)
+
+    async def get_horses_by_trainer(self, trainer_name: str, year: int) -> List[Horse]:
+        return await self._call("get_horses_by_trainer", trainer_name, year)
+
+    async def get_horse_history(self, horse_id: str, before: Optional[date] = None) -> List[Tuple[date, Horse]]:
+        return await self._call("get_horse_history", horse_id, before)
+
+    def iter_horses(self, start: Optional[date] = None, end: Optional[date] = None,
+                    where: Optional[RacePredicate] = None,
+                    runner_where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> AsyncIterator[Tuple[date, Horse]]:
+        return self._iterate(self.repository.iter_horses(start, end, where, runner_where))
+
+
+class AsyncResultRepository(AsyncRepository[ResultRepository]):
+    def __init__(self, repository: Optional[ResultRepository] = None, executor: Optional[Executor] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE):
+        super().__init__(repository or ResultRepository(), executor, max_workers, batch_size)
+
+    async def get_result_by_race(self, race_id: str, race_date: date) -> Optional[RaceResult]:
+        return await self._call_on_race("get_result_by_race", race_date, race_id, race_date)
+
+    async def get_results_by_date(self, race_date: date) -> List[RaceResult]:
+        return await self._call_on_day("_map_day_results", race_date)
+
+    async def get_winning_horses(self, year: int) -> List[int]:
+        return await self._call("get_winning_horses", year)
+
+    async def get_placed_horses(self, year: int, top_n: int = 3) -> Dict[int, Set[int]]:
+        return await self._call("get_placed_horses", year, top_n)
+
+    def iter_results(self, start: Optional[date] = None, end: Optional[date] = None,
+                     where: Optional[RacePredicate] = None) -> AsyncIterator[Tuple[date, RaceResult]]:
+        return self._iterate(self.repository.iter_results(start, end, where))
@@ -0,0 +1,173 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from src.data_access.mappers.common_mapper import diagnostics, with_diagnostics
+from src.data_access.repositories.race_filter import RaceFilter, RacePredicate
+from src.data_access.storage.columnar_store import ColumnarStore, list_day_files, parse_day_file_name
+from src.data_access.storage.catalog import RaceCatalog
+from src.data_access.storage.race_index import load_race
+from src.data_access.storage.day_file_cache import DayFileCache, shared_day_file_cache
+from src.data_access.storage.snapshot_log import load_day_file
+from src.utils import metrics
+
+T = TypeVar('T')
+
+# Fonction de scan d'un fichier jour : (chemin, données JSON) -> éléments trouvés
+# Elle doit être picklable (fonction de module ou functools.partial) pour le mode parallèle
+FileScanner = Callable[[str, Dict], List[T]]
+
+def _scan_file(scanner: FileScanner, file_path: str) -> List[T]:
+    """Scan d'un fichier dans un processus du pool (sans cache partagé)"""
+    return scanner(file_path, load_day_file(file_path))
+
+class BaseRepository:
+    """Accès commun aux fichiers jour data/raw/<année>/DD_MM_YYYY.json"""
+
+    def __init__(self, base_path: str = "data/raw", columnar_store: Optional[ColumnarStore] = None,
+                 catalog: Optional[RaceCatalog] = None, cache: Optional[DayFileCache] = None,
+                 parallel_workers: Optional[int] = None, parallel_min_files: int = 64):
+        """
+        parallel_workers active le scan multi-processus des années (désactivé si None ou 1)
+        parallel_min_files est le nombre de fichiers en dessous duquel le scan reste séquentiel
+        """
+        self.base_path = base_path
+        self.columnar_store = columnar_store
+        self.catalog = catalog
+        self.cache = cache if cache is not None else shared_day_file_cache
+        self.parallel_workers = parallel_workers
+        self.parallel_min_files = parallel_min_files
+
+    def _get_file_path(self, race_date: date) -> str:
+        """Construit le chemin du fichier pour une date donnée"""
+        return os.path.join(
+            self.base_path,
+            str(race_date.year),
+            f"{race_date.strftime('%d_%m_%Y')}.json"
+        )
+
+    def _scan_available_years(self) -> List[int]:
+        """Scan le répertoire de base pour trouver toutes les années disponibles"""
+        years = []
+        if os.path.exists(self.base_path):
+            for item in os.listdir(self.base_path):
+                year_dir = os.path.join(self.base_path, item)
+                if os.path.isdir(year_dir) and item.isdigit():
+                    years.append(int(item))
+        return sorted(years)
+
+    def _fresh_catalog(self, year: Optional[int] = None) -> RaceCatalog:
+        """Catalogue vérifié sur l'année (toute l'archive si None) au plus une fois par refresh_interval"""
+        self.catalog.refresh_if_stale(year)
+        return self.catalog
+
+    def _timer(self, name: str, **tags):
+        """Chronomètre d'une mesure étiquetée par le repository (partagé et sans effet sans sink actif)"""
+        if not metrics.enabled():
+            return metrics.timer(name)
+        return metrics.timer(name, repository=type(self).__name__, **tags)
+
+    def _load_races_file(self, file_path: str) -> Dict:
+        """Charge le fichier JSON des courses (via le cache partagé)"""
+        with self._timer("repository_load_seconds", source="cache"):
+            return self.cache.load(file_path)
+
+    def _load_race(self, race_date: date, race_id: str,
+                   keys: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """
+        JSON d'une course : depuis le cache si le fichier jour y est, sinon seule la course est décodée
+        via l'index du fichier (sans les enjeux, sauf s'ils sont demandés dans keys)
+        """
+        file_path = self._get_file_path(race_date)
+        data = self.cache.peek(file_path)
+        if data is not None:
+            return data.get(race_id)
+        with self._timer("repository_load_seconds", source="index"):
+            return load_race(file_path, race_id, keys)
+
+    def _scan_years(self, years: List[int], scanner: FileScanner) -> Dict[int, List[T]]:
+        """Applique le scanner à tous les fichiers jour des années, dans l'ordre des dates"""
+        file_years = []
+        for year in years:
+            year_dir = os.path.join(self.base_path, str(year))
+            file_years.extend((os.path.join(year_dir, f), year) for f in list_day_files(year_dir))
+
+        results: Dict[int, List[T]] = {year: [] for year in years}
+        file_paths = [file_path for file_path, _ in file_years]
+
+        if self.parallel_workers and self.parallel_workers > 1 and len(file_paths) >= self.parallel_min_files:
+            chunksize = max(1, len(file_paths) // (self.parallel_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.parallel_workers) as executor:
+                scanned = executor.map(partial(with_diagnostics, _scan_file, scanner), file_paths, chunksize=chunksize)
+                for (_, year), (items, counts) in zip(file_years, scanned):
+                    results[year].extend(items)
+                    diagnostics.merge(counts)
+        else:
+            operation = getattr(scanner, "func", scanner).__name__.lstrip("_")
+            for file_path, year in file_years:
+                data = self._load_races_file(file_path)
+                with self._timer("repository_map_seconds", operation=operation):
+                    results[year].extend(scanner(file_path, data))
+
+        return results
+
+    def _collect_years(self, years: List[int], indexed: Callable[[int], Optional[List[T]]],
+                       scanner: FileScanner) -> List[T]:
+        """
+        Résultats concaténés par année
+        indexed(année) répond via le stockage colonnaire ou le catalogue, None pour scanner les fichiers
+        """
+        results: Dict[int, List[T]] = {}
+        to_scan = []
+        for year in years:
+            items = indexed(year)
+            if items is None:
+                to_scan.append(year)
+            else:
+                results[year] = items
+
+        results.update(self._scan_years(to_scan, scanner))
+        return [item for year in years for item in results[year]]
+
+    def _iter_day_files(self, start: Optional[date] = None,
+                        end: Optional[date] = None) -> Iterator[Tuple[date, str]]:
+        """(date, chemin) des fichiers jour entre start et end inclus, dans l'ordre chronologique"""
+        for year in self._scan_available_years():
+            if (start is not None and year < start.year) or (end is not None and year > end.year):
+                continue
+            year_dir = os.path.join(self.base_path, str(year))
+            for file_name in list_day_files(year_dir):
+                race_date = parse_day_file_name(file_name)
+                if (start is None or race_date >= start) and (end is None or race_date <= end):
+                    yield race_date, os.path.join(year_dir, file_name)
+
+    def _iter_race_data(self, start: Optional[date] = None, end: Optional[date] = None,
+                        where: Optional[RacePredicate] = None) -> Iterator[Tuple[date, str, Dict]]:
+        """
+        (date, race_id, JSON brut) des courses qui passent le prédicat, dans l'ordre chronologique
+        Les fichiers sont lus un par un sans passer par le cache, la mémoire reste celle d'un jour.
+        Un RaceFilter avec un catalogue ne fait ouvrir que les fichiers qui ont une course retenue
+        """
+        selected: Dict[int, Dict[str, Set[str]]] = {}
+        for race_date, file_path in self._iter_day_files(start, end):
+            race_ids = None
+            if self.catalog and isinstance(where, RaceFilter):
+                if race_date.year not in selected:
+                    selected[race_date.year] = {}
+                    for file, race_id in where.find(self._fresh_catalog(race_date.year), race_date.year):
+                        selected[race_date.year].setdefault(file, set()).add(race_id)
+                race_ids = selected[race_date.year].get(os.path.relpath(file_path, self.base_path))
+                if not race_ids:
+                    continue
+
+            with self._timer("repository_load_seconds", source="file"):
+                data = load_day_file(file_path)
+            for race_id, race_data in data.items():
+                if race_ids is not None and race_id not in race_ids:
+                    continue
+                if where is None or where(race_data):
+                    yield race_date, race_id, race_data
+            del data
+
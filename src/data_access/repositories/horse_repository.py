@@ -1,50 +1,78 @@
 import os
-import json
 from datetime import date
-from typing import List, Optional, Dict
+from itertools import groupby
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from src.domain.entities.horse import Horse
+from src.data_access.mappers.horse_identity import resolve_horse_id
 from src.data_access.mappers.horse_mapper import map_json_to_horses, map_json_to_horse
+from src.data_access.repositories.base_repository import BaseRepository
+from src.data_access.repositories.race_filter import RacePredicate
+from src.data_access.storage.columnar_store import parse_day_file_name
 
-class HorseRepository:
-    def __init__(self, base_path: str = "data/raw"):
-        self.base_path = base_path
-
-    def _get_file_path(self, race_date: date) -> str:
-        """Construit le chemin du fichier pour une date donnée"""
-        return os.path.join(
-            self.base_path,
-            str(race_date.year),
-            f"{race_date.strftime('%d_%m_%Y')}.json"
+def _scan_horses(attribute: str, name: str, file_path: str, data: Dict) -> List[Horse]:
+    """Chevaux dont le driver ou l'entraîneur (attribute) correspond au nom, sans tenir compte de la casse"""
+    horses = []
+    for race_id, race_data in data.items():
+        horses.extend(
+            horse for horse in map_json_to_horses(race_id, race_data)
+            if getattr(horse.features, attribute).lower() == name.lower()
         )
+    return horses
 
-    def _load_races_file(self, file_path: str) -> Dict:
-        """Charge le fichier JSON des courses"""
-        if not os.path.exists(file_path):
-            return {}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+def _scan_horse_runs(horse_id: str, before: Optional[date], file_path: str, data: Dict) -> List[Tuple[date, Horse]]:
+    """Courses du cheval dans un fichier jour antérieur à before"""
+    race_date = parse_day_file_name(os.path.basename(file_path))
+    if race_date is None or (before is not None and race_date >= before):
+        return []
+    runs = []
+    for race_id, race_data in data.items():
+        rapports = race_data.get("rapports", {})
+        for num_str, features in race_data.get("horse_features", {}).items():
+            if resolve_horse_id(features, int(num_str)) == horse_id:
+                horse = map_json_to_horse(race_id, int(num_str), features, rapports.get(num_str, {}))
+                runs.append((race_date, horse))
+    return runs
+
+class HorseRepository(BaseRepository):
+    def _load_columnar_horses(self, year: int, rows) -> List[Horse]:
+        """Reconstruit les chevaux des lignes du stockage colonnaire"""
+        return [
+            map_json_to_horse(race_id, num, features, odds_data)
+            for race_id, num, features, odds_data in self.columnar_store.iter_runners(year, rows)
+        ]
+
+    def _load_catalog_horses(self, entries: List[Tuple[str, str, int]]) -> List[Horse]:
+        """Charge les chevaux (fichier, race_id, numéro) renvoyés par le catalogue"""
+        horses = []
+        for file, file_entries in groupby(entries, key=itemgetter(0)):
+            data = self._load_races_file(os.path.join(self.base_path, file))
+            with self._timer("repository_map_seconds", operation="catalog_horses"):
+                for _, race_id, num in file_entries:
+                    race_data = data.get(race_id, {})
+                    features = race_data.get("horse_features", {}).get(str(num))
+                    if features is not None:
+                        odds_data = race_data.get("rapports", {}).get(str(num), {})
+                        horses.append(map_json_to_horse(race_id, num, features, odds_data))
+        return horses
 
     def get_horses_by_race(self, race_id: str, race_date: date) -> List[Horse]:
         """Récupère tous les chevaux participant à une course"""
-        file_path = self._get_file_path(race_date)
-        data = self._load_races_file(file_path)
-        
-        if race_id not in data:
+        race_data = self._load_race(race_date, race_id, keys=("horse_features", "rapports"))
+        if race_data is None:
             return []
             
-        return map_json_to_horses(race_id, data[race_id])
+        with self._timer("repository_map_seconds", operation="get_horses_by_race"):
+            return map_json_to_horses(race_id, race_data)
 
     def get_horse_by_number_in_race(self, race_id: str, horse_number: int, race_date: date) -> Optional[Horse]:
         """Récupère un cheval spécifique dans une course par son numéro"""
-        file_path = self._get_file_path(race_date)
-        data = self._load_races_file(file_path)
-        
-        if race_id not in data:
+        race_data = self._load_race(race_date, race_id, keys=("horse_features", "rapports"))
+        if race_data is None:
             return None
             
-        race_data = data[race_id]
         horse_features = race_data.get("horse_features", {})
         
         if str(horse_number) not in horse_features:
@@ -53,50 +81,68 @@ class HorseRepository:
         features = horse_features[str(horse_number)]
         odds_data = race_data.get("rapports", {}).get(str(horse_number), {})
         
-        return map_json_to_horse(race_id, horse_number, features, odds_data)
+        with self._timer("repository_map_seconds", operation="get_horse_by_number_in_race"):
+            return map_json_to_horse(race_id, horse_number, features, odds_data)
 
     def get_horses_by_driver(self, driver_name: str, year: int) -> List[Horse]:
         """Récupère tous les chevaux conduits par un driver donné sur une année"""
-        year_dir = os.path.join(self.base_path, str(year))
-        if not os.path.exists(year_dir):
-            return []
-            
-        horses = []
-        for file_name in os.listdir(year_dir):
-            if not file_name.endswith('.json'):
-                continue
-                
-            file_path = os.path.join(year_dir, file_name)
-            data = self._load_races_file(file_path)
-            
-            for race_id, race_data in data.items():
-                race_horses = map_json_to_horses(race_id, race_data)
-                horses.extend([
-                    horse for horse in race_horses 
-                    if horse.features.driver.lower() == driver_name.lower()
-                ])
-                
-        return horses
+        def indexed(year: int) -> Optional[List[Horse]]:
+            if self.columnar_store and self.columnar_store.has_year(year):
+                return self._load_columnar_horses(year, self.columnar_store.find_runners(year, driver=driver_name))
+            if self.catalog:
+                return self._load_catalog_horses(
+                    self._fresh_catalog(year).find_runners(driver=driver_name, year=year)
+                )
+            return None
+
+        return self._collect_years([year], indexed, partial(_scan_horses, "driver", driver_name))
 
     def get_horses_by_trainer(self, trainer_name: str, year: int) -> List[Horse]:
         """Récupère tous les chevaux entraînés par un entraîneur donné sur une année"""
-        year_dir = os.path.join(self.base_path, str(year))
-        if not os.path.exists(year_dir):
-            return []
-            
-        horses = []
-        for file_name in os.listdir(year_dir):
-            if not file_name.endswith('.json'):
-                continue
-                
-            file_path = os.path.join(year_dir, file_name)
-            data = self._load_races_file(file_path)
-            
-            for race_id, race_data in data.items():
-                race_horses = map_json_to_horses(race_id, race_data)
-                horses.extend([
-                    horse for horse in race_horses 
-                    if horse.features.entraineur.lower() == trainer_name.lower()
-                ])
-                
-        return horses
\ No newline at end of file
+        def indexed(year: int) -> Optional[List[Horse]]:
+            if self.columnar_store and self.columnar_store.has_year(year):
+                return self._load_columnar_horses(year, self.columnar_store.find_runners(year, entraineur=trainer_name))
+            if self.catalog:
+                return self._load_catalog_horses(
+                    self._fresh_catalog(year).find_runners(entraineur=trainer_name, year=year)
+                )
+            return None
+
+        return self._collect_years([year], indexed, partial(_scan_horses, "entraineur", trainer_name))
+
+    def get_horse_history(self, horse_id: str, before: Optional[date] = None) -> List[Tuple[date, Horse]]:
+        """
+        Courses d'un cheval (identifiant durable), par date, strictement avant before si précisé
+        Avec un catalogue, seuls les fichiers jour de ces courses sont ouverts
+        """
+        if self.catalog:
+            runs = []
+            entries = self._fresh_catalog().find_horse_runs(horse_id, before)
+            for file, file_entries in groupby(entries, key=itemgetter(0)):
+                data = self._load_races_file(os.path.join(self.base_path, file))
+                with self._timer("repository_map_seconds", operation="horse_history"):
+                    for _, race_id, num, date_iso, _ in file_entries:
+                        race_data = data.get(race_id, {})
+                        features = race_data.get("horse_features", {}).get(str(num))
+                        if features is not None:
+                            odds_data = race_data.get("rapports", {}).get(str(num), {})
+                            horse = map_json_to_horse(race_id, num, features, odds_data)
+                            runs.append((date.fromisoformat(date_iso), horse))
+            return runs
+
+        years = [year for year in self._scan_available_years() if before is None or year <= before.year]
+        return self._collect_years(years, lambda year: None, partial(_scan_horse_runs, horse_id, before))
+
+    def iter_horses(self, start: Optional[date] = None, end: Optional[date] = None,
+                    where: Optional[RacePredicate] = None,
+                    runner_where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Tuple[date, Horse]]:
+        """
+        (date, cheval) des partants entre start et end inclus, dans l'ordre chronologique
+        where filtre les courses et runner_where les caractéristiques brutes des partants, avant conversion
+        """
+        for race_date, race_id, race_data in self._iter_race_data(start, end, where):
+            rapports = race_data.get("rapports", {})
+            for num_str, features in race_data.get("horse_features", {}).items():
+                if runner_where is None or runner_where(features):
+                    yield race_date, map_json_to_horse(race_id, int(num_str), features, rapports.get(num_str, {}))
+
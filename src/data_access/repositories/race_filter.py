@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.data_access.storage.catalog import RaceCatalog
+
+# Prédicat sur le JSON brut d'une course, évalué avant toute conversion en entité
+RacePredicate = Callable[[Dict[str, Any]], bool]
+
+
+@dataclass(frozen=True, slots=True)
+class RaceFilter:
+    """
+    Filtre des courses sur les champs bruts du fichier jour (hippodrome, distance, discipline)
+    Avec un catalogue, les repositories s'en servent aussi pour n'ouvrir que les fichiers concernés
+    """
+    hippodrome_code: Optional[str] = None
+    min_distance: Optional[int] = None
+    max_distance: Optional[int] = None
+    discipline: Optional[str] = None
+
+    def __call__(self, race_data: Dict[str, Any]) -> bool:
+        if self.hippodrome_code is not None and (race_data.get("hippodrome") or {}).get("code") != self.hippodrome_code:
+            return False
+        distance = race_data.get("distance", 0)
+        # Distance nulle : aucune plage ne la retient, comme dans le catalogue (NULL)
+        if (self.min_distance is not None or self.max_distance is not None) and distance is None:
+            return False
+        if self.min_distance is not None and distance < self.min_distance:
+            return False
+        if self.max_distance is not None and distance > self.max_distance:
+            return False
+        if self.discipline is not None and race_data.get("discipline") != self.discipline:
+            return False
+        return True
+
+    def find(self, catalog: RaceCatalog, year: int) -> List[Tuple[str, str]]:
+        """(fichier relatif, race_id) des courses de l'année qui passent le filtre, via le catalogue"""
+        return catalog.find_races(
+            hippodrome_code=self.hippodrome_code, min_distance=self.min_distance,
+            max_distance=self.max_distance, discipline=self.discipline, year=year,
+        )
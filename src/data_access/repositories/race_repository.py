@@ -1,142 +1,141 @@
 import os
-import json
 from datetime import date
-from typing import List, Dict, Optional
+from itertools import groupby
+from functools import partial
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from src.domain.entities.race import Race
 from src.data_access.mappers.race_mapper import map_json_to_race
+from src.data_access.repositories.base_repository import BaseRepository
+from src.data_access.repositories.race_filter import RacePredicate
 
-class RaceRepository:
-    def __init__(self, base_path: str = "data/raw"):
-        self.base_path = base_path
-        self._available_years = self._scan_available_years()
+def _scan_races_by_hippodrome(hippodrome_code: str, file_path: str, data: Dict) -> List[Race]:
+    date_str = os.path.basename(file_path).replace('.json', '')
+    return [
+        map_json_to_race(race_id, race_data, date_str)
+        for race_id, race_data in data.items()
+        if race_data.get('hippodrome', {}).get('code') == hippodrome_code
+    ]
 
-    def _scan_available_years(self) -> List[int]:
-        """Scan le répertoire de base pour trouver toutes les années disponibles"""
-        years = []
-        if os.path.exists(self.base_path):
-            for item in os.listdir(self.base_path):
-                year_dir = os.path.join(self.base_path, item)
-                if os.path.isdir(year_dir) and item.isdigit():
-                    years.append(int(item))
-        return sorted(years)
-
-    def _get_file_path(self, race_date: date) -> str:
-        """Construit le chemin du fichier pour une date donnée"""
-        return os.path.join(
-            self.base_path,
-            str(race_date.year),
-            f"{race_date.strftime('%d_%m_%Y')}.json"
-        )
+def _scan_races_by_distance_range(min_distance: int, max_distance: int, file_path: str, data: Dict) -> List[Race]:
+    date_str = os.path.basename(file_path).replace('.json', '')
+    return [
+        map_json_to_race(race_id, race_data, date_str)
+        for race_id, race_data in data.items()
+        # Distance nulle : exclue, comme dans le catalogue et le stockage colonnaire
+        if race_data.get('distance', 0) is not None and min_distance <= race_data.get('distance', 0) <= max_distance
+    ]
 
-    def _load_races_file(self, file_path: str) -> Dict:
-        """Charge le fichier JSON des courses"""
-        if not os.path.exists(file_path):
-            return {}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+def _scan_hippodrome_codes(file_path: str, data: Dict) -> List[str]:
+    codes = (race_data.get('hippodrome', {}).get('code') for race_data in data.values())
+    return [code for code in codes if code]
+
+class RaceRepository(BaseRepository):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._available_years = self._scan_available_years()
+
+    def _load_catalog_races(self, entries: List[Tuple[str, str]]) -> List[Race]:
+        """Charge les courses (fichier, race_id) renvoyées par le catalogue"""
+        races = []
+        for file, file_entries in groupby(entries, key=itemgetter(0)):
+            data = self._load_races_file(os.path.join(self.base_path, file))
+            date_str = os.path.basename(file).replace('.json', '')
+            with self._timer("repository_map_seconds", operation="catalog_races"):
+                for _, race_id in file_entries:
+                    if race_id in data:
+                        races.append(map_json_to_race(race_id, data[race_id], date_str))
+        return races
 
     def get_race_by_id(self, race_id: str, race_date: date) -> Optional[Race]:
         """Récupère une course spécifique par son ID et sa date"""
-        file_path = self._get_file_path(race_date)
-        data = self._load_races_file(file_path)
-        
-        if race_id not in data:
+        race_data = self._load_race(race_date, race_id)
+        if race_data is None:
             return None
             
-        return map_json_to_race(race_id, data[race_id], race_date.strftime('%d_%m_%Y'))
+        with self._timer("repository_map_seconds", operation="get_race_by_id"):
+            return map_json_to_race(race_id, race_data, race_date.strftime('%d_%m_%Y'))
 
     def get_races_by_date(self, race_date: date) -> List[Race]:
         """Récupère toutes les courses pour une date donnée"""
-        file_path = self._get_file_path(race_date)
-        data = self._load_races_file(file_path)
-        
+        return self._map_day_races(self._load_races_file(self._get_file_path(race_date)), race_date)
+
+    def _map_day_races(self, data: Dict, race_date: date) -> List[Race]:
+        """Courses d'un fichier jour déjà chargé"""
         races = []
         date_str = race_date.strftime('%d_%m_%Y')
         
-        for race_id, race_data in data.items():
-            race = map_json_to_race(race_id, race_data, date_str)
-            if race:
-                races.append(race)
+        with self._timer("repository_map_seconds", operation="get_races_by_date"):
+            for race_id, race_data in data.items():
+                race = map_json_to_race(race_id, race_data, date_str)
+                if race:
+                    races.append(race)
                 
         return races
 
     def get_races_by_hippodrome(self, hippodrome_code: str, year: Optional[int] = None) -> List[Race]:
         """Récupère toutes les courses d'un hippodrome pour une année donnée"""
         years_to_search = [year] if year else self._available_years
-        races = []
-        
-        for year in years_to_search:
-            year_dir = os.path.join(self.base_path, str(year))
-            if not os.path.exists(year_dir):
-                continue
-                
-            for file_name in os.listdir(year_dir):
-                if not file_name.endswith('.json'):
-                    continue
-                    
-                file_path = os.path.join(year_dir, file_name)
-                data = self._load_races_file(file_path)
-                
-                date_str = file_name.replace('.json', '')
-                
-                for race_id, race_data in data.items():
-                    if race_data.get('hippodrome', {}).get('code') == hippodrome_code:
-                        race = map_json_to_race(race_id, race_data, date_str)
-                        if race:
-                            races.append(race)
-                            
-        return races
+
+        def indexed(year: int) -> Optional[List[Race]]:
+            if self.columnar_store and self.columnar_store.has_year(year):
+                rows = self.columnar_store.find_races(year, hippodrome_code=hippodrome_code)
+                return [
+                    map_json_to_race(race_id, race_data, date_str)
+                    for date_str, race_id, race_data in self.columnar_store.iter_races(year, rows)
+                ]
+            if self.catalog:
+                return self._load_catalog_races(
+                    self._fresh_catalog(year).find_races(hippodrome_code=hippodrome_code, year=year)
+                )
+            return None
+
+        return self._collect_years(years_to_search, indexed, partial(_scan_races_by_hippodrome, hippodrome_code))
 
     def get_races_by_distance_range(self, min_distance: int, max_distance: int, 
                                   year: Optional[int] = None) -> List[Race]:
         """Récupère toutes les courses dans une plage de distance donnée"""
         years_to_search = [year] if year else self._available_years
-        races = []
-        
-        for year in years_to_search:
-            year_dir = os.path.join(self.base_path, str(year))
-            if not os.path.exists(year_dir):
-                continue
-                
-            for file_name in os.listdir(year_dir):
-                if not file_name.endswith('.json'):
-                    continue
-                    
-                file_path = os.path.join(year_dir, file_name)
-                data = self._load_races_file(file_path)
-                
-                date_str = file_name.replace('.json', '')
-                
-                for race_id, race_data in data.items():
-                    distance = race_data.get('distance', 0)
-                    if min_distance <= distance <= max_distance:
-                        race = map_json_to_race(race_id, race_data, date_str)
-                        if race:
-                            races.append(race)
-                            
-        return races
+
+        def indexed(year: int) -> Optional[List[Race]]:
+            if self.columnar_store and self.columnar_store.has_year(year):
+                rows = self.columnar_store.find_races(year, min_distance=min_distance, max_distance=max_distance)
+                return [
+                    map_json_to_race(race_id, race_data, date_str)
+                    for date_str, race_id, race_data in self.columnar_store.iter_races(year, rows)
+                ]
+            if self.catalog:
+                return self._load_catalog_races(
+                    self._fresh_catalog(year).find_races(
+                        min_distance=min_distance, max_distance=max_distance, year=year
+                    )
+                )
+            return None
+
+        return self._collect_years(
+            years_to_search, indexed, partial(_scan_races_by_distance_range, min_distance, max_distance)
+        )
 
     def get_all_hippodromes(self) -> List[str]:
         """Récupère la liste de tous les hippodromes uniques"""
-        hippodromes = set()
-        
-        for year in self._available_years:
-            year_dir = os.path.join(self.base_path, str(year))
-            if not os.path.exists(year_dir):
-                continue
-                
-            for file_name in os.listdir(year_dir):
-                if not file_name.endswith('.json'):
-                    continue
-                    
-                file_path = os.path.join(year_dir, file_name)
-                data = self._load_races_file(file_path)
-                
-                for race_data in data.values():
-                    hippodrome_code = race_data.get('hippodrome', {}).get('code')
-                    if hippodrome_code:
-                        hippodromes.add(hippodrome_code)
-                        
-        return sorted(list(hippodromes))
\ No newline at end of file
+        if self.catalog:
+            return self._fresh_catalog().get_all_hippodromes()
+
+        def indexed(year: int) -> Optional[List[str]]:
+            if self.columnar_store and self.columnar_store.has_year(year):
+                return self.columnar_store.get_hippodrome_codes(year)
+            return None
+
+        hippodromes = set(self._collect_years(self._available_years, indexed, _scan_hippodrome_codes))
+        return sorted(list(hippodromes))
+
+    def iter_races(self, start: Optional[date] = None, end: Optional[date] = None,
+                   where: Optional[RacePredicate] = None) -> Iterator[Race]:
+        """
+        Courses entre start et end inclus, dans l'ordre chronologique, converties une à une
+        where : prédicat sur le JSON brut (RaceFilter ou fonction), évalué avant la conversion
+        """
+        for race_date, race_id, race_data in self._iter_race_data(start, end, where):
+            yield map_json_to_race(race_id, race_data, race_date.strftime('%d_%m_%Y'))
+
@@ -1,73 +1,59 @@
-import os
-import json
 from datetime import date
-from typing import List, Optional, Dict, Set
+from typing import Iterator, List, Optional, Dict, Set, Tuple
 
 from src.domain.entities.result import RaceResult
 from src.data_access.mappers.result_mapper import map_json_to_result
+from src.data_access.repositories.base_repository import BaseRepository
+from src.data_access.repositories.race_filter import RacePredicate
 
-class ResultRepository:
-    def __init__(self, base_path: str = "data/raw"):
-        self.base_path = base_path
-
-    def _get_file_path(self, race_date: date) -> str:
-        """Construit le chemin du fichier pour une date donnée"""
-        return os.path.join(
-            self.base_path,
-            str(race_date.year),
-            f"{race_date.strftime('%d_%m_%Y')}.json"
-        )
-
-    def _load_races_file(self, file_path: str) -> Dict:
-        """Charge le fichier JSON des courses"""
-        if not os.path.exists(file_path):
-            return {}
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+def _scan_results(file_path: str, data: Dict) -> List[RaceResult]:
+    results = (map_json_to_result(race_id, race_data) for race_id, race_data in data.items())
+    return [result for result in results if result]
 
+class ResultRepository(BaseRepository):
     def get_result_by_race(self, race_id: str, race_date: date) -> Optional[RaceResult]:
         """Récupère le résultat d'une course spécifique"""
-        file_path = self._get_file_path(race_date)
-        data = self._load_races_file(file_path)
-        
-        if race_id not in data:
+        race_data = self._load_race(race_date, race_id, keys=("ordreArrivee", "rapportsDefinitifs"))
+        if race_data is None:
             return None
             
-        return map_json_to_result(race_id, data[race_id])
+        with self._timer("repository_map_seconds", operation="get_result_by_race"):
+            return map_json_to_result(race_id, race_data)
+
+    def _get_year_results(self, year: int) -> List[RaceResult]:
+        """Récupère les résultats des courses terminées d'une année"""
+        def indexed(year: int) -> Optional[List[RaceResult]]:
+            if self.columnar_store and self.columnar_store.has_year(year):
+                return [
+                    map_json_to_result(race_id, race_data)
+                    for race_id, race_data in self.columnar_store.iter_results(year)
+                ]
+            return None
+
+        return self._collect_years([year], indexed, _scan_results)
 
     def get_winning_horses(self, year: int) -> List[int]:
         """Récupère tous les numéros de chevaux gagnants pour une année donnée"""
-        year_dir = os.path.join(self.base_path, str(year))
-        if not os.path.exists(year_dir):
-            return []
-            
         winning_numbers = []
-        for file_name in os.listdir(year_dir):
-            if not file_name.endswith('.json'):
-                continue
-                
-            file_path = os.path.join(year_dir, file_name)
-            data = self._load_races_file(file_path)
-            
-            for race_id, race_data in data.items():
-                result = map_json_to_result(race_id, race_data)
-                if result and result.ordre_arrivee:
-                    # Le premier numéro dans l'ordre d'arrivée est le gagnant
-                    winning_numbers.append(result.ordre_arrivee[0])
+        for result in self._get_year_results(year):
+            if result.ordre_arrivee:
+                # Le premier groupe de l'ordre d'arrivée contient le ou les gagnants (ex aequo)
+                winning_numbers.extend(result.ordre_arrivee[0])
                     
         return winning_numbers
 
     def get_results_by_date(self, race_date: date) -> List[RaceResult]:
         """Récupère tous les résultats des courses pour une date donnée"""
-        file_path = self._get_file_path(race_date)
-        data = self._load_races_file(file_path)
-        
+        return self._map_day_results(self._load_races_file(self._get_file_path(race_date)), race_date)
+
+    def _map_day_results(self, data: Dict, race_date: date) -> List[RaceResult]:
+        """Résultats d'un fichier jour déjà chargé"""
         results = []
-        for race_id, race_data in data.items():
-            result = map_json_to_result(race_id, race_data)
-            if result:
-                results.append(result)
+        with self._timer("repository_map_seconds", operation="get_results_by_date"):
+            for race_id, race_data in data.items():
+                result = map_json_to_result(race_id, race_data)
+                if result:
+                    results.append(result)
                 
         return results
 
@@ -76,23 +62,22 @@ class ResultRepository:
         Récupère les numéros de chevaux placés (top N) pour une année donnée
         Retourne un dictionnaire {position: {numéros de chevaux}}
         """
-        year_dir = os.path.join(self.base_path, str(year))
-        if not os.path.exists(year_dir):
-            return {i: set() for i in range(1, top_n + 1)}
-            
         placed_horses = {i: set() for i in range(1, top_n + 1)}
         
-        for file_name in os.listdir(year_dir):
-            if not file_name.endswith('.json'):
-                continue
-                
-            file_path = os.path.join(year_dir, file_name)
-            data = self._load_races_file(file_path)
-            
-            for race_id, race_data in data.items():
-                result = map_json_to_result(race_id, race_data)
-                if result and result.ordre_arrivee:
-                    for position in range(min(top_n, len(result.ordre_arrivee))):
-                        placed_horses[position + 1].add(result.ordre_arrivee[position])
+        for result in self._get_year_results(year):
+            if result.ordre_arrivee:
+                for position in range(min(top_n, len(result.ordre_arrivee))):
+                    placed_horses[position + 1].update(result.ordre_arrivee[position])
                         
-        return placed_horses
\ No newline at end of file
+        return placed_horses
+
+    def iter_results(self, start: Optional[date] = None, end: Optional[date] = None,
+                     where: Optional[RacePredicate] = None) -> Iterator[Tuple[date, RaceResult]]:
+        """
+        (date, résultat) des courses terminées entre start et end inclus, dans l'ordre chronologique
+        where : prédicat sur le JSON brut de la course, évalué avant la conversion
+        """
+        for race_date, race_id, race_data in self._iter_race_data(start, end, where):
+            if "ordreArrivee" in race_data:
+                yield race_date, map_json_to_result(race_id, race_data)
+
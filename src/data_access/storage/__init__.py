@@ -0,0 +1,12 @@
+from src.data_access.storage.columnar_store import ColumnarStore
+from src.data_access.storage.catalog import RaceCatalog
+from src.data_access.storage.feature_store import FeatureStore
+from src.data_access.storage.day_file_cache import DayFileCache, shared_day_file_cache
+
+__all__ = [
+    'ColumnarStore',
+    'RaceCatalog',
+    'FeatureStore',
+    'DayFileCache',
+    'shared_day_file_cache'
+]
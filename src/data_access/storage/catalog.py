@@ -0,0 +1,300 @@
+import os
+import json
+import sqlite3
+import time
+from datetime import date
+from threading import RLock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.data_access.mappers.horse_identity import resolve_horse_id
+from src.data_access.storage.columnar_store import list_day_files, parse_day_file_name
+
+# Incrémentée à chaque changement de schéma : le catalogue est alors reconstruit
+SCHEMA_VERSION = 3
+
+# Délai minimal entre deux vérifications des fichiers jour d'une année par refresh_if_stale (secondes)
+DEFAULT_REFRESH_INTERVAL = 60.0
+
+# Catalogue lu par les repositories et tenu à jour par le scraper, build_catalog et le backfill
+DEFAULT_DB_PATH = "data/catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    year INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS races (
+    file TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    race_id TEXT NOT NULL,
+    hippodrome_code TEXT,
+    distance INTEGER,
+    discipline TEXT,
+    ordinal INTEGER NOT NULL,  -- rang de la course dans le fichier jour
+    PRIMARY KEY (date, race_id)
+);
+CREATE TABLE IF NOT EXISTS runners (
+    file TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    race_id TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    driver_key TEXT,
+    entraineur_key TEXT,
+    horse_id TEXT,
+    position INTEGER,
+    ordinal INTEGER NOT NULL,  -- rang du partant dans le fichier jour, toutes courses confondues
+    PRIMARY KEY (date, race_id, numero)
+);
+CREATE INDEX IF NOT EXISTS idx_races_hippodrome ON races (hippodrome_code, date);
+CREATE INDEX IF NOT EXISTS idx_races_distance ON races (distance, date);
+CREATE INDEX IF NOT EXISTS idx_races_discipline ON races (discipline, date);
+CREATE INDEX IF NOT EXISTS idx_races_file ON races (file);
+CREATE INDEX IF NOT EXISTS idx_runners_driver ON runners (driver_key, date);
+CREATE INDEX IF NOT EXISTS idx_runners_entraineur ON runners (entraineur_key, date);
+CREATE INDEX IF NOT EXISTS idx_runners_file ON runners (file);
+CREATE INDEX IF NOT EXISTS idx_runners_horse ON runners (horse_id, date);
+"""
+
+
+def _name_key(name: Optional[str]) -> Optional[str]:
+    """Clé de recherche insensible à la casse des drivers et entraîneurs"""
+    return name.lower() if name else name
+
+
+class RaceCatalog:
+    """
+    Catalogue SQLite des fichiers jour de data/raw
+
+    Indexe par (date, race_id) le code hippodrome, la distance, la discipline,
+    le driver et l'entraîneur pour que les repositories n'ouvrent que les
+    fichiers jour concernés. Chaque fichier est réindexé uniquement si son
+    mtime ou sa taille a changé.
+
+    Les partants sont aussi indexés par identifiant durable de cheval et date,
+    avec leur place à l'arrivée : l'historique d'un cheval avant une date se
+    lit sans parcourir l'archive.
+
+    Les requêtes ne relisent pas l'archive : le scraper tient le catalogue à jour (update_file)
+    et les repositories appellent refresh_if_stale, qui ne vérifie les fichiers d'une année
+    qu'une fois par refresh_interval. auto_refresh fait de même avant chaque requête.
+    """
+
+    def __init__(self, base_path: str = "data/raw", db_path: str = DEFAULT_DB_PATH,
+                 auto_refresh: bool = False, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.base_path = base_path
+        self.db_path = db_path
+        self.auto_refresh = auto_refresh
+        self.refresh_interval = refresh_interval
+        # année (None : toutes) -> instant de la dernière vérification (time.monotonic)
+        self._refreshed_at: Dict[Optional[int], float] = {}
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Connexion partagée entre threads (repositories asynchrones), accès sérialisés par le verrou
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = RLock()
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            with self._connection:
+                for table in ("files", "races", "runners"):
+                    self._connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _relative_path(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.base_path)
+
+    # Indexation
+
+    def update_file(self, file_path: str, data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Réindexe un fichier jour s'il est nouveau ou modifié
+        data évite de relire le fichier quand l'appelant l'a déjà en mémoire
+        Retourne True si le fichier a été réindexé
+        """
+        file = self._relative_path(file_path)
+        race_date = parse_day_file_name(os.path.basename(file_path))
+        if race_date is None:
+            return False
+
+        if not os.path.exists(file_path):
+            self._remove_files([file])
+            return False
+
+        stat = os.stat(file_path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT mtime_ns, size FROM files WHERE file = ?", (file,)
+            ).fetchone()
+        if row == (stat.st_mtime_ns, stat.st_size):
+            return False
+
+        if data is None:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+        date_iso = race_date.isoformat()
+        race_rows = []
+        runner_rows = []
+        for race_ordinal, (race_id, race_data) in enumerate(data.items()):
+            hippodrome = race_data.get("hippodrome") or {}
+            race_rows.append((
+                file, race_date.year, date_iso, race_id,
+                hippodrome.get("code"), race_data.get("distance", 0), race_data.get("discipline"), race_ordinal,
+            ))
+            positions = {
+                num: position
+                for position, group in enumerate(race_data.get("ordreArrivee") or [], start=1)
+                for num in group
+            }
+            for num_str, features in race_data.get("horse_features", {}).items():
+                num = int(num_str)
+                runner_rows.append((
+                    file, race_date.year, date_iso, race_id, num,
+                    _name_key(features.get("driver")), _name_key(features.get("entraineur")),
+                    resolve_horse_id(features, num), positions.get(num), len(runner_rows),
+                ))
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM races WHERE file = ?", (file,))
+            self._connection.execute("DELETE FROM runners WHERE file = ?", (file,))
+            self._connection.executemany("INSERT OR REPLACE INTO races VALUES (?, ?, ?, ?, ?, ?, ?, ?)", race_rows)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO runners VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", runner_rows
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                (file, race_date.year, date_iso, stat.st_mtime_ns, stat.st_size),
+            )
+        return True
+
+    def _remove_files(self, files: Iterable[str]) -> None:
+        with self._lock, self._connection:
+            for file in files:
+                for table in ("files", "races", "runners"):
+                    self._connection.execute(f"DELETE FROM {table} WHERE file = ?", (file,))
+
+    def _available_years(self) -> List[int]:
+        if not os.path.exists(self.base_path):
+            return []
+        return sorted(
+            int(item) for item in os.listdir(self.base_path)
+            if item.isdigit() and os.path.isdir(os.path.join(self.base_path, item))
+        )
+
+    def refresh(self, year: Optional[int] = None) -> int:
+        """Met à jour le catalogue (une année ou toutes), retourne le nombre de fichiers réindexés"""
+        years = [year] if year else self._available_years()
+        updated = 0
+        for y in years:
+            year_dir = os.path.join(self.base_path, str(y))
+            present = set()
+            for file_name in list_day_files(year_dir):
+                file_path = os.path.join(year_dir, file_name)
+                present.add(self._relative_path(file_path))
+                updated += self.update_file(file_path)
+
+            with self._lock:
+                indexed = {
+                    file for (file,) in self._connection.execute("SELECT file FROM files WHERE year = ?", (y,))
+                }
+            self._remove_files(indexed - present)
+
+        now = time.monotonic()
+        with self._lock:
+            self._refreshed_at.update({y: now for y in years})
+            if not year:
+                self._refreshed_at[None] = now
+        return updated
+
+    def refresh_if_stale(self, year: Optional[int] = None) -> int:
+        """
+        refresh(year) si l'année (ou toute l'archive) n'a pas été vérifiée depuis refresh_interval
+        par cette instance, sinon ne touche pas au disque. Retourne le nombre de fichiers réindexés
+        """
+        now = time.monotonic()
+        with self._lock:
+            checked_at = max(self._refreshed_at.get(year, float("-inf")), self._refreshed_at.get(None, float("-inf")))
+        if now - checked_at < self.refresh_interval:
+            return 0
+        return self.refresh(year)
+
+    # Requêtes
+
+    def _query(self, sql: str, params: Tuple, year: Optional[int]) -> List[Tuple]:
+        if self.auto_refresh:
+            self.refresh_if_stale(year)
+        if year:
+            sql += " AND year = ?"
+            params += (year,)
+        with self._lock:
+            # Ordre du fichier jour, comme le parcours des fichiers (R1C2 avant R1C10)
+            return self._connection.execute(sql + " ORDER BY date, ordinal", params).fetchall()
+
+    def find_races(self, hippodrome_code: Optional[str] = None, min_distance: Optional[int] = None,
+                   max_distance: Optional[int] = None, discipline: Optional[str] = None,
+                   year: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(fichier relatif, race_id) des courses vérifiant les filtres, par date puis ordre du fichier"""
+        sql = "SELECT file, race_id FROM races WHERE 1 = 1"
+        params: Tuple = ()
+        if hippodrome_code is not None:
+            sql += " AND hippodrome_code = ?"
+            params += (hippodrome_code,)
+        if min_distance is not None:
+            sql += " AND distance >= ?"
+            params += (min_distance,)
+        if max_distance is not None:
+            sql += " AND distance <= ?"
+            params += (max_distance,)
+        if discipline is not None:
+            sql += " AND discipline = ?"
+            params += (discipline,)
+        return self._query(sql, params, year)
+
+    def find_runners(self, driver: Optional[str] = None, entraineur: Optional[str] = None,
+                     year: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """(fichier relatif, race_id, numéro) des partants vérifiant les filtres (insensible à la casse)"""
+        sql = "SELECT file, race_id, numero FROM runners WHERE 1 = 1"
+        params: Tuple = ()
+        if driver is not None:
+            sql += " AND driver_key = ?"
+            params += (_name_key(driver),)
+        if entraineur is not None:
+            sql += " AND entraineur_key = ?"
+            params += (_name_key(entraineur),)
+        return self._query(sql, params, year)
+
+    def find_horse_runs(self, horse_id: str,
+                        before: Optional[date] = None) -> List[Tuple[str, str, int, str, Optional[int]]]:
+        """
+        (fichier relatif, race_id, numéro, date ISO, place) des courses d'un cheval, par date
+        before limite aux courses strictement antérieures à cette date (recherche par index)
+        """
+        if self.auto_refresh:
+            self.refresh_if_stale()
+        sql = "SELECT file, race_id, numero, date, position FROM runners WHERE horse_id = ?"
+        params: Tuple = (horse_id,)
+        if before is not None:
+            sql += " AND date < ?"
+            params += (before.isoformat(),)
+        with self._lock:
+            return self._connection.execute(sql + " ORDER BY date, ordinal", params).fetchall()
+
+    def get_all_hippodromes(self) -> List[str]:
+        """Codes hippodromes distincts de tout le catalogue"""
+        if self.auto_refresh:
+            self.refresh_if_stale()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT hippodrome_code FROM races WHERE hippodrome_code IS NOT NULL AND hippodrome_code != ''"
+                " ORDER BY hippodrome_code"
+            ).fetchall()
+        return [code for (code,) in rows]
@@ -0,0 +1,434 @@
+import os
+import json
+import shutil
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.data_access.mappers.musique_parser import RECENT_RUNS, musique_features_encoded
+from src.data_access.storage.snapshot_log import day_file_signature, load_day_file
+
+# Sentinelles distinguant une clé absente du JSON d'une valeur explicitement nulle
+INT_ABSENT = np.iinfo(np.int64).min
+INT_NULL = INT_ABSENT + 1
+CODE_ABSENT = -1
+CODE_NULL = -2
+
+FORMAT_VERSION = 3
+
+# (chemin JSON, type) des colonnes de chaque table
+RACE_COLUMNS: List[Tuple[str, str]] = [
+    ("heureDepart", "int"),
+    ("montantPrix", "int"),
+    ("distance", "int"),
+    ("discipline", "str"),
+    ("specialite", "str"),
+    ("nombreDeclaresPartants", "int"),
+    ("conditionSexe", "str"),
+    ("grandPrixNationalTrot", "bool"),
+    ("montantOffert1er", "int"),
+    ("montantOffert2eme", "int"),
+    ("montantOffert3eme", "int"),
+    ("nature", "str"),
+    ("hippodrome.code", "str"),
+    ("hippodrome.libelleCourt", "str"),
+    ("hippodrome.libelleLong", "str"),
+    ("meteo.datePrevision", "int"),
+    ("meteo.nebulositeCode", "str"),
+    ("meteo.nebulositeLibelleCourt", "str"),
+    ("meteo.nebulositeLibelleLong", "str"),
+    ("meteo.temperature", "int"),
+    ("meteo.forceVent", "int"),
+    ("meteo.directionVent", "str"),
+]
+
+RUNNER_COLUMNS: List[Tuple[str, str]] = [
+    ("musique", "str"),
+    ("age", "int"),
+    ("oeilleres", "str"),
+    ("deferre", "str"),
+    ("nombreCourses", "int"),
+    ("nombreVictoires", "int"),
+    ("nombrePlaces", "int"),
+    ("nombrePlacesSecond", "int"),
+    ("nombrePlacesTroisieme", "int"),
+    ("driverChange", "bool"),
+    ("avisEntraineur", "str"),
+    ("indicateurInedit", "bool"),
+    ("driver", "str"),
+    ("entraineur", "str"),
+    ("gainsCarriere", "int"),
+    ("gainsVictoires", "int"),
+    ("gainsPlace", "int"),
+    ("gainsAnneeEnCours", "int"),
+    ("gainsAnneePrecedente", "int"),
+    ("nom", "str"),
+    ("sexe", "str"),
+    ("race", "str"),
+    ("nomPere", "str"),
+    ("nomMere", "str"),
+    ("nomPereMere", "str"),
+    ("eleveur", "str"),
+]
+
+_ABSENT = object()
+
+
+def _get_path(data: Dict[str, Any], path: str) -> Any:
+    """Lit une valeur imbriquée ("hippodrome.code"), _ABSENT si une clé manque"""
+    value: Any = data
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return _ABSENT
+        value = value[key]
+    return value
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    """Écrit une valeur imbriquée en créant les dictionnaires intermédiaires"""
+    *parents, last = path.split(".")
+    for key in parents:
+        data = data.setdefault(key, {})
+    data[last] = value
+
+
+class StringDictionary:
+    """Encodage des chaînes répétées (drivers, hippodromes...) en entiers"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self._codes: Dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def codes_where(self, predicate) -> np.ndarray:
+        """Codes des chaînes vérifiant le prédicat"""
+        return np.array([i for i, v in enumerate(self.values) if predicate(v)], dtype=np.int32)
+
+
+def _encode(value: Any, kind: str, strings: StringDictionary) -> Any:
+    if kind == "str":
+        if value is _ABSENT:
+            return CODE_ABSENT
+        return CODE_NULL if value is None else strings.encode(str(value))
+    if kind == "bool":
+        if value is _ABSENT:
+            return CODE_ABSENT
+        return CODE_NULL if value is None else int(bool(value))
+    if value is _ABSENT:
+        return INT_ABSENT
+    return INT_NULL if value is None else int(value)
+
+
+def _decode(raw: Any, kind: str, strings: List[str]) -> Any:
+    raw = int(raw)
+    if kind == "int":
+        if raw == INT_ABSENT:
+            return _ABSENT
+        return None if raw == INT_NULL else raw
+    if raw == CODE_ABSENT:
+        return _ABSENT
+    if raw == CODE_NULL:
+        return None
+    return strings[raw] if kind == "str" else bool(raw)
+
+
+_DTYPES = {"int": np.int64, "str": np.int32, "bool": np.int8}
+
+
+def parse_day_file_name(file_name: str) -> Optional[date]:
+    """Extrait la date d'un nom de fichier DD_MM_YYYY.json"""
+    try:
+        day, month, year = map(int, file_name[:-len(".json")].split("_"))
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def list_day_files(year_dir: str) -> List[str]:
+    """Liste les fichiers jour d'une année, triés par date"""
+    if not os.path.isdir(year_dir):
+        return []
+
+    dated = [
+        (parse_day_file_name(f), f) for f in os.listdir(year_dir) if f.endswith(".json")
+    ]
+    return [f for d, f in sorted(x for x in dated if x[0] is not None)]
+
+
+class ColumnarStore:
+    """
+    Stockage colonnaire par année des fichiers data/raw/<année>/DD_MM_YYYY.json
+
+    Chaque année compactée contient les tables races, runners, odds, results et dividends
+    sauvegardées colonne par colonne en .npy et relues en mémoire mappée.
+    Les chaînes sont encodées via un dictionnaire commun à l'année.
+    """
+
+    def __init__(self, base_path: str = "data/raw", columnar_path: str = "data/columnar"):
+        self.base_path = base_path
+        self.columnar_path = columnar_path
+        # année -> (signature des sources, tables, dictionnaire de chaînes)
+        self._loaded: Dict[int, Tuple[Dict[str, List[int]], Dict[str, Dict[str, np.ndarray]], List[str]]] = {}
+
+    def _year_path(self, year: int) -> str:
+        return os.path.join(self.columnar_path, str(year))
+
+    def _source_signature(self, year: int) -> Dict[str, List[int]]:
+        """(mtime, taille, segments) de chaque fichier jour source de l'année et de son journal"""
+        year_dir = os.path.join(self.base_path, str(year))
+        return {
+            file_name: list(day_file_signature(os.path.join(year_dir, file_name)))
+            for file_name in list_day_files(year_dir)
+        }
+
+    # Compaction
+
+    def compact_year(self, year: int) -> int:
+        """Compacte une année de fichiers JSON en colonnes, retourne le nombre de courses"""
+        year_dir = os.path.join(self.base_path, str(year))
+        signature = self._source_signature(year)
+        strings = StringDictionary()
+
+        races: Dict[str, list] = {name: [] for name in ["date", "race_key", "has_result"]}
+        races.update({path: [] for path, _ in RACE_COLUMNS})
+        runners: Dict[str, list] = {name: [] for name in ["race_row", "numero"]}
+        runners.update({path: [] for path, _ in RUNNER_COLUMNS})
+        odds: Dict[str, list] = {"runner_row": [], "timestamp": [], "value": []}
+        results: Dict[str, list] = {"race_row": [], "rank": [], "numero": []}
+        dividends: Dict[str, list] = {"race_row": [], "type_pari": [], "combinaison": [], "dividende": []}
+
+        for file_name in signature:
+            data = load_day_file(os.path.join(year_dir, file_name))
+            ordinal = parse_day_file_name(file_name).toordinal()
+
+            for race_key, race_data in data.items():
+                race_row = len(races["date"])
+                races["date"].append(ordinal)
+                races["race_key"].append(strings.encode(race_key))
+                races["has_result"].append(int("ordreArrivee" in race_data))
+                for path, kind in RACE_COLUMNS:
+                    races[path].append(_encode(_get_path(race_data, path), kind, strings))
+
+                rapports = race_data.get("rapports", {})
+                for num_str, features in race_data.get("horse_features", {}).items():
+                    runner_row = len(runners["race_row"])
+                    runners["race_row"].append(race_row)
+                    runners["numero"].append(int(num_str))
+                    for path, kind in RUNNER_COLUMNS:
+                        runners[path].append(_encode(_get_path(features, path), kind, strings))
+
+                    for ts, value in rapports.get(num_str, {}).items():
+                        odds["runner_row"].append(runner_row)
+                        odds["timestamp"].append(int(ts))
+                        odds["value"].append(np.nan if value is None else float(value))
+
+                for rank, group in enumerate(race_data.get("ordreArrivee", [])):
+                    for numero in group:
+                        results["race_row"].append(race_row)
+                        results["rank"].append(rank)
+                        results["numero"].append(int(numero))
+
+                for type_pari, rapports_pari in race_data.get("rapportsDefinitifs", {}).items():
+                    for combinaison, dividende in rapports_pari.items():
+                        dividends["race_row"].append(race_row)
+                        dividends["type_pari"].append(strings.encode(type_pari))
+                        dividends["combinaison"].append(strings.encode(combinaison))
+                        dividends["dividende"].append(float(dividende))
+
+        race_dtypes = {"date": np.int32, "race_key": np.int32, "has_result": np.int8}
+        race_dtypes.update({path: _DTYPES[kind] for path, kind in RACE_COLUMNS})
+        runner_dtypes = {"race_row": np.int32, "numero": np.int32}
+        runner_dtypes.update({path: _DTYPES[kind] for path, kind in RUNNER_COLUMNS})
+        tables = {
+            "races": (races, race_dtypes),
+            "runners": (runners, runner_dtypes),
+            "odds": (odds, {"runner_row": np.int32, "timestamp": np.int64, "value": np.float64}),
+            "results": (results, {"race_row": np.int32, "rank": np.int16, "numero": np.int32}),
+            "dividends": (dividends, {
+                "race_row": np.int32, "type_pari": np.int32, "combinaison": np.int32, "dividende": np.float64
+            }),
+        }
+
+        # Écriture dans un répertoire temporaire puis remplacement de l'ancienne version
+        target = self._year_path(year)
+        tmp = target + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        for table, (columns, dtypes) in tables.items():
+            os.makedirs(os.path.join(tmp, table))
+            for name, values in columns.items():
+                np.save(os.path.join(tmp, table, f"{name}.npy"), np.asarray(values, dtype=dtypes[name]))
+
+        with open(os.path.join(tmp, "strings.json"), "w", encoding="utf-8") as f:
+            json.dump(strings.values, f)
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": FORMAT_VERSION, "sources": signature}, f)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.rename(tmp, target)
+        self._loaded.pop(year, None)
+
+        return len(races["date"])
+
+    # Lecture
+
+    def has_year(self, year: int) -> bool:
+        """Indique si l'année est compactée et à jour par rapport aux fichiers JSON"""
+        manifest_path = os.path.join(self._year_path(year), "manifest.json")
+        if not os.path.exists(manifest_path):
+            return False
+
+        loaded = self._loaded.get(year)
+        if loaded is None:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != FORMAT_VERSION:
+                return False
+            sources = manifest["sources"]
+        else:
+            sources = loaded[0]
+
+        return sources == self._source_signature(year)
+
+    def _year(self, year: int) -> Tuple[Dict[str, Dict[str, np.ndarray]], List[str]]:
+        """Charge (en mémoire mappée) les tables d'une année"""
+        if year not in self._loaded:
+            year_path = self._year_path(year)
+            with open(os.path.join(year_path, "manifest.json"), "r", encoding="utf-8") as f:
+                sources = json.load(f)["sources"]
+            with open(os.path.join(year_path, "strings.json"), "r", encoding="utf-8") as f:
+                strings = json.load(f)
+
+            tables = {}
+            for table in os.listdir(year_path):
+                table_path = os.path.join(year_path, table)
+                if not os.path.isdir(table_path):
+                    continue
+                tables[table] = {
+                    file_name[:-len(".npy")]: np.load(os.path.join(table_path, file_name), mmap_mode="r")
+                    for file_name in os.listdir(table_path)
+                }
+            self._loaded[year] = (sources, tables, strings)
+
+        _, tables, strings = self._loaded[year]
+        return tables, strings
+
+    def find_races(self, year: int, hippodrome_code: Optional[str] = None,
+                   min_distance: Optional[int] = None, max_distance: Optional[int] = None) -> np.ndarray:
+        """Indices des courses vérifiant les filtres"""
+        tables, strings = self._year(year)
+        races = tables["races"]
+        mask = np.ones(len(races["date"]), dtype=bool)
+
+        if hippodrome_code is not None:
+            codes = StringDictionary(strings).codes_where(lambda v: v == hippodrome_code)
+            mask &= np.isin(races["hippodrome.code"], codes)
+
+        if min_distance is not None or max_distance is not None:
+            # Une distance absente vaut 0 comme dans map_json_to_race
+            distance = np.where(races["distance"] == INT_ABSENT, 0, races["distance"])
+            mask &= races["distance"] != INT_NULL
+            if min_distance is not None:
+                mask &= distance >= min_distance
+            if max_distance is not None:
+                mask &= distance <= max_distance
+
+        return np.flatnonzero(mask)
+
+    def find_runners(self, year: int, driver: Optional[str] = None,
+                     entraineur: Optional[str] = None) -> np.ndarray:
+        """Indices des partants vérifiant les filtres (comparaison insensible à la casse)"""
+        tables, strings = self._year(year)
+        runners = tables["runners"]
+        mask = np.ones(len(runners["race_row"]), dtype=bool)
+        dictionary = StringDictionary(strings)
+
+        for column, name in (("driver", driver), ("entraineur", entraineur)):
+            if name is None:
+                continue
+            codes = dictionary.codes_where(lambda v: v.lower() == name.lower())
+            mask &= np.isin(runners[column], codes)
+
+        return np.flatnonzero(mask)
+
+    def get_hippodrome_codes(self, year: int) -> List[str]:
+        """Codes hippodromes distincts de l'année"""
+        tables, strings = self._year(year)
+        codes = np.unique(tables["races"]["hippodrome.code"])
+        return [strings[code] for code in codes if code >= 0 and strings[code]]
+
+    def iter_races(self, year: int, rows: np.ndarray) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Reconstruit (date_str, race_id, race_data) pour les courses demandées"""
+        tables, strings = self._year(year)
+        races = tables["races"]
+        for row in rows:
+            race_data: Dict[str, Any] = {}
+            for path, kind in RACE_COLUMNS:
+                value = _decode(races[path][row], kind, strings)
+                if value is not _ABSENT:
+                    _set_path(race_data, path, value)
+            date_str = date.fromordinal(int(races["date"][row])).strftime("%d_%m_%Y")
+            yield date_str, strings[races["race_key"][row]], race_data
+
+    def get_musique_features(self, year: int, rows: Optional[np.ndarray] = None,
+                             recent: int = RECENT_RUNS) -> Dict[str, np.ndarray]:
+        """Statistiques de forme de la musique des partants (tous si rows est None), une fois par musique distincte"""
+        tables, strings = self._year(year)
+        codes = tables["runners"]["musique"]
+        return musique_features_encoded(codes if rows is None else codes[rows], strings, recent)
+
+    def iter_runners(self, year: int, rows: np.ndarray) -> Iterator[Tuple[str, int, Dict[str, Any], Dict[str, float]]]:
+        """Reconstruit (race_id, numero, features, cotes) pour les partants demandés"""
+        tables, strings = self._year(year)
+        races, runners, odds = tables["races"], tables["runners"], tables["odds"]
+        starts = np.searchsorted(odds["runner_row"], rows, side="left")
+        ends = np.searchsorted(odds["runner_row"], rows, side="right")
+
+        for row, start, end in zip(rows, starts, ends):
+            features: Dict[str, Any] = {}
+            for path, kind in RUNNER_COLUMNS:
+                value = _decode(runners[path][row], kind, strings)
+                if value is not _ABSENT:
+                    features[path] = value
+            runner_odds = {
+                str(ts): float(value)
+                for ts, value in zip(odds["timestamp"][start:end], odds["value"][start:end])
+            }
+            race_id = strings[races["race_key"][runners["race_row"][row]]]
+            yield race_id, int(runners["numero"][row]), features, runner_odds
+
+    def iter_results(self, year: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Reconstruit (race_id, données de résultat) pour les courses terminées"""
+        tables, strings = self._year(year)
+        races, results, dividends = tables["races"], tables["results"], tables["dividends"]
+        rows = np.flatnonzero(races["has_result"] == 1)
+        result_starts = np.searchsorted(results["race_row"], rows, side="left")
+        result_ends = np.searchsorted(results["race_row"], rows, side="right")
+        dividend_starts = np.searchsorted(dividends["race_row"], rows, side="left")
+        dividend_ends = np.searchsorted(dividends["race_row"], rows, side="right")
+
+        for row, r_start, r_end, d_start, d_end in zip(rows, result_starts, result_ends,
+                                                       dividend_starts, dividend_ends):
+            ordre_arrivee: List[List[int]] = []
+            for rank, numero in zip(results["rank"][r_start:r_end], results["numero"][r_start:r_end]):
+                while len(ordre_arrivee) <= rank:
+                    ordre_arrivee.append([])
+                ordre_arrivee[rank].append(int(numero))
+
+            rapports_definitifs: Dict[str, Dict[str, float]] = {}
+            for type_pari, combinaison, dividende in zip(dividends["type_pari"][d_start:d_end],
+                                                         dividends["combinaison"][d_start:d_end],
+                                                         dividends["dividende"][d_start:d_end]):
+                rapports_definitifs.setdefault(strings[type_pari], {})[strings[combinaison]] = float(dividende)
+
+            yield strings[races["race_key"][row]], {
+                "ordreArrivee": ordre_arrivee,
+                "rapportsDefinitifs": rapports_definitifs,
+            }
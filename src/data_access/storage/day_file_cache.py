@@ -0,0 +1,127 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from src.data_access.storage.snapshot_log import day_file_signature, load_day_file_with_format
+from src.utils import metrics
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Mémoire des données décodées / taille du fichier jour et de son journal, mesurée avec tracemalloc
+# sur des fichiers synthétiques : JSON indenté écrit par le scraper, JSON compact aux enjeux
+# compactés (compact_snapshots --pack-enjeux) dont l'indentation ne gonfle pas la taille sur disque
+INDENTED_SIZE_FACTOR = 1.7
+COMPACT_SIZE_FACTOR = 3.6
+
+
+def estimated_size(file_bytes: int, indented: bool) -> int:
+    """Mémoire estimée d'un fichier jour décodé, d'après sa taille et son format (indenté ou compact)"""
+    return int(file_bytes * (INDENTED_SIZE_FACTOR if indented else COMPACT_SIZE_FACTOR))
+
+
+class DayFileCache:
+    """
+    Cache LRU des fichiers jour JSON partagé entre les repositories
+
+    Le budget porte sur la mémoire estimée des données décodées (estimated_size),
+    pas sur la taille des fichiers : les dictionnaires occupent 1,7 à 3,6 fois
+    la taille du fichier selon son format. Une entrée est invalidée dès que le
+    mtime ou la taille du fichier (ou de son journal de cotes) change. Les
+    données renvoyées sont partagées : elles ne doivent pas être modifiées.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # chemin -> (signature, mémoire estimée, données)
+        self._entries: OrderedDict[str, Tuple[Tuple[int, int, int], int, Dict[str, Any]]] = OrderedDict()
+        self._lock = Lock()
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        """Charge un fichier jour depuis le cache ou le disque ({} s'il n'existe pas)"""
+        key = os.path.abspath(file_path)
+        signature = day_file_signature(key)
+        if signature is None:
+            self.invalidate(key)
+            return {}
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.increment("day_file_cache_total", result="hit")
+                    return entry[2]
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        metrics.increment("day_file_cache_total", result="miss")
+        with metrics.timer("day_file_parse_seconds"):
+            data, indented = load_day_file_with_format(key)
+
+        size = estimated_size(signature[1], indented)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (signature, size, data)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+
+        return data
+
+    def peek(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Données du fichier si elles sont en cache et à jour, None sinon (sans lecture du disque)"""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != day_file_signature(key):
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[2]
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def invalidate(self, file_path: str) -> None:
+        """Retire un fichier du cache"""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs de hits, misses, évictions et invalidations"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Instance utilisée par défaut par tous les repositories
+shared_day_file_cache = DayFileCache()
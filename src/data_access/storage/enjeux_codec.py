@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional
+
+from src.domain.entities.pool import decode_combination, encode_combination
+
+# Séparateur des numéros dans les clés de combinaison du scraper (COMBINATION_JOIN)
+COMBINATION_SEPARATOR = "-"
+
+# Format compact d'un type de pari dans "enjeux" :
+# {"combinaisons": [code, ...], "timestamps": [ms, ...], "montants": [[montant ou null par combinaison], ...]}
+# une ligne de montants par relevé, null quand la combinaison est absente du relevé
+PACKED_KEYS = ("combinaisons", "timestamps", "montants")
+
+
+def is_packed(amounts: Dict[str, Any]) -> bool:
+    return "combinaisons" in amounts
+
+
+def pack_bet_kind(amounts: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, list]]:
+    """{"1-2-3": {timestamp str: montant}} -> format compact, None si une combinaison n'est pas numérique"""
+    try:
+        codes = {
+            combination: encode_combination([int(n) for n in combination.split(COMBINATION_SEPARATOR)])
+            for combination in amounts
+        }
+    except ValueError:
+        return None
+
+    combinations = sorted(amounts, key=codes.get)
+    timestamps = sorted({int(ts) for by_time in amounts.values() for ts in by_time})
+    return {
+        "combinaisons": [codes[combination] for combination in combinations],
+        "timestamps": timestamps,
+        "montants": [
+            [amounts[combination].get(str(ts)) for combination in combinations]
+            for ts in timestamps
+        ],
+    }
+
+
+def unpack_bet_kind(packed: Dict[str, list]) -> Dict[str, Dict[str, Any]]:
+    """Format compact -> format du scraper"""
+    keys = [COMBINATION_SEPARATOR.join(map(str, decode_combination(code))) for code in packed["combinaisons"]]
+    amounts: Dict[str, Dict[str, Any]] = {key: {} for key in keys}
+    for ts, row in zip(packed["timestamps"], packed["montants"]):
+        for key, amount in zip(keys, row):
+            if amount is not None:
+                amounts[key][str(ts)] = amount
+    return amounts
+
+
+def pack_enjeux(enjeux: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Enjeux d'une course au format compact (les types déjà compacts ou non numériques sont gardés tels quels)"""
+    packed = {}
+    for bet_kind, amounts in enjeux.items():
+        packed[bet_kind] = amounts if is_packed(amounts) else (pack_bet_kind(amounts) or amounts)
+    return packed
+
+
+def unpack_enjeux(enjeux: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        bet_kind: unpack_bet_kind(amounts) if is_packed(amounts) else amounts
+        for bet_kind, amounts in enjeux.items()
+    }
+
+
+def pack_day(data: Dict[str, Any]) -> int:
+    """Compacte les enjeux de toutes les courses d'un fichier jour (en place), retourne le nombre de types compactés"""
+    packed = 0
+    for race_data in data.values():
+        enjeux = race_data.get("enjeux")
+        if not enjeux:
+            continue
+        before = sum(is_packed(amounts) for amounts in enjeux.values())
+        race_data["enjeux"] = pack_enjeux(enjeux)
+        packed += sum(is_packed(amounts) for amounts in race_data["enjeux"].values()) - before
+    return packed
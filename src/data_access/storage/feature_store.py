@@ -0,0 +1,359 @@
+import os
+import json
+import sqlite3
+from bisect import bisect_left
+from datetime import datetime
+from time import monotonic
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.mappers.horse_identity import resolve_horse_id
+from src.data_access.storage.columnar_store import list_day_files, parse_day_file_name
+from src.data_access.storage.snapshot_log import day_file_signature, load_day_file
+
+# Fenêtres glissantes : nom -> nombre de jours (None : tout l'historique)
+DEFAULT_WINDOWS: Dict[str, Optional[int]] = {"30j": 30, "365j": 365, "total": None}
+
+# Entités agrégées pour chaque partant
+KINDS = ("driver", "entraineur", "cheval", "cheval_hippodrome", "cheval_distance", "driver_hippodrome")
+
+DEFAULT_DISTANCE_BAND = 400
+# Délai après le départ d'une course avant que son résultat soit considéré comme connu
+DEFAULT_SETTLE_MINUTES = 30
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Délai minimal entre deux vérifications des fichiers jour d'une année par refresh_if_stale (secondes)
+DEFAULT_REFRESH_INTERVAL = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,
+    year INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    file TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    win INTEGER NOT NULL,
+    place INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_file ON events (file);
+"""
+
+
+def _lower(name: Optional[str]) -> Optional[str]:
+    return name.lower() if name else None
+
+
+def distance_band(distance: Optional[int], band: int = DEFAULT_DISTANCE_BAND) -> str:
+    """Tranche de distance ("2400-2799" pour band=400)"""
+    lower = (distance or 0) // band * band
+    return f"{lower}-{lower + band - 1}"
+
+
+def runner_keys(race_data: Dict[str, Any], num: int, features: Dict[str, Any],
+                band: int = DEFAULT_DISTANCE_BAND) -> Dict[str, Optional[str]]:
+    """Clé de chaque entité agrégée (KINDS) pour un partant, None si l'information manque"""
+    hippodrome = (race_data.get("hippodrome") or {}).get("code")
+    driver = _lower(features.get("driver"))
+    horse_id = resolve_horse_id(features, num)
+    return {
+        "driver": driver,
+        "entraineur": _lower(features.get("entraineur")),
+        "cheval": horse_id,
+        "cheval_hippodrome": f"{horse_id}|{hippodrome}" if hippodrome else None,
+        "cheval_distance": f"{horse_id}|{distance_band(race_data.get('distance'), band)}",
+        "driver_hippodrome": f"{driver}|{hippodrome}" if driver and hippodrome else None,
+    }
+
+
+class _Aggregate:
+    """Courses d'une entité triées par heure de départ, avec cumuls de victoires et de places"""
+
+    __slots__ = ("times", "wins", "places", "cum_wins", "cum_places")
+
+    def __init__(self):
+        self.times: List[int] = []
+        self.wins: List[int] = []
+        self.places: List[int] = []
+        self.cum_wins: List[int] = [0]
+        self.cum_places: List[int] = [0]
+
+    def _recompute(self, start: int) -> None:
+        del self.cum_wins[start + 1:]
+        del self.cum_places[start + 1:]
+        for i in range(start, len(self.times)):
+            self.cum_wins.append(self.cum_wins[-1] + self.wins[i])
+            self.cum_places.append(self.cum_places[-1] + self.places[i])
+
+    def add(self, time: int, win: int, place: int) -> None:
+        if not self.times or time >= self.times[-1]:
+            # Cas courant : nouvelle journée, ajout en fin de série
+            self.times.append(time)
+            self.wins.append(win)
+            self.places.append(place)
+            self.cum_wins.append(self.cum_wins[-1] + win)
+            self.cum_places.append(self.cum_places[-1] + place)
+            return
+        position = bisect_left(self.times, time)
+        self.times.insert(position, time)
+        self.wins.insert(position, win)
+        self.places.insert(position, place)
+        self._recompute(position)
+
+    def remove(self, time: int, win: int, place: int) -> None:
+        position = bisect_left(self.times, time)
+        while position < len(self.times) and self.times[position] == time:
+            if self.wins[position] == win and self.places[position] == place:
+                del self.times[position], self.wins[position], self.places[position]
+                self._recompute(position)
+                return
+            position += 1
+
+    def window(self, end: int, start: Optional[int]) -> Tuple[int, int, int]:
+        """(courses, victoires, places) des départs dans [start, end["""
+        i = bisect_left(self.times, end)
+        j = bisect_left(self.times, start, 0, i) if start is not None else 0
+        return i - j, self.cum_wins[i] - self.cum_wins[j], self.cum_places[i] - self.cum_places[j]
+
+
+class FeatureStore:
+    """
+    Agrégats glissants sans fuite d'information (courses, taux de victoire et de place)
+    des drivers, entraîneurs, chevaux, chevaux par hippodrome et par tranche de distance
+
+    Les résultats des fichiers jour sont stockés comme événements dans une base
+    SQLite mise à jour fichier par fichier (mtime/taille) : une nouvelle journée
+    ne coûte que ses propres courses. Les requêtes se font à l'heure de départ de
+    la course et ne voient que les courses parties au moins settle_minutes avant.
+
+    La base est mise à jour par refresh (scripts.storage.build_features). Avec auto_refresh,
+    les requêtes vérifient seulement l'année des courses demandées, au plus une fois par
+    refresh_interval : servir les courses du jour ne relit pas toute l'archive.
+    """
+
+    def __init__(self, base_path: str = "data/raw", db_path: str = "data/features.sqlite",
+                 windows: Optional[Dict[str, Optional[int]]] = None,
+                 settle_minutes: int = DEFAULT_SETTLE_MINUTES,
+                 band: int = DEFAULT_DISTANCE_BAND, auto_refresh: bool = False,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.base_path = base_path
+        self.db_path = db_path
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self.settle_ms = settle_minutes * 60 * 1000
+        self.band = band
+        self.auto_refresh = auto_refresh
+        self.refresh_interval = refresh_interval
+        # année (None : toutes) -> instant de la dernière vérification
+        self._refreshed_at: Dict[Optional[int], float] = {}
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connection = sqlite3.connect(db_path)
+        self._connection.executescript(SCHEMA)
+        self._check_config()
+        self._index: Optional[Dict[Tuple[str, str], _Aggregate]] = None
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _check_config(self) -> None:
+        """Vide la base si elle a été construite avec d'autres clés d'entités"""
+        config = json.dumps({"band": self.band, "kinds": KINDS})
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+        if row is not None and row[0] == config:
+            return
+        with self._connection:
+            self._connection.execute("DELETE FROM events")
+            self._connection.execute("DELETE FROM files")
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('config', ?)", (config,))
+
+    # Indexation
+
+    def _load_index(self) -> Dict[Tuple[str, str], _Aggregate]:
+        if self._index is None:
+            index: Dict[Tuple[str, str], _Aggregate] = {}
+            rows = self._connection.execute("SELECT kind, key, time, win, place FROM events ORDER BY time")
+            for kind, key, time, win, place in rows:
+                aggregate = index.get((kind, key))
+                if aggregate is None:
+                    aggregate = index[(kind, key)] = _Aggregate()
+                aggregate.add(time, win, place)
+            self._index = index
+        return self._index
+
+    def _file_events(self, file: str, data: Dict[str, Any]) -> List[Tuple[str, str, str, int, int, int]]:
+        events = []
+        for race_id, race_data in data.items():
+            ordre_arrivee = race_data.get("ordreArrivee")
+            time = race_data.get("heureDepart")
+            if not ordre_arrivee or time is None:
+                continue
+            positions = {num: position for position, group in enumerate(ordre_arrivee, start=1) for num in group}
+            for num_str, features in race_data.get("horse_features", {}).items():
+                position = positions.get(int(num_str))
+                win = int(position == 1)
+                place = int(position is not None and position <= 3)
+                for kind, key in runner_keys(race_data, int(num_str), features, self.band).items():
+                    if key is not None:
+                        events.append((file, kind, key, time, win, place))
+        return events
+
+    def update_file(self, file_path: str) -> bool:
+        """Réindexe les résultats d'un fichier jour nouveau ou modifié, retourne True s'il l'a été"""
+        file = os.path.relpath(file_path, self.base_path)
+        race_date = parse_day_file_name(os.path.basename(file_path))
+        if race_date is None:
+            return False
+
+        signature = day_file_signature(file_path)
+        row = self._connection.execute("SELECT mtime_ns, size FROM files WHERE file = ?", (file,)).fetchone()
+        if signature is not None and row == tuple(signature[:2]):
+            return False
+
+        old_events = []
+        if row is not None:
+            old_events = self._connection.execute(
+                "SELECT kind, key, time, win, place FROM events WHERE file = ?", (file,)
+            ).fetchall()
+        events = self._file_events(file, load_day_file(file_path)) if signature is not None else []
+
+        with self._connection:
+            self._connection.execute("DELETE FROM events WHERE file = ?", (file,))
+            self._connection.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)", events)
+            if signature is None:
+                self._connection.execute("DELETE FROM files WHERE file = ?", (file,))
+            else:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (file, race_date.year, signature[0], signature[1]),
+                )
+
+        if self._index is not None:
+            for kind, key, time, win, place in old_events:
+                self._index[(kind, key)].remove(time, win, place)
+            for _, kind, key, time, win, place in events:
+                aggregate = self._index.get((kind, key))
+                if aggregate is None:
+                    aggregate = self._index[(kind, key)] = _Aggregate()
+                aggregate.add(time, win, place)
+        return True
+
+    def _available_years(self) -> List[int]:
+        if not os.path.exists(self.base_path):
+            return []
+        return sorted(
+            int(item) for item in os.listdir(self.base_path)
+            if item.isdigit() and os.path.isdir(os.path.join(self.base_path, item))
+        )
+
+    def refresh(self, year: Optional[int] = None) -> int:
+        """Met à jour la base (une année ou toutes), retourne le nombre de fichiers réindexés"""
+        updated = 0
+        years = [year] if year else self._available_years()
+        for y in years:
+            year_dir = os.path.join(self.base_path, str(y))
+            present = set()
+            for file_name in list_day_files(year_dir):
+                file_path = os.path.join(year_dir, file_name)
+                present.add(os.path.relpath(file_path, self.base_path))
+                updated += self.update_file(file_path)
+            indexed = {file for (file,) in self._connection.execute("SELECT file FROM files WHERE year = ?", (y,))}
+            for file in indexed - present:
+                updated += self.update_file(os.path.join(self.base_path, file))
+
+        now = monotonic()
+        self._refreshed_at.update({y: now for y in years})
+        if not year:
+            self._refreshed_at[None] = now
+        return updated
+
+    def refresh_if_stale(self, year: Optional[int] = None) -> int:
+        """refresh(year) si l'année (ou toute l'archive) n'a pas été vérifiée depuis refresh_interval"""
+        checked_at = max(self._refreshed_at.get(year, float("-inf")), self._refreshed_at.get(None, float("-inf")))
+        if monotonic() - checked_at < self.refresh_interval:
+            return 0
+        return self.refresh(year)
+
+    # Requêtes
+
+    def feature_names(self) -> List[str]:
+        return [
+            f"{kind}_{window}_{stat}"
+            for kind in KINDS
+            for window in self.windows
+            for stat in ("courses", "taux_victoire", "taux_place")
+        ]
+
+    def _runner_vector(self, index: Dict[Tuple[str, str], _Aggregate], keys: Dict[str, Optional[str]],
+                       as_of: int) -> List[float]:
+        end = as_of - self.settle_ms
+        vector = []
+        for kind in KINDS:
+            aggregate = index.get((kind, keys[kind])) if keys[kind] is not None else None
+            for days in self.windows.values():
+                if aggregate is None:
+                    vector.extend((0, np.nan, np.nan))
+                    continue
+                runs, wins, places = aggregate.window(end, end - days * DAY_MS if days is not None else None)
+                vector.extend((runs, wins / runs, places / runs) if runs else (0, np.nan, np.nan))
+        return vector
+
+    def race_features(self, race_data: Dict[str, Any]) -> Tuple[List[int], np.ndarray]:
+        """
+        (numéros, matrice partants x feature_names()) à l'heure de départ de la course
+        Sert aussi bien l'entraînement que les courses du jour (sans résultat)
+        """
+        if self.auto_refresh:
+            as_of = race_data.get("heureDepart")
+            self.refresh_if_stale(datetime.fromtimestamp(as_of / 1000).year if as_of else None)
+        return self._race_features(self._load_index(), race_data)
+
+    def _race_features(self, index: Dict[Tuple[str, str], _Aggregate],
+                       race_data: Dict[str, Any]) -> Tuple[List[int], np.ndarray]:
+        as_of = race_data.get("heureDepart") or 0
+        numeros, rows = [], []
+        for num_str, features in race_data.get("horse_features", {}).items():
+            numeros.append(int(num_str))
+            rows.append(self._runner_vector(index, runner_keys(race_data, int(num_str), features, self.band), as_of))
+        matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(self.feature_names()))
+        return numeros, matrix
+
+    def day_features(self, file_paths: Iterable[str]) -> pd.DataFrame:
+        """Une ligne par partant des fichiers jour (date, race_id, numero, features), à l'heure de chaque course"""
+        file_paths = list(file_paths)
+        if self.auto_refresh:
+            for year in sorted({int(os.path.basename(os.path.dirname(path))) for path in file_paths}):
+                self.refresh_if_stale(year)
+        index = self._load_index()
+        names = self.feature_names()
+        frames = []
+        for file_path in file_paths:
+            race_date = parse_day_file_name(os.path.basename(file_path))
+            for race_id, race_data in load_day_file(file_path).items():
+                numeros, matrix = self._race_features(index, race_data)
+                frame = pd.DataFrame(matrix, columns=names)
+                frame.insert(0, "numero", numeros)
+                frame.insert(0, "race_id", race_id)
+                frame.insert(0, "date", race_date)
+                frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=["date", "race_id", "numero"] + names)
+        return pd.concat(frames, ignore_index=True)
+
+    def training_frame(self, years: Iterable[int]) -> pd.DataFrame:
+        """Features point-in-time de tous les partants des années demandées"""
+        file_paths = []
+        for year in years:
+            year_dir = os.path.join(self.base_path, str(year))
+            file_paths.extend(os.path.join(year_dir, file_name) for file_name in list_day_files(year_dir))
+        return self.day_features(file_paths)
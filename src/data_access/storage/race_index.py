@@ -0,0 +1,153 @@
+import os
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.data_access.storage.snapshot_log import list_segments, load_day_file, merge_segments, write_json_atomic
+
+# Index écrit à côté du fichier jour : DD_MM_YYYY.json.idx
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# Sous-objets volumineux ignorés par défaut lors de la lecture d'une course
+DEFAULT_SKIP = ("enjeux",)
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def get_index_path(day_file_path: str) -> str:
+    return day_file_path + INDEX_SUFFIX
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    while position < len(text) and text[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+def _object_spans(text: str, position: int, depth: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Parcourt l'objet JSON commençant à position, retourne ({clé: [début, fin] ou sous-index}, fin)
+    Les valeurs sont décodées pour trouver leur fin, sauf les objets de premier niveau (courses),
+    parcourus récursivement pour indexer leurs sous-objets (les autres valeurs de premier niveau sont ignorées)
+    """
+    spans: Dict[str, Any] = {}
+    position = _skip_whitespace(text, position + 1)
+    if text[position] == "}":
+        return spans, position + 1
+    while True:
+        key, position = _decoder.raw_decode(text, position)
+        position = _skip_whitespace(text, position)
+        position = _skip_whitespace(text, position + 1)  # ":"
+        start = position
+        if depth == 0 and text[position] == "{":
+            keys, position = _object_spans(text, position, depth + 1)
+            spans[key] = {"span": [start, position], "keys": keys}
+        else:
+            _, position = _decoder.raw_decode(text, position)
+            if depth > 0:
+                spans[key] = [start, position]
+        position = _skip_whitespace(text, position)
+        if text[position] == "}":
+            return spans, position + 1
+        position = _skip_whitespace(text, position + 1)  # ","
+
+
+def _to_byte_offsets(text: str, races: Dict[str, Any]) -> None:
+    """Convertit en place les positions en caractères en positions en octets (UTF-8)"""
+    if text.isascii():
+        return
+    positions: List[List[int]] = []
+    for race in races.values():
+        positions.append(race["span"])
+        positions.extend(race["keys"].values())
+    points = sorted({p for span in positions for p in span})
+    offsets, previous, byte_offset = {}, 0, 0
+    for point in points:
+        byte_offset += len(text[previous:point].encode("utf-8"))
+        offsets[point] = byte_offset
+        previous = point
+    for span in positions:
+        span[0], span[1] = offsets[span[0]], offsets[span[1]]
+
+
+def build_race_index(day_file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Construit et écrit l'index d'un fichier jour, None si le fichier n'existe pas ou n'est pas un objet
+    Sur une archive en lecture seule, l'index est retourné sans être écrit
+    """
+    try:
+        stat = os.stat(day_file_path)
+        with open(day_file_path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+
+    position = _skip_whitespace(text, 0)
+    if position >= len(text) or text[position] != "{":
+        return None
+    races, _ = _object_spans(text, position, 0)
+    _to_byte_offsets(text, races)
+
+    index = {"version": INDEX_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "races": races}
+    try:
+        write_json_atomic(get_index_path(day_file_path), index)
+    except OSError:
+        pass
+    return index
+
+
+def load_race_index(day_file_path: str) -> Optional[Dict[str, Any]]:
+    """Index à jour du fichier jour, reconstruit si le fichier a changé (mtime ou taille) depuis son écriture"""
+    try:
+        stat = os.stat(day_file_path)
+    except FileNotFoundError:
+        return None
+    try:
+        with open(get_index_path(day_file_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if (index.get("version"), index.get("mtime_ns"), index.get("size")) == (
+            INDEX_VERSION, stat.st_mtime_ns, stat.st_size
+        ):
+            return index
+    except (FileNotFoundError, ValueError):
+        pass
+    return build_race_index(day_file_path)
+
+
+def load_race(day_file_path: str, race_id: str, keys: Optional[Iterable[str]] = None,
+              skip: Iterable[str] = DEFAULT_SKIP) -> Optional[Dict[str, Any]]:
+    """
+    Décode une seule course du fichier jour (segments du journal compris), None si elle n'existe pas
+    keys : sous-objets à lire (tous par défaut), skip : sous-objets ignorés quand keys n'est pas précisé
+    """
+    index = load_race_index(day_file_path)
+    if index is None or race_id not in index["races"]:
+        return None
+
+    spans = index["races"][race_id]["keys"]
+    skip = set(skip)
+    selected = set(keys) if keys is not None else {key for key in spans if key not in skip}
+    race: Dict[str, Any] = {}
+    try:
+        with open(day_file_path, "rb") as f:
+            for key in spans:
+                if key in selected:
+                    start, end = spans[key]
+                    f.seek(start)
+                    race[key] = json.loads(f.read(end - start))
+    except (FileNotFoundError, ValueError):
+        # Fichier remplacé entre la lecture de l'index et celle de la course
+        race = dict(load_day_file(day_file_path).get(race_id) or {})
+        if not race:
+            return None
+        return {key: value for key, value in race.items() if (key in selected if keys is not None else key not in skip)}
+
+    segments = list_segments(day_file_path)
+    if segments:
+        merged = merge_segments({race_id: race}, segments)[race_id]
+        race = {
+            key: value for key, value in merged.items()
+            if (key in selected if keys is not None else key not in skip)
+        }
+    return race
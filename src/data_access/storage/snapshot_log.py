@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.data_access.storage.enjeux_codec import pack_day, unpack_enjeux
+
+# Clés des données de course stockées dans le journal plutôt que dans le fichier jour
+SNAPSHOT_KEYS = ("rapports", "enjeux")
+LOG_SUFFIX = ".log"
+
+
+def get_log_dir(day_file_path: str) -> str:
+    """Répertoire du journal d'un fichier jour (DD_MM_YYYY.json.log)"""
+    return day_file_path + LOG_SUFFIX
+
+
+def list_segments(day_file_path: str) -> List[str]:
+    """Segments du journal, dans l'ordre d'écriture"""
+    log_dir = get_log_dir(day_file_path)
+    if not os.path.isdir(log_dir):
+        return []
+    return sorted(
+        os.path.join(log_dir, f) for f in os.listdir(log_dir)
+        if f.endswith(".json") and not f.startswith(".")
+    )
+
+
+def write_json_atomic(file_path: str, data: Any, indent: Optional[int] = None) -> None:
+    """
+    Écrit un fichier JSON via un fichier temporaire renommé, jamais à moitié écrit
+    Le fichier temporaire est propre au processus et au thread : plusieurs threads peuvent écrire le même fichier
+    """
+    directory, name = os.path.split(file_path)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def append_snapshot(day_file_path: str, snapshot: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """
+    Ajoute un segment au journal du jour
+    snapshot : {race_id: {"rapports": {...}, "enjeux": {...}}}, même structure que le fichier jour
+    """
+    snapshot = {race_id: values for race_id, values in snapshot.items() if any(values.values())}
+    if not snapshot:
+        return None
+
+    log_dir = get_log_dir(day_file_path)
+    os.makedirs(log_dir, exist_ok=True)
+    segment_path = os.path.join(log_dir, f"{time.time_ns():020d}-{os.getpid()}.json")
+    write_json_atomic(segment_path, snapshot)
+    return segment_path
+
+
+def _deep_merge(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def merge_snapshot(data: Dict[str, Any], snapshot: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Fusionne un segment déjà lu dans les données du fichier jour (en place), retourne les courses modifiées"""
+    merged = []
+    for race_id, values in snapshot.items():
+        if race_id in data:
+            # Les segments sont au format du scraper : enjeux déjà compactés remis au même format
+            if "enjeux" in values and data[race_id].get("enjeux"):
+                data[race_id]["enjeux"] = unpack_enjeux(data[race_id]["enjeux"])
+            _deep_merge(data[race_id], values)
+            merged.append(race_id)
+    return merged
+
+
+def merge_segments(data: Dict[str, Any], segments: List[str]) -> Dict[str, Any]:
+    """Fusionne les segments dans les données du fichier jour (modifiées en place)"""
+    for segment_path in segments:
+        with open(segment_path, "r", encoding="utf-8") as f:
+            merge_snapshot(data, json.load(f))
+    return data
+
+
+def day_file_signature(day_file_path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime, taille totale, nombre de segments) du fichier jour et de son journal, None s'il n'existe pas"""
+    try:
+        stat = os.stat(day_file_path)
+    except FileNotFoundError:
+        return None
+
+    mtime, size = stat.st_mtime_ns, stat.st_size
+    segments = list_segments(day_file_path)
+    for segment_path in segments:
+        segment_stat = os.stat(segment_path)
+        mtime = max(mtime, segment_stat.st_mtime_ns)
+        size += segment_stat.st_size
+    return mtime, size, len(segments)
+
+
+def load_day_file(day_file_path: str) -> Dict[str, Any]:
+    """Charge un fichier jour avec les segments de son journal ({} s'il n'existe pas)"""
+    return load_day_file_with_format(day_file_path)[0]
+
+
+def load_day_file_with_format(day_file_path: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Comme load_day_file, avec en plus le format du fichier : True s'il est indenté
+    (écrit par le scraper), False s'il est compact (compact_day avec pack)
+    """
+    try:
+        with open(day_file_path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return {}, False
+    data = json.loads(text)
+    return merge_segments(data, list_segments(day_file_path)), text[1:2] == "\n"
+
+
+def compact_day(day_file_path: str, pack: bool = False) -> int:
+    """
+    Réintègre le journal dans le fichier jour puis supprime les segments fusionnés
+    pack convertit aussi les enjeux au format compact (voir enjeux_codec.py) et écrit le fichier sans indentation
+    À lancer quand le scraper n'écrit pas ce jour. Retourne le nombre de segments fusionnés
+    """
+    segments = list_segments(day_file_path)
+    if not segments and not pack:
+        return 0
+
+    with open(day_file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data = merge_segments(data, segments)
+    if pack and not pack_day(data) and not segments:
+        return 0
+    write_json_atomic(day_file_path, data, indent=None if pack else 2)
+
+    for segment_path in segments:
+        os.remove(segment_path)
+    try:
+        os.rmdir(get_log_dir(day_file_path))
+    except OSError:
+        pass
+    return len(segments)
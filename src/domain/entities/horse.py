@@ -1,9 +1,10 @@
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from src.domain.entities.enums import TypeOeilleres, TypeDeferre
+from src.domain.entities.odds import OddsSeries
 
-@dataclass
+@dataclass(slots=True)
 class HorseFeatures:
     """Caractéristiques d'un cheval pour une course spécifique"""
     musique: str  # Historique récent des performances
@@ -25,12 +26,16 @@ class HorseFeatures:
     gains_place: int
     gains_annee_en_cours: int
     gains_annee_precedente: int
+    nom: Optional[str] = None
+    sexe: Optional[str] = None
+    nom_pere: Optional[str] = None
+    nom_mere: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Horse:
     """Représente un cheval participant à une course"""
-    id: str  # Identifiant unique du cheval
+    id: str  # Identifiant durable du cheval (voir horse_identity.resolve_horse_id)
     numero: int  # Numéro dans la course
     race_id: str  # Référence à la course
     features: HorseFeatures
-    odds: Dict[str, float]  # Cotes à différents moments (timestamp: cote)
\ No newline at end of file
+    odds: Union[Dict[str, float], OddsSeries]  # Cotes à différents moments (timestamp: cote)
\ No newline at end of file
@@ -0,0 +1,203 @@
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Instant(s) en millisecondes, comme les clés des rapports du scraper
+Times = Union[int, Sequence[int], np.ndarray]
+
+# Décalage de l'indice du partant dans les clés triées de OddsPanel (timestamps < 2^42 ms, soit avant 2109)
+_RUNNER_SHIFT = np.int64(1 << 42)
+
+
+def _as_of(timestamps: np.ndarray, values: np.ndarray, times: Times) -> Union[float, np.ndarray]:
+    positions = np.searchsorted(timestamps, times, side="right") - 1
+    result = np.where(positions >= 0, values[np.clip(positions, 0, None)] if len(values) else np.nan, np.nan)
+    return float(result) if result.ndim == 0 else result
+
+
+class OddsSeries(Mapping):
+    """
+    Série temporelle des cotes d'un partant, triée par timestamp (ms)
+
+    Se lit comme le dictionnaire {timestamp str: cote} écrit par le scraper,
+    mais les requêtes (cote à un instant, rééchantillonnage, dérive) se font
+    par recherche dichotomique sur des tableaux int64/float64.
+    """
+
+    __slots__ = ("timestamps", "values")
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+        self.timestamps = timestamps
+        self.values = values
+
+    @classmethod
+    def from_dict(cls, odds: Optional[Mapping]) -> "OddsSeries":
+        """Série depuis le format JSON {timestamp str: cote}"""
+        odds = odds or {}
+        n = len(odds)
+        timestamps = np.fromiter((int(ts) for ts in odds), dtype=np.int64, count=n)
+        values = np.fromiter((np.nan if value is None else float(value) for value in odds.values()),
+                             dtype=np.float64, count=n)
+        return cls(timestamps, values)
+
+    # Lecture comme un dictionnaire
+
+    def __getitem__(self, key: str) -> float:
+        ts = int(key)
+        position = np.searchsorted(self.timestamps, ts)
+        if position < len(self.timestamps) and self.timestamps[position] == ts:
+            return float(self.values[position])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(ts) for ts in self.timestamps.tolist())
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, OddsSeries):
+            return np.array_equal(self.timestamps, other.timestamps) and np.array_equal(self.values, other.values)
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return f"OddsSeries({len(self)} cotes)"
+
+    def to_dict(self) -> dict:
+        return dict(zip((str(ts) for ts in self.timestamps.tolist()), self.values.tolist()))
+
+    # Requêtes
+
+    def as_of(self, times: Times) -> Union[float, np.ndarray]:
+        """Dernière cote connue à chaque instant (NaN avant le premier relevé)"""
+        return _as_of(self.timestamps, self.values, times)
+
+    def resample(self, grid: Times) -> np.ndarray:
+        """Cotes sur une grille d'instants"""
+        return np.atleast_1d(self.as_of(grid))
+
+    def last(self) -> float:
+        return float(self.values[-1]) if len(self.values) else np.nan
+
+    def drift(self, start: int, end: int) -> float:
+        """Log-ratio des cotes entre deux instants (positif si la cote monte)"""
+        return float(np.log(self.as_of(end) / self.as_of(start)))
+
+    def volatility(self) -> float:
+        """Écart-type des log-variations entre relevés successifs (NaN sans variation)"""
+        if len(self.values) < 2:
+            return np.nan
+        return float(np.std(np.diff(np.log(self.values))))
+
+
+class OddsPanel:
+    """
+    Cotes de tous les partants d'une course ou d'une journée, concaténées
+
+    Les séries sont stockées bout à bout (offsets[i]:offsets[i + 1] pour le
+    partant i), ce qui permet les requêtes sur tous les partants à la fois.
+    """
+
+    __slots__ = ("race_ids", "numeros", "heures_depart", "offsets", "timestamps", "values", "_keys")
+
+    def __init__(self, race_ids: Sequence[str], numeros: Sequence[int], offsets: np.ndarray,
+                 timestamps: np.ndarray, values: np.ndarray, heures_depart: Optional[Sequence[int]] = None):
+        """
+        timestamps doit être trié à l'intérieur de chaque partant
+        heures_depart (ms) sert de référence aux grilles relatives (cote à H-5 minutes)
+        """
+        self.race_ids = np.asarray(race_ids, dtype=object)
+        self.numeros = np.asarray(numeros, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.heures_depart = None if heures_depart is None else np.asarray(heures_depart, dtype=np.int64)
+        self._keys: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_series(cls, race_ids: Sequence[str], numeros: Sequence[int], series: List[OddsSeries],
+                    heures_depart: Optional[Sequence[int]] = None) -> "OddsPanel":
+        offsets = np.zeros(len(series) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(s) for s in series])
+        timestamps = np.concatenate([s.timestamps for s in series]) if series else np.empty(0, dtype=np.int64)
+        values = np.concatenate([s.values for s in series]) if series else np.empty(0, dtype=np.float64)
+        return cls(race_ids, numeros, offsets, timestamps, values, heures_depart)
+
+    def __len__(self) -> int:
+        return len(self.numeros)
+
+    def series(self, index: int) -> OddsSeries:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return OddsSeries(self.timestamps[start:end], self.values[start:end])
+
+    def counts(self) -> np.ndarray:
+        """Nombre de relevés par partant"""
+        return np.diff(self.offsets)
+
+    def _runner_of_points(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.counts())
+
+    def _sorted_keys(self) -> np.ndarray:
+        if self._keys is None:
+            self._keys = self._runner_of_points() * _RUNNER_SHIFT + self.timestamps
+        return self._keys
+
+    def _lookup(self, runners: np.ndarray, times: np.ndarray) -> np.ndarray:
+        positions = np.searchsorted(self._sorted_keys(), runners * _RUNNER_SHIFT + times, side="right") - 1
+        valid = positions >= self.offsets[runners]
+        if not len(self.values):
+            return np.full(positions.shape, np.nan)
+        return np.where(valid, self.values[np.clip(positions, 0, None)], np.nan)
+
+    def as_of(self, times: Times) -> np.ndarray:
+        """
+        Dernière cote connue de chaque partant
+        times : un instant commun ou un instant par partant
+        """
+        times = np.broadcast_to(np.asarray(times, dtype=np.int64), (len(self),))
+        return self._lookup(np.arange(len(self), dtype=np.int64), times)
+
+    def resample(self, grid: Times, reference: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Matrice (partants x instants) des cotes sur une grille
+        Avec reference (par exemple heures_depart), la grille est relative : grid=[-600000, -300000, 0]
+        """
+        grid = np.atleast_1d(np.asarray(grid, dtype=np.int64))
+        n = len(self)
+        times = np.broadcast_to(grid, (n, len(grid)))
+        if reference is not None:
+            times = np.asarray(reference, dtype=np.int64)[:, None] + times
+        runners = np.broadcast_to(np.arange(n, dtype=np.int64)[:, None], times.shape)
+        return self._lookup(runners.ravel(), times.ravel()).reshape(n, len(grid))
+
+    def last(self) -> np.ndarray:
+        """Dernière cote relevée de chaque partant (NaN sans relevé)"""
+        counts = self.counts()
+        out = np.full(len(self), np.nan)
+        has_odds = counts > 0
+        out[has_odds] = self.values[self.offsets[1:][has_odds] - 1]
+        return out
+
+    def drift(self, start: Times, end: Times) -> np.ndarray:
+        """Log-ratio des cotes de chaque partant entre deux instants (communs ou par partant)"""
+        return np.log(self.as_of(end) / self.as_of(start))
+
+    def volatility(self) -> np.ndarray:
+        """Écart-type des log-variations entre relevés successifs de chaque partant"""
+        n = len(self)
+        runners = self._runner_of_points()
+        returns = np.diff(np.log(self.values))
+        same_runner = runners[1:] == runners[:-1]
+        returns, who = returns[same_runner], runners[1:][same_runner]
+
+        counts = np.bincount(who, minlength=n).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(who, weights=returns, minlength=n) / counts
+            variance = np.bincount(who, weights=returns * returns, minlength=n) / counts - mean * mean
+        return np.sqrt(np.clip(variance, 0, None))
@@ -0,0 +1,163 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from src.domain.entities.odds import Times
+
+# Numéros de partant codés sur 6 bits par position de la combinaison (numéros 1 à 63, 10 positions au plus)
+NUMBER_BITS = 6
+NUMBER_MASK = (1 << NUMBER_BITS) - 1
+
+
+def encode_combination(numbers: Sequence[int]) -> int:
+    """[3, 7, 12] -> entier, le premier numéro dans les bits de poids faible"""
+    code = 0
+    for position, number in enumerate(numbers):
+        code |= int(number) << (NUMBER_BITS * position)
+    return code
+
+
+def decode_combination(code: int) -> List[int]:
+    numbers = []
+    code = int(code)
+    while code:
+        numbers.append(code & NUMBER_MASK)
+        code >>= NUMBER_BITS
+    return numbers
+
+
+def decode_combinations(codes: np.ndarray, size: int) -> np.ndarray:
+    """Codes -> matrice (combinaisons x size) des numéros"""
+    codes = np.asarray(codes, dtype=np.int64)
+    shifts = np.arange(size, dtype=np.int64) * NUMBER_BITS
+    return (codes[:, None] >> shifts) & NUMBER_MASK
+
+
+class BetPool:
+    """
+    Enjeux d'un type de pari d'une course, relevé par relevé
+
+    codes : combinaisons codées (encode_combination), triées
+    timestamps : instants des relevés (ms), triés
+    amounts : matrice (relevés x combinaisons) du dernier montant connu de chaque
+    combinaison, 0 avant son premier relevé
+    """
+
+    __slots__ = ("codes", "size", "timestamps", "amounts")
+
+    def __init__(self, codes: np.ndarray, timestamps: np.ndarray, amounts: np.ndarray, size: Optional[int] = None):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=np.float64).reshape(len(self.timestamps), len(self.codes))
+        if size is None:
+            size = len(decode_combination(int(self.codes.max()))) if len(self.codes) else 0
+        self.size = size
+
+    @classmethod
+    def from_matrix(cls, codes: Iterable[int], timestamps: Iterable[int],
+                    amounts: Sequence[Sequence[Optional[float]]]) -> "BetPool":
+        """
+        Pool depuis une matrice de montants (None ou NaN : combinaison absente du relevé)
+        Les lignes et colonnes sont triées et les absences comblées par le dernier montant connu
+        """
+        codes = np.fromiter(codes, dtype=np.int64)
+        timestamps = np.fromiter(timestamps, dtype=np.int64)
+        matrix = np.array(amounts, dtype=np.float64).reshape(len(timestamps), len(codes))
+
+        rows, columns = np.argsort(timestamps, kind="stable"), np.argsort(codes, kind="stable")
+        timestamps, codes, matrix = timestamps[rows], codes[columns], matrix[np.ix_(rows, columns)]
+
+        # Report du dernier montant connu vers les relevés suivants
+        missing = np.isnan(matrix)
+        if missing.any():
+            last_seen = np.where(~missing, np.arange(len(timestamps))[:, None], -1)
+            np.maximum.accumulate(last_seen, axis=0, out=last_seen)
+            matrix = np.where(last_seen >= 0, matrix[np.clip(last_seen, 0, None), np.arange(len(codes))], 0.0)
+        return cls(codes, timestamps, matrix)
+
+    @classmethod
+    def from_dict(cls, amounts: Mapping[str, Mapping[str, float]], separator: str = "-") -> "BetPool":
+        """Pool depuis le format du scraper {"1-2-3": {timestamp str: montant}}"""
+        timestamps = sorted({int(ts) for by_time in amounts.values() for ts in by_time})
+        row_of = {ts: row for row, ts in enumerate(timestamps)}
+        matrix = np.full((len(timestamps), len(amounts)), np.nan)
+        codes = []
+        for column, (combination, by_time) in enumerate(amounts.items()):
+            codes.append(encode_combination(map(int, combination.split(separator))))
+            for ts, amount in by_time.items():
+                matrix[row_of[int(ts)], column] = amount
+        return cls.from_matrix(codes, timestamps, matrix)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __repr__(self) -> str:
+        return f"BetPool({len(self)} combinaisons, {len(self.timestamps)} relevés)"
+
+    def combinations(self) -> np.ndarray:
+        """Matrice (combinaisons x taille) des numéros"""
+        return decode_combinations(self.codes, self.size)
+
+    def index_of(self, combination: Union[int, Sequence[int]]) -> int:
+        """Colonne d'une combinaison (code ou numéros), -1 si elle n'a pas été jouée"""
+        code = combination if isinstance(combination, (int, np.integer)) else encode_combination(combination)
+        position = int(np.searchsorted(self.codes, code))
+        return position if position < len(self.codes) and self.codes[position] == code else -1
+
+    # Requêtes
+
+    def _rows(self, times: Times) -> np.ndarray:
+        return np.searchsorted(self.timestamps, times, side="right") - 1
+
+    def as_of(self, times: Times) -> np.ndarray:
+        """Montants de chaque combinaison au dernier relevé avant chaque instant (0 avant le premier)"""
+        rows = np.atleast_1d(self._rows(times))
+        out = np.where((rows >= 0)[:, None], self.amounts[np.clip(rows, 0, None)], 0.0)
+        return out[0] if np.ndim(times) == 0 else out
+
+    def totals(self) -> np.ndarray:
+        """Masse totale de chaque relevé"""
+        return self.amounts.sum(axis=1)
+
+    def shares(self) -> np.ndarray:
+        """Part de chaque combinaison dans la masse, relevé par relevé (NaN pour un relevé vide)"""
+        totals = self.totals()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.amounts / totals[:, None]
+
+    def implied_probabilities(self, times: Optional[Times] = None) -> np.ndarray:
+        """
+        Probabilités implicites du pari mutuel : part des enjeux de chaque combinaison
+        times : instants de lecture (dernier relevé avant chacun), tous les relevés par défaut
+        """
+        if times is None:
+            return self.shares()
+        amounts = np.atleast_2d(self.as_of(times))
+        totals = amounts.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = amounts / totals
+        return shares[0] if np.ndim(times) == 0 else shares
+
+    def probable_payouts(self, takeout: float = 0.0, times: Optional[Times] = None) -> np.ndarray:
+        """Rapports probables pour 1 euro : (1 - prélèvement) / part des enjeux (inf si la combinaison n'est pas jouée)"""
+        with np.errstate(divide="ignore"):
+            return (1.0 - takeout) / self.implied_probabilities(times)
+
+    def runner_shares(self, numbers: Optional[Sequence[int]] = None,
+                      times: Optional[Times] = None) -> Dict[int, np.ndarray]:
+        """
+        Part des enjeux portant sur chaque partant : somme des parts des combinaisons qui le contiennent
+        Relevé par relevé, ou aux instants times (dernier relevé avant chacun)
+        """
+        combinations = self.combinations()
+        shares = np.nan_to_num(np.atleast_2d(self.implied_probabilities(times)))
+        # Appartenance (combinaisons x numéros), la colonne 0 reçoit les positions vides
+        membership = np.zeros((len(self.codes), int(combinations.max(initial=0)) + 1))
+        membership[np.arange(len(self.codes))[:, None], combinations] = 1.0
+        by_number = shares @ membership
+        if numbers is None:
+            numbers = [number for number in range(1, membership.shape[1]) if membership[:, number].any()]
+        return {
+            number: by_number[:, number] if number < by_number.shape[1] else np.zeros(len(by_number))
+            for number in numbers
+        }
@@ -6,7 +6,7 @@ from src.domain.entities.enums import (
     Discipline, Specialite, ConditionSexe, Nature, NebulositeCode
 )
 
-@dataclass
+@dataclass(slots=True)
 class Weather:
     """Représente les conditions météorologiques lors d'une course"""
     date_prevision: datetime
@@ -17,14 +17,14 @@ class Weather:
     force_vent: int = 0
     direction_vent: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Hippodrome:
     """Représente un hippodrome"""
     code: str
     libelle_court: str
     libelle_long: str
 
-@dataclass
+@dataclass(slots=True)
 class Race:
     """Représente une course de chevaux"""
     id: str  # Format "RxCy" (ex: "R1C1")
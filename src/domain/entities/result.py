@@ -4,7 +4,7 @@ from typing import Dict, List, Optional
 
 from src.domain.entities.enums import TypePari
 
-@dataclass
+@dataclass(slots=True)
 class RaceResult:
     """Résultat d'une course"""
     race_id: str
@@ -0,0 +1,22 @@
+from src.models.backtest import BacktestReport, run_backtest, run_backtests, settle
+from src.models.features import runner_features, feature_columns, feature_matrix
+from src.models.dataset import DatasetBuilder, Dataset, feature_version
+from src.models.prediction_service import PredictionService, Predictor, ImpliedOddsModel, load_model, make_server
+
+__all__ = [
+    'BacktestReport',
+    'run_backtest',
+    'run_backtests',
+    'settle',
+    'runner_features',
+    'feature_columns',
+    'feature_matrix',
+    'PredictionService',
+    'Predictor',
+    'ImpliedOddsModel',
+    'load_model',
+    'make_server',
+    'DatasetBuilder',
+    'Dataset',
+    'feature_version'
+]
@@ -0,0 +1,220 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.mappers.batch_mapper import dividends_to_dataframe, load_days, normalize_combinaison
+from src.data_access.mappers.common_mapper import diagnostics, with_diagnostics
+from src.data_access.storage.columnar_store import list_day_files
+from src.models.features import runner_features
+
+# Stratégie : features avant course (une ligne par partant) -> paris
+# Les paris ont les colonnes BET_COLUMNS. La stratégie doit être picklable
+# (fonction de module ou functools.partial) pour le mode multi-processus
+Strategy = Callable[[pd.DataFrame], pd.DataFrame]
+
+BET_COLUMNS = ("date", "race_id", "type_pari", "combinaison", "mise")
+
+# En dessous de ce nombre de fichiers jour, le démarrage des processus coûte plus que le chargement des saisons
+PARALLEL_MIN_FILES = 64
+
+
+def season_files(base_path: str, year: int) -> List[str]:
+    year_dir = os.path.join(base_path, str(year))
+    return [os.path.join(year_dir, file_name) for file_name in list_day_files(year_dir)]
+
+
+def load_season(base_path: str, year: int, musique_stats: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (features, dividendes) des courses terminées d'une saison
+    features : une ligne par partant, connue avant le départ (pas d'arrivée ni de rapports)
+    """
+    days = load_days(season_files(base_path, year))
+    dividends = dividends_to_dataframe(days)
+    features = runner_features(days, musique_stats)
+
+    # Seules les courses avec des rapports définitifs peuvent être réglées
+    settled = dividends[["date", "race_id"]].drop_duplicates()
+    features = features.merge(settled, on=["date", "race_id"], how="inner")
+    return features, dividends
+
+
+def settle(bets: pd.DataFrame, dividends: pd.DataFrame) -> pd.DataFrame:
+    """
+    Règle les paris : gain = mise x dividende de la combinaison, 0 si elle n'est pas payée
+    Les non-partants ne sont pas remboursés (le fichier jour ne les distingue pas)
+    """
+    return _settle(bets[list(BET_COLUMNS)], dividends)
+
+
+def _settle(bets: pd.DataFrame, dividends: pd.DataFrame) -> pd.DataFrame:
+    """settle en gardant les colonnes supplémentaires des paris"""
+    bets = bets.loc[bets["mise"] > 0].copy()
+    if len(bets):
+        # Normalisation par valeur distincte plutôt que par pari
+        pairs = bets[["type_pari", "combinaison"]].drop_duplicates()
+        pairs["combinaison_normalisee"] = [
+            normalize_combinaison(type_pari, combinaison)
+            for type_pari, combinaison in zip(pairs["type_pari"], pairs["combinaison"])
+        ]
+        bets = bets.merge(pairs, on=["type_pari", "combinaison"], how="left")
+    else:
+        bets["combinaison_normalisee"] = pd.Series(dtype=object)
+
+    settled = bets.merge(
+        dividends.rename(columns={"combinaison": "combinaison_normalisee"}),
+        on=["date", "race_id", "type_pari", "combinaison_normalisee"], how="left",
+    ).drop(columns="combinaison_normalisee")
+    settled["dividende"] = settled["dividende"].fillna(0.0)
+    settled["gain"] = settled["mise"] * settled["dividende"]
+    settled["profit"] = settled["gain"] - settled["mise"]
+    return settled
+
+
+def _run_season(strategies: Dict[Hashable, Strategy], base_path: str, musique_stats: bool,
+                year: int) -> Dict[Hashable, pd.DataFrame]:
+    """
+    Charge une saison une seule fois et règle les paris de toutes les stratégies en un seul passage
+    (une jointure avec les dividendes pour l'ensemble des paris plutôt qu'une par stratégie)
+    """
+    features, dividends = load_season(base_path, year, musique_stats)
+    heures = features[["date", "race_id", "heure_depart"]].drop_duplicates(["date", "race_id"])
+    names = list(strategies)
+    bets = pd.concat([
+        strategy(features)[list(BET_COLUMNS)].assign(strategie=i) for i, strategy in enumerate(strategies.values())
+    ], ignore_index=True) if names else pd.DataFrame(columns=[*BET_COLUMNS, "strategie"])
+    settled = _settle(bets, dividends).merge(heures, on=["date", "race_id"], how="left")
+    settled.insert(0, "saison", year)
+
+    strategie = settled.pop("strategie").to_numpy(dtype=np.int64)
+    groups = pd.Series(strategie).groupby(strategie).indices
+    empty = np.array([], dtype=np.int64)
+    return {
+        name: settled.iloc[groups.get(i, empty)].reset_index(drop=True)
+        for i, name in enumerate(names)
+    }
+
+
+@dataclass(slots=True)
+class BacktestReport:
+    """Résultat d'une stratégie sur une ou plusieurs saisons"""
+    bets: pd.DataFrame  # Paris réglés, dans l'ordre des départs
+    nombre_paris: int
+    nombre_courses: int
+    mise_totale: float
+    gain_total: float
+    profit: float
+    roi: float  # Profit / mise totale
+    hit_rate: float  # Part des paris gagnants
+    max_drawdown: float  # Plus forte baisse du profit cumulé depuis un sommet, en euros
+
+    @classmethod
+    def from_bets(cls, bets: pd.DataFrame) -> "BacktestReport":
+        bets = bets.sort_values(["heure_depart", "race_id"], kind="stable").reset_index(drop=True)
+        mise, gain = float(bets["mise"].sum()), float(bets["gain"].sum())
+
+        # Profit cumulé course par course, en partant de 0
+        per_race = bets.groupby(["heure_depart", "race_id"], sort=False)["profit"].sum().to_numpy()
+        cumulative = np.concatenate(([0.0], np.cumsum(per_race)))
+        drawdown = float(np.max(np.maximum.accumulate(cumulative) - cumulative))
+
+        return cls(
+            bets=bets,
+            nombre_paris=len(bets),
+            nombre_courses=len(per_race),
+            mise_totale=mise,
+            gain_total=gain,
+            profit=gain - mise,
+            roi=(gain - mise) / mise if mise else np.nan,
+            hit_rate=float((bets["gain"] > 0).mean()) if len(bets) else np.nan,
+            max_drawdown=drawdown,
+        )
+
+    def breakdown(self, by: str = "type_pari") -> pd.DataFrame:
+        """Mise, gain, ROI et hit rate par type de pari, saison, ..."""
+        grouped = self.bets.groupby(by, observed=True)
+        summary = grouped.agg(
+            nombre_paris=("mise", "size"),
+            mise_totale=("mise", "sum"),
+            gain_total=("gain", "sum"),
+            hit_rate=("gain", lambda gains: float((gains > 0).mean())),
+        )
+        summary["profit"] = summary["gain_total"] - summary["mise_totale"]
+        summary["roi"] = summary["profit"] / summary["mise_totale"]
+        return summary
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "nombre_paris": self.nombre_paris,
+            "nombre_courses": self.nombre_courses,
+            "mise_totale": self.mise_totale,
+            "gain_total": self.gain_total,
+            "profit": self.profit,
+            "roi": self.roi,
+            "hit_rate": self.hit_rate,
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+def run_backtests(strategies: Dict[Hashable, Strategy], years: Iterable[int], base_path: str = "data/raw",
+                  max_workers: Optional[int] = None, musique_stats: bool = True,
+                  parallel_min_files: int = PARALLEL_MIN_FILES) -> Dict[Hashable, BacktestReport]:
+    """
+    Backtest de plusieurs stratégies, une saison par processus
+    Séquentiel dans le processus courant si max_workers vaut 1, avec un seul processeur ou une seule saison,
+    ou pour moins de parallel_min_files fichiers jour
+    Chaque saison n'est chargée qu'une fois pour toutes les stratégies
+    musique_stats=False évite le décodage des musiques si aucune stratégie ne s'en sert
+    """
+    years = list(years)
+    workers = min(max_workers or os.cpu_count() or 1, len(years))
+    if workers <= 1 or sum(len(season_files(base_path, year)) for year in years) < parallel_min_files:
+        seasons = [_run_season(strategies, base_path, musique_stats, year) for year in years]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            seasons = []
+            for season, counts in executor.map(
+                partial(with_diagnostics, _run_season, strategies, base_path, musique_stats), years
+            ):
+                seasons.append(season)
+                diagnostics.merge(counts)
+
+    empty = pd.DataFrame(columns=["saison", *BET_COLUMNS, "dividende", "gain", "profit", "heure_depart"])
+    return {
+        name: BacktestReport.from_bets(
+            pd.concat([season[name] for season in seasons], ignore_index=True) if seasons else empty
+        )
+        for name in strategies
+    }
+
+
+def run_backtest(strategy: Strategy, years: Iterable[int], base_path: str = "data/raw",
+                 max_workers: Optional[int] = None, musique_stats: bool = True,
+                 parallel_min_files: int = PARALLEL_MIN_FILES) -> BacktestReport:
+    """Backtest d'une stratégie sur des saisons"""
+    return run_backtests({0: strategy}, years, base_path, max_workers, musique_stats, parallel_min_files)[0]
+
+
+# Stratégies de référence
+
+def favorite_simple_gagnant(features: pd.DataFrame, mise: float = 1.0,
+                            cote_max: Optional[float] = None) -> pd.DataFrame:
+    """
+    Mise sur le favori (plus petite dernière cote) de chaque course en simple gagnant
+    cote_max écarte les courses dont le favori est coté au-delà
+    """
+    favorites = features[["date", "race_id", "numero", "derniere_cote"]].dropna(subset=["derniere_cote"])
+    favorites = favorites.loc[favorites.groupby(["date", "race_id"])["derniere_cote"].idxmin()]
+    if cote_max is not None:
+        favorites = favorites[favorites["derniere_cote"] <= cote_max]
+    return pd.DataFrame({
+        "date": favorites["date"].to_numpy(),
+        "race_id": favorites["race_id"].to_numpy(),
+        "type_pari": "E_SIMPLE_GAGNANT",
+        "combinaison": favorites["numero"].astype(str).to_numpy(),
+        "mise": mise,
+    })
@@ -0,0 +1,297 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.data_access.mappers import batch_mapper, common_mapper, horse_identity, musique_parser
+from src.data_access.mappers.batch_mapper import load_days, results_to_dataframe
+from src.data_access.mappers.common_mapper import diagnostics, with_diagnostics
+from src.data_access.storage import snapshot_log
+from src.data_access.storage.columnar_store import list_day_files, parse_day_file_name
+from src.data_access.storage.snapshot_log import day_file_signature, list_segments, write_json_atomic
+from src.domain.entities import enums
+from src.models import features
+from src.models.features import FEATURE_VERSION, feature_columns, feature_matrix, runner_features
+
+MANIFEST_NAME = "manifest.json"
+
+# Modules dont le code définit les features et les labels : les modifier reconstruit tous les shards
+FEATURE_MODULES: Tuple[ModuleType, ...] = (
+    features, batch_mapper, common_mapper, horse_identity, musique_parser, snapshot_log, enums
+)
+
+
+def feature_version(musique_stats: bool = True) -> str:
+    """Empreinte de la définition des features : FEATURE_VERSION, code des modules qui les calculent et options"""
+    digest = hashlib.sha256(f"{FEATURE_VERSION}:{musique_stats}".encode("utf-8"))
+    for module in FEATURE_MODULES:
+        with open(module.__file__, "rb") as f:
+            digest.update(module.__name__.encode("utf-8"))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def source_hash(day_file_path: str) -> str:
+    """Empreinte du contenu d'un fichier jour et des segments de son journal"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(day_file_path, "rb") as f:
+        digest.update(f.read())
+    for segment_path in list_segments(day_file_path):
+        digest.update(os.path.basename(segment_path).encode("utf-8"))
+        with open(segment_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _shard_name(file_name: str, key: str) -> str:
+    """DD_MM_YYYY.<clé>.npz : un shard par contenu source et version des features"""
+    return f"{file_name[:-len('.json')]}.{key[:16]}.npz"
+
+
+def _build_shard(day_file_path: str, shard_path: str, musique_stats: bool) -> int:
+    """
+    Écrit le shard d'un jour (worker d'un processus), retourne le nombre de partants
+    Seules les courses terminées y figurent : features avant course, position et victoire de chaque partant
+    """
+    days = load_days([day_file_path])
+    frame = runner_features(days, musique_stats)
+    results = results_to_dataframe(days)[["race_id", "numero", "position"]]
+    frame = frame.merge(
+        results.drop_duplicates(["race_id", "numero"]), on=["race_id", "numero"], how="left"
+    )
+    frame = frame[frame["race_id"].isin(set(results["race_id"]))]
+    position = frame.pop("position").fillna(0).to_numpy(dtype=np.int16)
+
+    columns = feature_columns(frame)
+    tmp_path = shard_path + f".{os.getpid()}.tmp.npz"
+    np.savez(
+        tmp_path,
+        X=feature_matrix(frame, columns).astype(np.float32),
+        columns=np.array(columns, dtype=str),
+        position=position,
+        gagnant=(position == 1).astype(np.int8),
+        date=frame["date"].to_numpy(dtype="datetime64[D]"),
+        race_id=frame["race_id"].to_numpy(dtype=str),
+        numero=frame["numero"].to_numpy(dtype=np.int32),
+        horse_id=frame["horse_id"].fillna("").to_numpy(dtype=str),
+    )
+    os.replace(tmp_path, shard_path)
+    return len(frame)
+
+
+@dataclass
+class Dataset:
+    """Partants des courses terminées : features X (float32) et labels, une ligne par partant"""
+    X: np.ndarray
+    columns: List[str]
+    gagnant: np.ndarray
+    position: np.ndarray  # 0 : non classé
+    date: np.ndarray
+    race_id: np.ndarray
+    numero: np.ndarray
+    horse_id: np.ndarray
+
+
+@dataclass
+class BuildReport:
+    built: int = 0
+    skipped: int = 0
+    removed: int = 0
+    runners: int = 0
+    # Fichier jour (<année>/DD_MM_YYYY.json) -> erreur de construction
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+class DatasetBuilder:
+    """
+    Dataset d'entraînement incrémental : un shard .npz par jour dans output_path/<année>/
+
+    Chaque shard est nommé d'après l'empreinte de son fichier jour (journal compris) et de la version
+    des features (feature_version). Le manifeste garde, par fichier jour, sa signature (mtime, taille,
+    segments) et son empreinte : un jour dont la signature n'a pas bougé n'est pas relu, un jour
+    modifié n'est reconstruit que si son contenu a changé. Un changement du code des features
+    change la version et reconstruit tout. Les shards sont construits en parallèle, un jour par tâche.
+    """
+
+    def __init__(self, base_path: str = "data/raw", output_path: str = "data/datasets/runners",
+                 musique_stats: bool = True, max_workers: Optional[int] = None):
+        """max_workers : processus de construction (1 : dans le processus courant)"""
+        self.base_path = base_path
+        self.output_path = output_path
+        self.musique_stats = musique_stats
+        self.max_workers = max_workers
+        self.version = feature_version(musique_stats)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.output_path, MANIFEST_NAME)
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Entrées du manifeste (vide s'il n'existe pas ou a été écrit par une autre version des features)"""
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if manifest.get("version") != self.version:
+            return {}
+        return manifest["days"]
+
+    def available_years(self) -> List[int]:
+        if not os.path.isdir(self.base_path):
+            return []
+        return sorted(
+            int(item) for item in os.listdir(self.base_path)
+            if item.isdigit() and os.path.isdir(os.path.join(self.base_path, item))
+        )
+
+    def _remove_shard(self, entry: Dict[str, Any]) -> None:
+        try:
+            os.remove(os.path.join(self.output_path, entry["shard"]))
+        except FileNotFoundError:
+            pass
+
+    def build(self, years: Optional[Iterable[int]] = None) -> BuildReport:
+        """Construit les shards manquants ou périmés des années (toutes par défaut)"""
+        years = list(years) if years is not None else self.available_years()
+        previous = self._read_manifest()
+        if not previous and os.path.exists(self._manifest_path()):
+            # Nouvelle version des features : les anciens shards ne servent plus
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                stale = json.load(f).get("days", {})
+            for entry in stale.values():
+                self._remove_shard(entry)
+
+        report = BuildReport()
+        entries = {
+            relpath: entry for relpath, entry in previous.items()
+            if int(relpath.split("/")[0]) not in years
+        }
+        # relpath -> (fichier jour, entrée du manifeste)
+        to_build: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for year in years:
+            year_dir = os.path.join(self.base_path, str(year))
+            os.makedirs(os.path.join(self.output_path, str(year)), exist_ok=True)
+            for file_name in list_day_files(year_dir):
+                relpath = f"{year}/{file_name}"
+                day_file_path = os.path.join(year_dir, file_name)
+                signature = list(day_file_signature(day_file_path))
+                entry = previous.get(relpath)
+                shard_exists = entry is not None and os.path.exists(os.path.join(self.output_path, entry["shard"]))
+                if shard_exists and entry["signature"] == signature:
+                    entries[relpath] = entry
+                    report.skipped += 1
+                    continue
+
+                content_hash = source_hash(day_file_path)
+                if shard_exists and entry["source_hash"] == content_hash:
+                    # Fichier touché (compaction du journal...) sans changement de contenu
+                    entries[relpath] = dict(entry, signature=signature)
+                    report.skipped += 1
+                    continue
+
+                key = hashlib.sha256(f"{content_hash}:{self.version}".encode("utf-8")).hexdigest()
+                new_entry = {
+                    "signature": signature,
+                    "source_hash": content_hash,
+                    "shard": f"{year}/{_shard_name(file_name, key)}",
+                }
+                to_build[relpath] = (day_file_path, new_entry)
+
+        removed = [entry for relpath, entry in previous.items() if relpath not in entries and relpath not in to_build]
+        for entry in removed:
+            self._remove_shard(entry)
+        report.removed = len(removed)
+
+        jobs = {
+            relpath: (day_file_path, os.path.join(self.output_path, entry["shard"]), self.musique_stats)
+            for relpath, (day_file_path, entry) in to_build.items()
+        }
+        # Une erreur sur un jour (fichier corrompu...) n'empêche pas d'enregistrer les autres
+        outcomes: Dict[str, Any] = {}
+        if self.max_workers == 1 or len(jobs) <= 1:
+            for relpath, job in jobs.items():
+                try:
+                    outcomes[relpath] = _build_shard(*job)
+                except Exception as e:
+                    outcomes[relpath] = e
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    relpath: executor.submit(with_diagnostics, _build_shard, *job) for relpath, job in jobs.items()
+                }
+                for relpath, future in futures.items():
+                    try:
+                        outcomes[relpath], counts = future.result()
+                    except Exception as e:
+                        outcomes[relpath] = e
+                    else:
+                        diagnostics.merge(counts)
+
+        for relpath, (_, entry) in to_build.items():
+            old = previous.get(relpath)
+            outcome = outcomes[relpath]
+            if isinstance(outcome, Exception):
+                # Jour absent du manifeste : retenté au prochain build, son ancien shard est périmé
+                report.failed[relpath] = f"{type(outcome).__name__}: {outcome}"
+                if old is not None:
+                    self._remove_shard(old)
+                continue
+            if old is not None and old["shard"] != entry["shard"]:
+                self._remove_shard(old)
+            entries[relpath] = entry
+            report.built += 1
+            report.runners += outcome
+
+        os.makedirs(self.output_path, exist_ok=True)
+        write_json_atomic(self._manifest_path(), {"version": self.version, "days": dict(sorted(entries.items()))})
+        return report
+
+    def shard_paths(self, years: Optional[Iterable[int]] = None) -> List[str]:
+        """Shards des années demandées (toutes par défaut) d'après le dernier build, par date"""
+        years = set(years) if years is not None else None
+        dated = [
+            (parse_day_file_name(os.path.basename(relpath)), os.path.join(self.output_path, entry["shard"]))
+            for relpath, entry in self._read_manifest().items()
+            if years is None or int(relpath.split("/")[0]) in years
+        ]
+        return [path for _, path in sorted(dated)]
+
+    def load(self, years: Optional[Iterable[int]] = None) -> Dataset:
+        """
+        Concatène les shards des années demandées
+        Les colonnes sont alignées par nom : une feature absente d'un jour y vaut NaN
+        """
+        shards = []
+        for path in self.shard_paths(years):
+            with np.load(path) as shard:
+                shards.append({name: shard[name] for name in shard.files})
+
+        columns: List[str] = []
+        for shard in shards:
+            columns.extend(column for column in shard["columns"].tolist() if column not in columns)
+
+        blocks = []
+        for shard in shards:
+            block = np.full((len(shard["X"]), len(columns)), np.nan, dtype=np.float32)
+            positions = [columns.index(column) for column in shard["columns"].tolist()]
+            block[:, positions] = shard["X"]
+            blocks.append(block)
+
+        def concat(name: str, dtype: Any) -> np.ndarray:
+            return np.concatenate([shard[name] for shard in shards]) if shards else np.array([], dtype=dtype)
+
+        return Dataset(
+            X=np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32),
+            columns=columns,
+            gagnant=concat("gagnant", np.int8),
+            position=concat("position", np.int16),
+            date=concat("date", "datetime64[D]"),
+            race_id=concat("race_id", str),
+            numero=concat("numero", np.int32),
+            horse_id=concat("horse_id", str),
+        )
@@ -0,0 +1,55 @@
+from typing import Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.mappers.batch_mapper import DayData, races_to_dataframe, runners_to_dataframe
+
+# Colonnes de course ajoutées aux features des partants
+RACE_FEATURES = (
+    "heure_depart", "distance", "discipline", "specialite", "nombre_participants",
+    "hippodrome_code", "montant_prix",
+)
+
+# Identifiants des lignes, jamais utilisés comme features du modèle
+KEY_COLUMNS = ("date", "race_id", "numero", "horse_id")
+
+# À incrémenter quand les features changent sans que le code qui les calcule change (données de référence...)
+# Le code lui-même est suivi par src/models/dataset.py
+FEATURE_VERSION = 1
+
+
+def runner_features(days: Iterable[DayData], musique_stats: bool = True,
+                    odds_lead_time: float = 0.0) -> pd.DataFrame:
+    """
+    Features avant course, une ligne par partant : colonnes du partant et de sa course
+    Rien de l'arrivée ni des rapports définitifs, cotes relevées au plus tard odds_lead_time secondes avant le départ
+    """
+    days = list(days)
+    races = races_to_dataframe(days)[["date", "race_id", *RACE_FEATURES]]
+    runners = runners_to_dataframe(days, musique_stats, odds_lead_time)
+    return runners.merge(races, on=["date", "race_id"], how="left")
+
+
+def feature_columns(features: pd.DataFrame) -> List[str]:
+    """Colonnes utilisables par un modèle : numériques, booléennes ou catégorielles, hors identifiants"""
+    return [
+        column for column, dtype in features.dtypes.items()
+        if column not in KEY_COLUMNS and (
+            isinstance(dtype, pd.CategoricalDtype)
+            or pd.api.types.is_bool_dtype(dtype)
+            or (pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_datetime64_any_dtype(dtype))
+        )
+    ]
+
+
+def feature_matrix(features: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Matrice float64 des colonnes, catégories remplacées par leurs codes (-1 pour une valeur absente)"""
+    matrix = np.empty((len(features), len(columns)), dtype=np.float64)
+    for i, column in enumerate(columns):
+        values = features[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            matrix[:, i] = values.cat.codes.to_numpy()
+        else:
+            matrix[:, i] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return matrix
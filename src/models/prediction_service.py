@@ -0,0 +1,315 @@
+import os
+import json
+import pickle
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import RLock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.storage.snapshot_log import list_segments, merge_snapshot
+from src.models.features import feature_columns, feature_matrix, runner_features
+
+# Délai minimal entre deux vérifications du fichier jour (secondes)
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+
+class ImpliedOddsModel:
+    """Modèle de référence sans entraînement : probabilité proportionnelle à l'inverse de la dernière cote"""
+
+    classes_ = np.array([0, 1])
+    feature_names_in_ = np.array(["derniere_cote"])
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        odds = np.asarray(X, dtype=np.float64)[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse = np.where(odds > 0, 1.0 / odds, 0.0)
+        inverse = np.nan_to_num(inverse)
+        return np.column_stack([1.0 - inverse, inverse])
+
+
+def load_model(uri: str) -> Any:
+    """
+    Modèle depuis un fichier pickle (.pkl, .pickle), joblib (.joblib) ou une URI MLflow
+    (runs:/<run_id>/model, models:/<nom>/<version> ou répertoire d'un modèle MLflow)
+    """
+    if uri.endswith((".pkl", ".pickle")):
+        with open(uri, "rb") as f:
+            return pickle.load(f)
+    if uri.endswith(".joblib"):
+        import joblib
+        return joblib.load(uri)
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(uri)
+
+
+class Predictor:
+    """
+    Probabilités de victoire des partants d'une course à partir d'un modèle scikit-learn (predict_proba)
+    Les colonnes sont celles vues par le modèle à l'entraînement (feature_names_in_) si elles sont connues
+    """
+
+    def __init__(self, model: Any, columns: Optional[Sequence[str]] = None, normalize: bool = True):
+        """normalize ramène la somme des probabilités d'une course à 1"""
+        self.model = model
+        names = getattr(model, "feature_names_in_", None)
+        self.columns = list(columns) if columns is not None else (list(names) if names is not None else None)
+        self.with_names = names is not None
+        classes = list(getattr(model, "classes_", []))
+        self.positive = classes.index(1) if 1 in classes else -1
+        self.normalize = normalize
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        columns = self.columns or feature_columns(features)
+        X: Any = feature_matrix(features, columns)
+        if self.with_names:
+            X = pd.DataFrame(X, columns=columns)
+        probabilities = np.asarray(self.model.predict_proba(X), dtype=np.float64)[:, self.positive]
+        total = probabilities.sum()
+        if self.normalize and total > 0:
+            probabilities = probabilities / total
+        return probabilities
+
+
+class RaceDayState:
+    """
+    Courses et partants d'un jour gardés en mémoire, features calculées une fois par course
+
+    Les segments du journal de cotes ajoutés depuis la dernière vérification sont fusionnés seuls,
+    et seules les courses qu'ils modifient voient leurs features recalculées. Une réécriture du
+    fichier jour (mtime ou taille) le recharge entièrement.
+    """
+
+    def __init__(self, file_path: str, race_date: date, musique_stats: bool = True,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.file_path = file_path
+        self.race_date = race_date
+        self.date_str = race_date.strftime("%d_%m_%Y")
+        self.musique_stats = musique_stats
+        self.refresh_interval = refresh_interval
+        self.data: Dict[str, Any] = {}
+        self.generation = 0  # rechargements complets
+        self.full_loads = 0
+        self.merged_segments = 0
+        self._file_key: Optional[Tuple[int, int]] = None
+        self._segments: set = set()
+        self._race_versions: Dict[str, int] = {}
+        self._features: Dict[str, pd.DataFrame] = {}
+        self._checked_at = float("-inf")
+        self._lock = RLock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Prend en compte les modifications du fichier jour et de son journal, True si quelque chose a changé"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.refresh_interval:
+                return False
+            self._checked_at = now
+
+            try:
+                stat = os.stat(self.file_path)
+            except FileNotFoundError:
+                if self._file_key is None:
+                    return False
+                self._reset({}, None, [])
+                return True
+
+            file_key = (stat.st_mtime_ns, stat.st_size)
+            segments = list_segments(self.file_path)
+            if file_key != self._file_key:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._reset(data, file_key, [])
+                self._merge(segments)
+                self.full_loads += 1
+                return True
+
+            new_segments = [segment for segment in segments if segment not in self._segments]
+            self._merge(new_segments)
+            return bool(new_segments)
+
+    def _reset(self, data: Dict[str, Any], file_key: Optional[Tuple[int, int]], segments: List[str]) -> None:
+        self.data = data
+        self._file_key = file_key
+        self._segments = set(segments)
+        self._race_versions = {}
+        self._features = {}
+        self.generation += 1
+
+    def _merge(self, segments: List[str]) -> None:
+        for segment_path in segments:
+            try:
+                with open(segment_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except FileNotFoundError:
+                # Segment réintégré par une compaction entre-temps, le fichier jour sera rechargé
+                continue
+            for race_id in merge_snapshot(self.data, snapshot):
+                self._race_versions[race_id] = self._race_versions.get(race_id, 0) + 1
+                self._features.pop(race_id, None)
+            self._segments.add(segment_path)
+            self.merged_segments += 1
+
+    def race_ids(self) -> List[str]:
+        with self._lock:
+            return list(self.data)
+
+    def race_version(self, race_id: str) -> Tuple[int, int]:
+        """Version des données d'une course : change à chaque rechargement ou segment qui la modifie"""
+        with self._lock:
+            return self.generation, self._race_versions.get(race_id, 0)
+
+    def race_features(self, race_id: str) -> pd.DataFrame:
+        """Features des partants de la course (KeyError si elle n'est pas au programme du jour)"""
+        with self._lock:
+            features = self._features.get(race_id)
+            if features is None:
+                race = self.data[race_id]
+                features = runner_features([(self.date_str, {race_id: race})], self.musique_stats)
+                self._features[race_id] = features
+            return features
+
+
+class PredictionService:
+    """
+    Prédictions des courses du jour : état du jour et modèle chargés une fois, prédictions gardées
+    en cache tant que les données de la course ne changent pas
+    """
+
+    def __init__(self, predictor: Predictor, base_path: str = "data/raw", race_date: Optional[date] = None,
+                 musique_stats: bool = True, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """race_date : jour servi, aujourd'hui par défaut (avec changement de jour à minuit)"""
+        self.predictor = predictor
+        self.base_path = base_path
+        self.race_date = race_date
+        self.musique_stats = musique_stats
+        self.refresh_interval = refresh_interval
+        self._state: Optional[RaceDayState] = None
+        # (jour, race_id) -> (version des données, prédiction, prédiction encodée en JSON)
+        self._predictions: Dict[Tuple[date, str], Tuple[Tuple[int, int], Dict[str, Any], bytes]] = {}
+        self._lock = RLock()
+
+    def _get_file_path(self, race_date: date) -> str:
+        return os.path.join(self.base_path, str(race_date.year), f"{race_date.strftime('%d_%m_%Y')}.json")
+
+    def state(self) -> RaceDayState:
+        """État du jour servi, à jour du fichier jour"""
+        race_date = self.race_date or date.today()
+        with self._lock:
+            if self._state is None or self._state.race_date != race_date:
+                self._state = RaceDayState(
+                    self._get_file_path(race_date), race_date, self.musique_stats, self.refresh_interval
+                )
+                self._predictions = {}
+            state = self._state
+        state.refresh()
+        return state
+
+    def preload(self) -> int:
+        """Charge le jour et calcule les prédictions de toutes ses courses, retourne le nombre de courses"""
+        race_ids = self.state().race_ids()
+        for race_id in race_ids:
+            self.predict(race_id)
+        return len(race_ids)
+
+    def predict(self, race_id: str) -> Dict[str, Any]:
+        """Probabilités par partant de la course RxCy du jour (KeyError si elle n'existe pas)"""
+        return self._cached_prediction(race_id)[1]
+
+    def predict_json(self, race_id: str) -> bytes:
+        """Prédiction déjà encodée en JSON, pour le serveur HTTP"""
+        return self._cached_prediction(race_id)[2]
+
+    def _cached_prediction(self, race_id: str) -> Tuple[Tuple[int, int], Dict[str, Any], bytes]:
+        state = self.state()
+        key = (state.race_date, race_id)
+        version = state.race_version(race_id)
+        with self._lock:
+            cached = self._predictions.get(key)
+        if cached is not None and cached[0] == version:
+            return cached
+
+        features = state.race_features(race_id)
+        probabilities = self.predictor.predict(features)
+        odds = features["derniere_cote"].to_numpy()
+        prediction = {
+            "date": state.race_date.isoformat(),
+            "race_id": race_id,
+            "partants": [
+                {
+                    "numero": int(numero),
+                    "probabilite": float(probability),
+                    "cote": None if np.isnan(cote) else float(cote),
+                }
+                for numero, probability, cote in zip(features["numero"].to_numpy(), probabilities, odds)
+            ],
+        }
+        cached = (version, prediction, json.dumps(prediction).encode("utf-8"))
+        with self._lock:
+            # Un calcul commencé avant un changement de jour n'est pas gardé pour le nouveau jour
+            if self._state is state:
+                self._predictions[key] = cached
+        return cached
+
+    def health(self) -> Dict[str, Any]:
+        state = self.state()
+        return {
+            "status": "ok",
+            "date": state.race_date.isoformat(),
+            "courses": len(state.race_ids()),
+            "rechargements": state.full_loads,
+            "segments_fusionnes": state.merged_segments,
+        }
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /health, GET /races (courses du jour), GET /races/<RxCy> (probabilités par partant)
+    Connexions persistantes (HTTP/1.1), réponses JSON
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service: PredictionService
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        try:
+            if parts == ["health"]:
+                self._send(200, self.service.health())
+            elif parts == ["races"]:
+                self._send(200, {"courses": self.service.state().race_ids()})
+            elif len(parts) == 2 and parts[0] == "races":
+                self._send(200, self.service.predict_json(parts[1]))
+            else:
+                self._send(404, {"erreur": f"chemin inconnu {self.path}"})
+        except KeyError:
+            self._send(404, {"erreur": f"course inconnue {parts[-1]}"})
+        except Exception as e:
+            self._send(500, {"erreur": str(e)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    # File d'attente des connexions assez longue pour des clients nombreux qui se connectent en même temps
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def make_server(service: PredictionService, host: str = "127.0.0.1", port: int = 8765) -> PredictionServer:
+    """Serveur HTTP multi-thread du service, un thread par connexion (port 0 : port libre choisi par le système)"""
+    handler = type("BoundPredictionRequestHandler", (PredictionRequestHandler,), {"service": service})
+    return PredictionServer((host, port), handler)
@@ -0,0 +1,12 @@
+from src.utils import metrics
+from src.utils.metrics import MetricsSink, NullSink, PrometheusFileSink, JsonLinesSink, MultiSink, Timer
+
+__all__ = [
+    'metrics',
+    'MetricsSink',
+    'NullSink',
+    'PrometheusFileSink',
+    'JsonLinesSink',
+    'MultiSink',
+    'Timer'
+]
@@ -0,0 +1,306 @@
+import os
+import json
+import math
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+
+# Bornes des histogrammes (secondes pour les durées)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Étiquettes d'une mesure, triées : (("endpoint", "participants"), ...)
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(tags: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in tags.items()))
+
+
+class MetricsSink:
+    """
+    Destination des mesures : compteurs, histogrammes et durées (histogrammes en secondes)
+    La classe de base ignore tout, les sous-classes redéfinissent increment et observe
+    """
+
+    enabled = True
+
+    def increment(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        pass
+
+    def observe(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        pass
+
+    def timing(self, name: str, seconds: float, tags: Dict[str, Any]) -> None:
+        self.observe(name, seconds, tags)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class NullSink(MetricsSink):
+    """Sink par défaut : instrumentation désactivée"""
+
+    enabled = False
+
+
+class PrometheusFileSink(MetricsSink):
+    """
+    Agrège les mesures en mémoire et les écrit au format texte Prometheus
+    (à lire par le textfile collector de node_exporter), à chaque flush
+    """
+
+    def __init__(self, path: str, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 metric_buckets: Optional[Dict[str, Sequence[float]]] = None):
+        """metric_buckets : bornes propres à certaines mesures (par nom)"""
+        self.path = path
+        self.buckets = tuple(buckets)
+        self.metric_buckets = {name: tuple(bounds) for name, bounds in (metric_buckets or {}).items()}
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        # nom -> étiquettes -> [compte par borne (+Inf en dernier), somme, compte]
+        self._histograms: Dict[str, Dict[Labels, List[Any]]] = defaultdict(dict)
+        self._lock = Lock()
+
+    def increment(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        labels = _labels(tags)
+        with self._lock:
+            counters = self._counters[name]
+            counters[labels] = counters.get(labels, 0.0) + value
+
+    def observe(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        labels = _labels(tags)
+        bounds = self.metric_buckets.get(name, self.buckets)
+        with self._lock:
+            series = self._histograms[name].get(labels)
+            if series is None:
+                series = self._histograms[name][labels] = [[0] * (len(bounds) + 1), 0.0, 0]
+            series[0][bisect_left(bounds, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        escaped = (
+            (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for key, value in pairs
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def render(self) -> str:
+        """Contenu du fichier, compteurs puis histogrammes, triés par nom"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{self._format_labels(labels)} {value:g}")
+            for name in sorted(self._histograms):
+                bounds = self.metric_buckets.get(name, self.buckets)
+                lines.append(f"# TYPE {name} histogram")
+                for labels, (counts, total, count) in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(bounds + (math.inf,), counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == math.inf else f"{bound:g}"
+                        lines.append(f"{name}_bucket{self._format_labels(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {total:.9g}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Écrit le fichier (remplacement atomique, le collecteur ne lit jamais un fichier partiel)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
+
+
+class JsonLinesSink(MetricsSink):
+    """
+    Une ligne JSON par mesure : {"time", "type", "name", "value", "tags"}
+    Les lignes sont mises en tampon et écrites par paquets de buffer_size ou à chaque flush
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._lock = Lock()
+
+    def _record(self, kind: str, name: str, value: float, tags: Dict[str, Any]) -> None:
+        line = json.dumps({"time": time.time(), "type": kind, "name": name, "value": value, "tags": tags})
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size:
+                self._write()
+
+    def increment(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        self._record("counter", name, value, tags)
+
+    def observe(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        self._record("histogram", name, value, tags)
+
+    def timing(self, name: str, seconds: float, tags: Dict[str, Any]) -> None:
+        self._record("timing", name, seconds, tags)
+
+    def _write(self) -> None:
+        if not self._buffer:
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        self._buffer.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class MultiSink(MetricsSink):
+    """Transmet chaque mesure à plusieurs sinks"""
+
+    def __init__(self, *sinks: MetricsSink):
+        self.sinks = [sink for sink in sinks if sink.enabled]
+        self.enabled = bool(self.sinks)
+
+    def increment(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        for sink in self.sinks:
+            sink.increment(name, value, tags)
+
+    def observe(self, name: str, value: float, tags: Dict[str, Any]) -> None:
+        for sink in self.sinks:
+            sink.observe(name, value, tags)
+
+    def timing(self, name: str, seconds: float, tags: Dict[str, Any]) -> None:
+        for sink in self.sinks:
+            sink.timing(name, seconds, tags)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+class Timer:
+    """Chronomètre (context manager) qui envoie sa durée au sink à la sortie"""
+
+    __slots__ = ("sink", "name", "tags", "start", "seconds")
+
+    def __init__(self, sink: MetricsSink, name: str, tags: Dict[str, Any]):
+        self.sink = sink
+        self.name = name
+        self.tags = tags
+        self.seconds = 0.0
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        self.seconds = time.perf_counter() - self.start
+        self.sink.timing(self.name, self.seconds, self.tags)
+        return False
+
+
+class _NullTimer:
+    """Chronomètre partagé renvoyé quand l'instrumentation est désactivée"""
+
+    __slots__ = ()
+    seconds = 0.0
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+# Sink courant du processus, désactivé par défaut
+_sink: MetricsSink = NullSink()
+_enabled = False
+
+
+def get_sink() -> MetricsSink:
+    return _sink
+
+
+def set_sink(sink: Optional[MetricsSink]) -> MetricsSink:
+    """Remplace le sink du processus (None pour désactiver), retourne le précédent"""
+    global _sink, _enabled
+    previous = _sink
+    _sink = sink if sink is not None else NullSink()
+    _enabled = _sink.enabled
+    return previous
+
+
+def enabled() -> bool:
+    """Vrai si un sink actif est installé, pour éviter de préparer des mesures inutiles"""
+    return _enabled
+
+
+def increment(name: str, value: float = 1.0, **tags: Any) -> None:
+    if _enabled:
+        _sink.increment(name, value, tags)
+
+
+def observe(name: str, value: float, **tags: Any) -> None:
+    if _enabled:
+        _sink.observe(name, value, tags)
+
+
+def timing(name: str, seconds: float, **tags: Any) -> None:
+    if _enabled:
+        _sink.timing(name, seconds, tags)
+
+
+def timer(name: str, **tags: Any):
+    """
+    with timer("nom_seconds", étiquette=valeur): ...
+    Sans sink actif, retourne un chronomètre partagé qui ne mesure rien
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return Timer(_sink, name, tags)
+
+
+def flush() -> None:
+    _sink.flush()
+
+
+def configure(prometheus_path: Optional[str] = None, jsonl_path: Optional[str] = None) -> MetricsSink:
+    """Installe les sinks demandés (Prometheus et/ou JSON lines), aucun si les deux chemins sont absents"""
+    sinks: List[MetricsSink] = []
+    if prometheus_path:
+        sinks.append(PrometheusFileSink(prometheus_path))
+    if jsonl_path:
+        sinks.append(JsonLinesSink(jsonl_path))
+    sink = sinks[0] if len(sinks) == 1 else MultiSink(*sinks) if sinks else NullSink()
+    set_sink(sink)
+    return sink
+
@@ -0,0 +1,25 @@
+import os
+import shutil
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def raw_path() -> str:
+    """Archive minimale : data/raw/2024/02_03_2024.json avec des valeurs null écrites par le scraper"""
+    return os.path.join(FIXTURES, "raw")
+
+
+@pytest.fixture
+def day_file(raw_path: str) -> str:
+    return os.path.join(raw_path, "2024", "02_03_2024.json")
+
+
+@pytest.fixture
+def raw_copy(raw_path: str, tmp_path) -> str:
+    """Copie de l'archive minimale, pour les tests qui écrivent (index, catalogue...) à côté des fichiers jour"""
+    path = str(tmp_path / "raw")
+    shutil.copytree(raw_path, path)
+    return path
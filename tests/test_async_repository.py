@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from datetime import date
+
+from src.data_access.repositories import async_repository
+from src.data_access.repositories.async_repository import AsyncRaceRepository, AsyncResultRepository
+from src.data_access.repositories.race_repository import RaceRepository
+from src.data_access.repositories.result_repository import ResultRepository
+from src.data_access.storage import day_file_cache
+from src.data_access.storage.day_file_cache import DayFileCache
+
+RACE_DATE = date(2024, 3, 2)
+
+
+def _counting(monkeypatch, module, name):
+    calls = []
+    function = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.01)  # Laisse aux appels simultanés le temps de se regrouper
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, wrapper)
+    return calls
+
+
+def test_single_race_reads_coalesced_per_file(raw_copy, monkeypatch):
+    builds = _counting(monkeypatch, async_repository, "load_race_index")
+
+    async def main():
+        async with AsyncRaceRepository(RaceRepository(raw_copy, cache=DayFileCache()), max_workers=8) as races:
+            return await asyncio.gather(*(
+                races.get_race_by_id(race_id, RACE_DATE) for race_id in ["R1C1", "R1C2"] * 8
+            ))
+
+    results = asyncio.run(main())
+    assert [race.id for race in results] == ["R1C1", "R1C2"] * 8
+    assert len(builds) == 1
+
+
+def test_day_loaded_once_above_cache_budget(raw_copy, monkeypatch):
+    loads = _counting(monkeypatch, day_file_cache, "load_day_file_with_format")
+
+    async def main():
+        # Fichier plus gros que le budget : jamais en cache, les données chargées sont transmises
+        async with AsyncResultRepository(ResultRepository(raw_copy, cache=DayFileCache(max_bytes=0))) as results:
+            return await asyncio.gather(*(results.get_results_by_date(RACE_DATE) for _ in range(8)))
+
+    days = asyncio.run(main())
+    assert len(loads) == 1
+    assert all(len(day) == 1 for day in days)  # Seule R1C1 est terminée
+
+
+def test_cancelled_call_abandons_pending_work(raw_copy):
+    repository = RaceRepository(raw_copy, cache=DayFileCache())
+    called = []
+    repository.get_all_hippodromes = lambda: called.append(True) or []
+    release = threading.Event()
+
+    async def main():
+        async with AsyncRaceRepository(repository, max_workers=1) as races:
+            busy = asyncio.get_running_loop().run_in_executor(races.executor, release.wait)
+            call = asyncio.ensure_future(races.get_all_hippodromes())
+            await asyncio.sleep(0.05)
+            call.cancel()
+            await asyncio.sleep(0.05)
+            release.set()
+            await busy
+            await asyncio.sleep(0.05)
+            return call.cancelled()
+
+    assert asyncio.run(main())
+    assert called == []
+
+
+def test_executor_limit(raw_copy):
+    repository = RaceRepository(raw_copy, cache=DayFileCache())
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow(code, year):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return [code]
+
+    repository.get_races_by_hippodrome = slow
+
+    async def main():
+        async with AsyncRaceRepository(repository, max_workers=2) as races:
+            return await asyncio.gather(*(races.get_races_by_hippodrome(str(i)) for i in range(10)))
+
+    assert asyncio.run(main()) == [[str(i)] for i in range(10)]
+    assert peak[0] == 2
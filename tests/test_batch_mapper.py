@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.data_access.mappers.batch_mapper import (
+    load_days, races_to_columns, results_to_columns, runners_to_columns
+)
+from src.data_access.mappers.horse_mapper import map_json_to_horses
+
+
+def test_races_with_null_ints(day_file):
+    columns = races_to_columns(load_days([day_file]))
+    assert np.isnan(columns["distance"][0])
+    assert np.isnan(columns["montant_prix"][0])
+    assert np.isnan(columns["meteo_temperature"][0])
+    assert columns["distance"][1] > 0
+
+
+def test_runners_with_null_ints(day_file):
+    days = load_days([day_file])
+    columns = runners_to_columns(days, musique_stats=True)
+    assert len(columns["numero"]) == 8
+    assert np.isnan(columns["age"][0])
+    assert np.isnan(columns["nombre_courses"][0])
+    assert np.isnan(columns["gains_carriere"][1])
+    assert columns["age"][2] > 0
+
+    # Mêmes valeurs que le mapper unitaire, null -> NaN
+    horses = map_json_to_horses("R1C1", days[0][1]["R1C1"])
+    for i, horse in enumerate(horses):
+        expected = np.nan if horse.features.age is None else horse.features.age
+        np.testing.assert_equal(columns["age"][i], expected)
+
+
+def test_null_odds_value(day_file):
+    columns = runners_to_columns(load_days([day_file]))
+    # Dernier relevé null du partant 3 de R1C2
+    assert np.isnan(columns["derniere_cote"][6])
+    assert not np.isnan(columns["derniere_cote"][7])
+
+
+def test_results_skip_unfinished_races(day_file):
+    columns = results_to_columns(load_days([day_file]))
+    assert set(columns["race_id"]) == {"R1C1"}
+
+
+def test_odds_after_start_ignored(day_file):
+    days = load_days([day_file])
+    race = days[0][1]["R1C2"]
+    # Cote relevée une minute après le départ : inconnue avant la course
+    race["rapports"]["4"][str(race["heureDepart"] + 60_000)] = 1.1
+
+    columns = runners_to_columns(days)
+    assert (columns["derniere_cote"][7], columns["nombre_cotes"][7]) == (8.7, 2)
+
+    # Relevés d'au moins 400 secondes avant le départ
+    columns = runners_to_columns(days, odds_lead_time=400)
+    assert (columns["derniere_cote"][7], columns["nombre_cotes"][7]) == (8.4, 1)
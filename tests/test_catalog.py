@@ -0,0 +1,75 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from src.data_access.repositories import HorseRepository, RaceRepository
+from src.data_access.storage.catalog import RaceCatalog
+
+
+@pytest.fixture
+def catalog(raw_path, tmp_path):
+    catalog = RaceCatalog(raw_path, str(tmp_path / "catalog.sqlite"))
+    catalog.refresh()
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def no_filesystem_scan(monkeypatch):
+    """Fait échouer toute lecture de répertoire ou stat de fichier"""
+    def fail(*args, **kwargs):
+        raise AssertionError(f"accès au système de fichiers : {args}")
+
+    for name in ("listdir", "scandir", "stat"):
+        monkeypatch.setattr(os, name, fail)
+
+
+def _horse_id(catalog: RaceCatalog) -> str:
+    (horse_id,) = catalog._connection.execute("SELECT horse_id FROM runners LIMIT 1").fetchone()
+    return horse_id
+
+
+def test_horse_lookup_does_not_scan(catalog, no_filesystem_scan):
+    horse_id = _horse_id(catalog)
+    runs = catalog.find_horse_runs(horse_id)
+    assert len(runs) == 1
+    assert catalog.find_horse_runs(horse_id, before=date(2024, 3, 2)) == []
+
+
+def test_repository_refreshes_once_per_interval(catalog, raw_path, monkeypatch):
+    horse_id = _horse_id(catalog)
+    repository = HorseRepository(raw_path, catalog=catalog)
+    assert len(repository.get_horse_history(horse_id)) == 1
+
+    # Catalogue vérifié par refresh() : la requête suivante ne relit pas l'archive
+    scans = []
+    monkeypatch.setattr(catalog, "refresh", lambda year=None: scans.append(year) or 0)
+    repository.get_horse_history(horse_id)
+    assert scans == []
+
+    catalog.refresh_interval = 0
+    repository.get_horse_history(horse_id)
+    assert scans == [None]
+
+
+def test_races_follow_day_file_order(raw_copy, tmp_path):
+    day_path = os.path.join(raw_copy, "2024", "02_03_2024.json")
+    with open(day_path, encoding="utf-8") as f:
+        data = json.load(f)
+    # Onze courses : en tri texte, R1C10 et R1C11 passeraient avant R1C2
+    race = data["R1C1"]
+    data = {f"R1C{n}": race for n in range(1, 12)}
+    with open(day_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    catalog = RaceCatalog(raw_copy, str(tmp_path / "catalog.sqlite"))
+    catalog.refresh()
+    expected = list(data)
+    assert [race_id for _, race_id in catalog.find_races(hippodrome_code="H31")] == expected
+
+    scanned = RaceRepository(raw_copy).get_races_by_hippodrome("H31")
+    indexed = RaceRepository(raw_copy, catalog=catalog).get_races_by_hippodrome("H31")
+    assert [r.id for r in indexed] == [r.id for r in scanned] == expected
+    catalog.close()
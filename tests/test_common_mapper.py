@@ -0,0 +1,40 @@
+import json
+
+from src.data_access.mappers.common_mapper import diagnostics, enum_lookup, intern_str
+from src.data_access.mappers.horse_mapper import map_json_to_horse
+from src.data_access.mappers.race_mapper import map_json_to_race
+from src.data_access.mappers.result_mapper import map_json_to_result
+from src.data_access.storage.snapshot_log import load_day_file
+from src.domain.entities.enums import Discipline
+
+
+def test_unhashable_enum_values():
+    diagnostics.reset()
+    lookup = enum_lookup(Discipline)
+    assert lookup.parse(["ATTELE"], Discipline.MONTE, "discipline") is Discipline.MONTE
+    assert lookup.parse({"code": "ATTELE"}, None, "discipline") is None
+
+    codes = lookup.encode_column(["ATTELE", ["ATTELE"], None, "INCONNUE"], 0, "discipline")
+    assert codes.tolist() == [lookup.code(Discipline.ATTELE), 0, 0, 0]
+    assert diagnostics.counts()["discipline"] == {"['ATTELE']": 2, "{'code': 'ATTELE'}": 1, "INCONNUE": 1}
+    diagnostics.reset()
+
+
+def test_entities_slotted_with_interned_strings(day_file):
+    data = load_day_file(day_file)
+    # Deux décodages distincts du même fichier : chaînes égales mais pas identiques avant l'interning
+    other = json.loads(json.dumps(data))
+    race = map_json_to_race("R1C1", data["R1C1"], "02_03_2024")
+    same_race = map_json_to_race("R1C1", other["R1C1"], "02_03_2024")
+    assert race.hippodrome.libelle_long is same_race.hippodrome.libelle_long
+    assert race.id is same_race.id
+
+    horse = map_json_to_horse("R1C1", 1, data["R1C1"]["horse_features"]["1"])
+    same_horse = map_json_to_horse("R1C1", 1, other["R1C1"]["horse_features"]["1"])
+    assert horse.features.driver is same_horse.features.driver
+    assert horse.features.entraineur is same_horse.features.entraineur
+
+    result = map_json_to_result("R1C1", data["R1C1"])
+    for entity in (race, race.hippodrome, horse, horse.features, result):
+        assert not hasattr(entity, "__dict__"), type(entity).__name__
+    assert intern_str(None) is None
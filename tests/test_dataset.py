@@ -0,0 +1,46 @@
+import os
+import json
+import shutil
+
+import numpy as np
+
+from src.data_access.mappers.common_mapper import diagnostics
+from src.models.dataset import DatasetBuilder
+
+
+def test_build_with_nulls_and_failed_day(raw_path, tmp_path):
+    raw = tmp_path / "raw"
+    shutil.copytree(raw_path, raw)
+    # Fichier jour tronqué : échoue sans empêcher le reste du build
+    (raw / "2024" / "03_03_2024.json").write_text('{"R1C1": {', encoding="utf-8")
+
+    builder = DatasetBuilder(str(raw), str(tmp_path / "dataset"), max_workers=2)
+    report = builder.build()
+    assert report.built == 1
+    assert list(report.failed) == ["2024/03_03_2024.json"]
+    assert os.path.exists(tmp_path / "dataset" / "manifest.json")
+
+    dataset = builder.load()
+    # Seule la course terminée R1C1 (4 partants) figure dans le dataset
+    assert dataset.X.shape[0] == 4
+    assert set(dataset.race_id) == {"R1C1"}
+    assert np.isnan(dataset.X[0, dataset.columns.index("age")])
+    assert dataset.gagnant.sum() == 1
+
+    # Le jour en échec est retenté, le jour construit n'est pas relu
+    report = builder.build()
+    assert (report.built, report.skipped, list(report.failed)) == (0, 1, ["2024/03_03_2024.json"])
+
+
+def test_worker_diagnostics_reach_parent(raw_path, tmp_path):
+    raw = tmp_path / "raw"
+    shutil.copytree(raw_path, raw)
+    day = json.loads((raw / "2024" / "02_03_2024.json").read_text(encoding="utf-8"))
+    day["R1C1"]["discipline"] = "INCONNUE"
+    (raw / "2024" / "03_03_2024.json").write_text(json.dumps(day), encoding="utf-8")
+
+    diagnostics.reset()
+    report = DatasetBuilder(str(raw), str(tmp_path / "dataset"), max_workers=2).build()
+    assert report.built == 2
+    assert diagnostics.counts()["discipline"] == {"INCONNUE": 1}
+    diagnostics.reset()
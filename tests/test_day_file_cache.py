@@ -0,0 +1,40 @@
+import os
+import tracemalloc
+
+from src.data_access.storage.day_file_cache import DayFileCache, estimated_size
+from src.data_access.storage.snapshot_log import load_day_file, load_day_file_with_format, write_json_atomic
+
+
+def test_budget_counts_decoded_size(day_file):
+    file_bytes = os.path.getsize(day_file)
+    _, indented = load_day_file_with_format(day_file)
+    size = estimated_size(file_bytes, indented)
+    assert size > file_bytes
+
+    tracemalloc.start()
+    data = load_day_file(day_file)
+    decoded, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert data and decoded <= 2 * size
+
+    cache = DayFileCache(max_bytes=size - 1)
+    cache.load(day_file)
+    assert cache.stats()["entries"] == 0
+
+    cache = DayFileCache(max_bytes=size)
+    cache.load(day_file)
+    assert cache.stats()["current_bytes"] == size
+
+
+def test_format_reported_by_loader(raw_copy):
+    day_file = os.path.join(raw_copy, "2024", "02_03_2024.json")
+    data, indented = load_day_file_with_format(day_file)
+    assert indented
+
+    # Fichier réécrit sans indentation : facteur compact, plus élevé pour la même taille
+    write_json_atomic(day_file, data)
+    packed, indented = load_day_file_with_format(day_file)
+    assert not indented and packed.keys() == data.keys()
+    file_bytes = os.path.getsize(day_file)
+    assert estimated_size(file_bytes, False) > estimated_size(file_bytes, True)
+    assert load_day_file_with_format(os.path.join(raw_copy, "absent.json")) == ({}, False)
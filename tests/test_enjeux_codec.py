@@ -0,0 +1,43 @@
+import copy
+
+from src.data_access.storage.enjeux_codec import (
+    is_packed, pack_bet_kind, pack_day, pack_enjeux, unpack_bet_kind, unpack_enjeux
+)
+from src.domain.entities.pool import decode_combination, encode_combination
+
+ENJEUX = {
+    "E_SIMPLE_GAGNANT": {
+        "1": {"1709386020000": 1200, "1709386320000": 1850},
+        "12": {"1709386320000": 300},  # absent du premier relevé
+    },
+    "E_TIERCE": {"3-7-12": {"1709386020000": 40}, "12-1-3": {"1709386020000": 15}},
+    "E_MULTI": {"mystere": {"1709386020000": 5}},  # combinaison non numérique : gardée telle quelle
+}
+
+
+def test_combination_round_trip():
+    for numbers in ([1], [3, 7, 12], [12, 1, 3], [20, 19, 18, 17, 16, 15, 14]):
+        assert decode_combination(encode_combination(numbers)) == numbers
+
+
+def test_bet_kind_round_trip():
+    packed = pack_bet_kind(ENJEUX["E_SIMPLE_GAGNANT"])
+    assert packed["timestamps"] == [1709386020000, 1709386320000]
+    assert packed["montants"] == [[1200, None], [1850, 300]]
+    assert unpack_bet_kind(packed) == ENJEUX["E_SIMPLE_GAGNANT"]
+    assert pack_bet_kind(ENJEUX["E_MULTI"]) is None
+
+
+def test_enjeux_round_trip():
+    packed = pack_enjeux(ENJEUX)
+    assert is_packed(packed["E_TIERCE"]) and not is_packed(packed["E_MULTI"])
+    assert unpack_enjeux(packed) == ENJEUX
+    # Déjà compact : inchangé
+    assert pack_enjeux(packed) == packed
+
+
+def test_pack_day_counts_new_packed_kinds():
+    data = {"R1C1": {"enjeux": copy.deepcopy(ENJEUX)}, "R1C2": {"rapports": {}}}
+    assert pack_day(data) == 2
+    assert pack_day(data) == 0
+    assert unpack_enjeux(data["R1C1"]["enjeux"]) == ENJEUX
@@ -0,0 +1,80 @@
+import copy
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.data_access.storage.feature_store import DAY_MS, FeatureStore
+from src.data_access.storage.snapshot_log import load_day_file
+
+SETTLE_MS = 30 * 60 * 1000
+
+
+@pytest.fixture
+def store(raw_copy, tmp_path):
+    store = FeatureStore(raw_copy, str(tmp_path / "features.sqlite"))
+    assert store.refresh() == 1
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def r1c1(day_file):
+    return load_day_file(day_file)["R1C1"]
+
+
+def _features(store, race_data, as_of):
+    """Features du partant n°1 (vainqueur de R1C1) pour la même course partant à as_of"""
+    race_data = copy.deepcopy(race_data)
+    race_data["heureDepart"] = as_of
+    numeros, matrix = store.race_features(race_data)
+    return dict(zip(store.feature_names(), matrix[numeros.index(1)]))
+
+
+def test_result_visible_only_after_start_plus_settle(store, r1c1):
+    start = r1c1["heureDepart"]
+    # La course elle-même, puis jusqu'à settle_minutes après son départ : résultat encore inconnu
+    for as_of in (start, start + SETTLE_MS - 1, start + SETTLE_MS):
+        features = _features(store, r1c1, as_of)
+        assert features["driver_total_courses"] == 0
+        assert np.isnan(features["driver_total_taux_victoire"])
+
+    features = _features(store, r1c1, start + SETTLE_MS + 1)
+    assert features["driver_total_courses"] == 1
+    assert features["driver_total_taux_victoire"] == 1
+    assert features["cheval_hippodrome_30j_taux_place"] == 1
+
+
+def test_windows_end_at_start_time(store, r1c1):
+    as_of = r1c1["heureDepart"] + SETTLE_MS + 31 * DAY_MS
+    features = _features(store, r1c1, as_of)
+    assert features["cheval_30j_courses"] == 0
+    assert features["cheval_365j_courses"] == 1
+    assert features["cheval_total_courses"] == 1
+
+
+def test_day_features_do_not_leak_same_day_results(store, day_file):
+    frame = store.day_features([day_file])
+    assert list(frame["race_id"]) == ["R1C1"] * 4 + ["R1C2"] * 4
+    # R1C2 part 30 minutes après R1C1 : son résultat n'est pas encore considéré comme connu
+    assert (frame["driver_total_courses"] == 0).all()
+    assert (frame["entraineur_total_courses"] == 0).all()
+
+
+def test_rewritten_file_replaces_its_events(store, raw_copy, r1c1):
+    day_file = os.path.join(raw_copy, "2024", "02_03_2024.json")
+    # Index en mémoire chargé avant la réécriture : mis à jour sans être relu
+    assert _features(store, r1c1, r1c1["heureDepart"] + DAY_MS)["driver_total_taux_victoire"] == 1
+    with open(day_file, encoding="utf-8") as f:
+        data = json.load(f)
+    data["R1C1"]["ordreArrivee"] = [[2], [1], [3], [4]]
+    with open(day_file, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.utime(day_file, ns=(0, os.stat(day_file).st_mtime_ns + 10**9))
+
+    assert store.refresh(2024) == 1
+    features = _features(store, r1c1, r1c1["heureDepart"] + DAY_MS)
+    assert features["driver_total_courses"] == 1
+    assert features["driver_total_taux_victoire"] == 0
+    assert store.refresh(2024) == 0
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from scripts.scraping import http_client
+from scripts.scraping.http_client import RateLimitedClient, TokenBucket, retry_after_delay
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Attentes entre tentatives, enregistrées au lieu d'être dormies"""
+    delays = []
+
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(http_client, "sleep", fake_sleep)
+    return delays
+
+
+def _get(responses, **kwargs):
+    """Un GET à travers un transport qui rejoue les réponses (ou exceptions) dans l'ordre"""
+    responses = list(responses)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def main():
+        transport = httpx.MockTransport(handler)
+        async with RateLimitedClient(rate=None, backoff=0.5, transport=transport, **kwargs) as client:
+            return await client.get("https://example.test/programme")
+
+    return asyncio.run(main()), calls
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    async def main():
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Rafale de 2 jetons puis 2 jetons à 20/s : au moins ~0,1 s
+    elapsed = asyncio.run(main())
+    assert 0.09 <= elapsed < 1
+
+
+def test_retry_uses_exponential_backoff(delays):
+    response, calls = _get([httpx.Response(500), httpx.Response(503), httpx.Response(200)])
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert delays == [0.5, 1.0]
+
+
+def test_retry_after_seconds_replaces_backoff(delays):
+    response, _ = _get([httpx.Response(429, headers={"Retry-After": "3"}), httpx.Response(200)])
+    assert response.status_code == 200
+    assert delays == [3.0]
+
+
+def test_retry_after_is_capped_and_ignored_outside_429_503(delays):
+    response, _ = _get([
+        httpx.Response(503, headers={"Retry-After": "3600"}),
+        httpx.Response(500, headers={"Retry-After": "7"}),
+        httpx.Response(200),
+    ], max_retry_after=10)
+    assert response.status_code == 200
+    assert delays == [10, 1.0]
+
+
+def test_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = retry_after_delay(httpx.Response(429, headers={"Retry-After": format_datetime(when, usegmt=True)}))
+    assert 25 <= delay <= 30
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+    assert retry_after_delay(httpx.Response(429, headers={"Retry-After": past})) == 0
+    assert retry_after_delay(httpx.Response(429, headers={"Retry-After": "demain"})) is None
+    assert retry_after_delay(httpx.Response(429)) is None
+
+
+def test_last_attempt_returns_response_or_raises(delays):
+    response, calls = _get([httpx.Response(503)] * 3, retries=2)
+    assert response.status_code == 503
+    assert len(calls) == 3
+
+    with pytest.raises(httpx.ConnectError):
+        _get([httpx.ConnectError("refus")] * 2, retries=1)
+    response, _ = _get([httpx.ConnectError("refus"), httpx.Response(200)], retries=1)
+    assert response.status_code == 200
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from scripts.benchmarks.pmu_stand_in import PMUStandIn, SyntheticProgram
+from scripts.scraping import live_poller
+from scripts.scraping.live_poller import DEFAULT_SCHEDULE, LivePoller, next_poll_delay, poll_day
+from scripts.scraping.scraper import get_day_filepath
+from src.data_access.storage.catalog import RaceCatalog
+
+DAY = date(2024, 3, 2)  # jour passé : départs donnés, résultats disponibles
+
+
+@pytest.fixture
+def stand_in():
+    with PMUStandIn(program=SyntheticProgram(meetings=1, races_per_meeting=3, runners=4)) as stand_in:
+        yield stand_in
+
+
+@pytest.mark.parametrize("seconds_to_off, delay", [
+    (3 * 60 * 60, 15 * 60),
+    (60 * 60 + 30, 30),  # jamais au-delà du seuil suivant
+    (20 * 60, 5 * 60),
+    (10 * 60, 60),
+    (6 * 60, 60),
+    (90, 15),
+    (30, 15),
+    (-120, 15),
+])
+def test_poll_delay_denser_near_the_off(seconds_to_off, delay):
+    assert next_poll_delay(seconds_to_off, DEFAULT_SCHEDULE) == delay
+
+
+def test_race_error_does_not_stop_the_others(stand_in, tmp_path, monkeypatch):
+    fetch = live_poller.fetch_finished_race
+    failures = []
+
+    async def flaky_fetch(client, program_url, race_input, race_output, timer=None):
+        if race_input["numOrdre"] == 2 and len(failures) < 2:
+            failures.append(race_input["numOrdre"])
+            raise ValueError("réponse invalide")
+        return await fetch(client, program_url, race_input, race_output, timer)
+
+    monkeypatch.setattr(live_poller, "fetch_finished_race", flaky_fetch)
+
+    async def main():
+        async with AsyncClient() as client:
+            poller = LivePoller(
+                client, str(tmp_path), snapshot_log=False, base_url=stand_in.base_url,
+                give_up_after=float("inf"), retry_delay=0.01,
+            )
+            await poller.run(DAY)
+            return poller
+
+    poller = asyncio.run(main())
+    assert failures == [2, 2]
+    # Un programme initial, puis une requête rapports-definitifs par course réussie
+    assert poller.requests == 1 + 3
+    with open(get_day_filepath(DAY, str(tmp_path)), encoding="utf-8") as f:
+        data = json.load(f)
+    assert all(race_data["ordreArrivee"] and race_data["rapportsDefinitifs"] for race_data in data.values())
+
+
+def test_catalog_is_opt_in(stand_in, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    base_folder = str(tmp_path / "raw")
+    asyncio.run(poll_day(DAY, base_folder, base_url=stand_in.base_url))
+    assert os.path.exists(get_day_filepath(DAY, os.path.join(base_folder, "2024")))
+    assert not os.path.exists(tmp_path / "data")
+
+    # Nouveau fichier jour : le catalogue est mis à jour dès l'écriture des métadonnées du jour
+    base_folder = str(tmp_path / "raw_catalog")
+    catalog_path = str(tmp_path / "catalog.sqlite")
+    asyncio.run(poll_day(DAY, base_folder, base_url=stand_in.base_url, catalog_path=catalog_path))
+    catalog = RaceCatalog(base_folder, catalog_path, auto_refresh=False)
+    assert [race_id for _, race_id in catalog.find_races(year=2024)] == ["R1C1", "R1C2", "R1C3"]
+    catalog.close()
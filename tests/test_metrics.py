@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from src.utils import metrics
+from src.utils.metrics import JsonLinesSink, MultiSink, NullSink, PrometheusFileSink
+
+
+@pytest.fixture(autouse=True)
+def restore_sink():
+    previous = metrics.get_sink()
+    yield
+    metrics.set_sink(previous)
+
+
+def test_prometheus_text_format(tmp_path):
+    path = tmp_path / "textfile" / "pmu.prom"
+    sink = PrometheusFileSink(str(path), buckets=(0.1, 1.0), metric_buckets={"runners": (5, 10)})
+    metrics.set_sink(sink)
+    metrics.increment("requests_total", endpoint="participants", status=200)
+    metrics.increment("requests_total", 2, endpoint="participants", status=200)
+    metrics.increment("requests_total", endpoint='pro"gramme')
+    for seconds in (0.1, 0.5, 3.0):  # 0.1 tombe dans le seau le="0.1"
+        metrics.timing("request_seconds", seconds, endpoint="participants")
+    metrics.observe("runners", 8)
+    metrics.flush()
+
+    assert path.read_text(encoding="utf-8") == "\n".join([
+        "# TYPE requests_total counter",
+        'requests_total{endpoint="participants",status="200"} 3',
+        'requests_total{endpoint="pro\\"gramme"} 1',
+        "# TYPE request_seconds histogram",
+        'request_seconds_bucket{endpoint="participants",le="0.1"} 1',
+        'request_seconds_bucket{endpoint="participants",le="1"} 2',
+        'request_seconds_bucket{endpoint="participants",le="+Inf"} 3',
+        'request_seconds_sum{endpoint="participants"} 3.6',
+        'request_seconds_count{endpoint="participants"} 3',
+        "# TYPE runners histogram",
+        'runners_bucket{le="5"} 0',
+        'runners_bucket{le="10"} 1',
+        'runners_bucket{le="+Inf"} 1',
+        "runners_sum 8",
+        "runners_count 1",
+    ]) + "\n"
+    assert [p.name for p in path.parent.iterdir()] == ["pmu.prom"]
+
+
+def test_json_lines_format(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    sink = JsonLinesSink(str(path), buffer_size=2)
+    metrics.set_sink(sink)
+    metrics.increment("day_file_cache_total", result="hit")
+    assert not path.exists()  # en tampon jusqu'à buffer_size lignes
+    metrics.observe("runners", 8)
+    with metrics.timer("parse_seconds", file="02_03_2024.json"):
+        pass
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(line["type"], line["name"], line["tags"]) for line in lines] == [
+        ("counter", "day_file_cache_total", {"result": "hit"}),
+        ("histogram", "runners", {}),
+        ("timing", "parse_seconds", {"file": "02_03_2024.json"}),
+    ]
+    assert lines[0]["value"] == 1 and lines[1]["value"] == 8 and lines[2]["value"] >= 0
+    assert all(set(line) == {"time", "type", "name", "value", "tags"} for line in lines)
+
+
+def test_configure_and_disabled_sink(tmp_path):
+    assert isinstance(metrics.configure(), NullSink) and not metrics.enabled()
+    # Désactivé : chronomètre partagé, aucune mesure
+    assert metrics.timer("a") is metrics.timer("b")
+
+    sink = metrics.configure(str(tmp_path / "m.prom"), str(tmp_path / "m.jsonl"))
+    assert isinstance(sink, MultiSink) and metrics.enabled()
+    metrics.increment("events_total")
+    sink.close()
+    assert "events_total 1" in (tmp_path / "m.prom").read_text(encoding="utf-8")
+    assert json.loads((tmp_path / "m.jsonl").read_text(encoding="utf-8"))["name"] == "events_total"
+    assert not MultiSink(NullSink()).enabled
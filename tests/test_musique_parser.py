@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.data_access.mappers.musique_parser import (
+    FEATURE_NAMES, NO_POSITION, UNKNOWN_DISCIPLINE, UNKNOWN_INCIDENT, UNPLACED_POSITION,
+    musique_features, musique_features_batch, musique_features_encoded, parse_musique
+)
+
+
+@pytest.mark.parametrize("musique, positions, disciplines, incidents", [
+    ("1a", [1], [0], [0]),
+    ("0m 9p", [UNPLACED_POSITION, 9], [1, 2], [0, 0]),
+    ("Da Am Th Rs", [NO_POSITION] * 4, [0, 1, 3, 4], [1, 2, 3, 4]),
+    # Place ou discipline inconnue, lettre de discipline absente
+    ("Xa 3z 4", [NO_POSITION, 3, 4], [0, UNKNOWN_DISCIPLINE, UNKNOWN_DISCIPLINE], [UNKNOWN_INCIDENT, 0, 0]),
+    ("", [], [], []),
+    (None, [], [], []),
+])
+def test_tokens(musique, positions, disciplines, incidents):
+    parsed = parse_musique(musique)
+    assert parsed.positions.tolist() == positions
+    assert parsed.disciplines.tolist() == disciplines
+    assert parsed.incidents.tolist() == incidents
+
+
+def test_year_separators():
+    parsed = parse_musique("2a 1a (23) 5a Da (22) 1a")
+    assert parsed.years == (23, 22)
+    assert parsed.seasons.tolist() == [0, 0, 1, 1, 2]
+    # Résultat partagé entre les appels : tableaux en lecture seule
+    assert parse_musique("2a 1a (23) 5a Da (22) 1a") is parsed
+    with pytest.raises(ValueError):
+        parsed.positions[0] = 3
+
+
+def test_features():
+    features = dict(zip(FEATURE_NAMES, musique_features("2a 1a (23) 0a Da 3a 1a")))
+    assert features == {
+        "musique_courses": 6,
+        "musique_courses_annee": 2,
+        "musique_derniere_position": 2,
+        "musique_position_moyenne": (2 + 1 + UNPLACED_POSITION + 3) / 4,  # 5 dernières, incident exclu
+        "musique_victoires": 1,
+        "musique_podiums": 3,
+        "musique_incidents": 1,
+    }
+    empty = musique_features("Da")
+    assert math.isnan(empty[2]) and math.isnan(empty[3]) and empty[0] == 1
+
+
+def test_batch_and_encoded_match_single():
+    musiques = ["1a 2a", None, "Da 4m", "1a 2a"]
+    batch = musique_features_batch(musiques)
+    dictionary = ["1a 2a", "Da 4m"]
+    encoded = musique_features_encoded(np.array([0, -1, 1, 0]), dictionary)
+    for i, musique in enumerate(musiques):
+        expected = musique_features(musique)
+        for j, name in enumerate(FEATURE_NAMES):
+            np.testing.assert_equal(batch[name][i], expected[j])
+            np.testing.assert_equal(encoded[name][i], expected[j])
+    assert all(len(values) == 0 for values in musique_features_batch([]).values())
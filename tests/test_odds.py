@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.data_access.mappers.horse_mapper import map_json_to_odds_panel
+from src.data_access.storage.snapshot_log import load_day_file
+from src.domain.entities.odds import OddsPanel, OddsSeries
+
+ODDS = {"3000": 5.0, "1000": 4.0, "2000": 8.0}  # relevés dans le désordre
+
+
+def test_series_reads_like_the_json_dict():
+    series = OddsSeries.from_dict(ODDS)
+    assert list(series) == ["1000", "2000", "3000"]
+    assert series["2000"] == 8.0 and len(series) == 3
+    assert series.to_dict() == {"1000": 4.0, "2000": 8.0, "3000": 5.0}
+    assert series == OddsSeries.from_dict(series.to_dict())
+    assert dict(series) == {"1000": 4.0, "2000": 8.0, "3000": 5.0}
+    assert "1500" not in series
+
+
+def test_series_queries():
+    series = OddsSeries.from_dict(ODDS)
+    # Dernière cote connue : NaN avant le premier relevé, relevé compris à son instant
+    assert math.isnan(series.as_of(999))
+    assert series.as_of(1000) == 4.0 and series.as_of(2999) == 8.0 and series.as_of(10**12) == 5.0
+    np.testing.assert_array_equal(series.resample([1500, 2500, 3500]), [4.0, 8.0, 5.0])
+    assert series.last() == 5.0
+    assert series.drift(1000, 2000) == math.log(2)
+    assert series.volatility() == pytest.approx(np.std([math.log(2), math.log(5 / 8)]))
+    empty = OddsSeries.from_dict(None)
+    assert math.isnan(empty.as_of(1000)) and math.isnan(empty.last()) and math.isnan(empty.volatility())
+
+
+def test_panel_matches_series(day_file):
+    data = load_day_file(day_file)
+    panel = map_json_to_odds_panel(data.items())
+    assert len(panel) == 8 and panel.counts().tolist() == [2] * 8
+
+    series = [OddsSeries.from_dict(data[race_id]["rapports"][str(numero)])
+              for race_id, numero in zip(panel.race_ids, panel.numeros)]
+    times = [1709386020000, 1709386320000, 1709388000000]
+    expected = np.array([[s.as_of(t) for t in times] for s in series])
+    np.testing.assert_array_equal(panel.resample(times), expected)
+    np.testing.assert_array_equal(panel.last(), [s.last() for s in series])
+    np.testing.assert_array_equal(panel.as_of(1709386320000), expected[:, 1])
+
+    # Grille relative à l'heure de départ de chaque course : cote à H-5 minutes
+    minus_5 = panel.resample([-5 * 60 * 1000], reference=panel.heures_depart)[:, 0]
+    np.testing.assert_array_equal(minus_5, [s.as_of(t - 300000) for s, t in zip(series, panel.heures_depart)])
+
+
+def test_panel_runner_without_odds():
+    panel = OddsPanel.from_series(["R1C1"] * 3, [1, 2, 3], [
+        OddsSeries.from_dict(ODDS), OddsSeries.from_dict({}), OddsSeries.from_dict({"1500": 2.0, "2500": 4.0}),
+    ])
+    np.testing.assert_array_equal(panel.as_of(2000), [8.0, np.nan, 2.0])
+    np.testing.assert_array_equal(panel.last(), [5.0, np.nan, 4.0])
+    np.testing.assert_allclose(panel.drift(1000, 3000), [math.log(5 / 4), np.nan, np.nan])
+    np.testing.assert_allclose(panel.volatility(), [OddsSeries.from_dict(ODDS).volatility(), np.nan, 0.0])
+    assert panel.series(2) == OddsSeries.from_dict({"2500": 4.0, "1500": 2.0})
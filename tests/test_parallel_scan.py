@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import pytest
+
+from src.data_access.repositories import HorseRepository, RaceRepository, ResultRepository
+from src.data_access.storage.day_file_cache import DayFileCache
+
+DAYS = {2023: ["05_01_2023", "10_12_2023"], 2024: ["02_03_2024", "09_03_2024", "16_03_2024"]}
+
+
+@pytest.fixture
+def archive(day_file, tmp_path):
+    """Même fichier jour copié sur plusieurs dates de deux années"""
+    base_path = tmp_path / "raw"
+    for year, days in DAYS.items():
+        os.makedirs(base_path / str(year))
+        for day in days:
+            shutil.copy(day_file, base_path / str(year) / f"{day}.json")
+    return str(base_path)
+
+
+def _both(repository_class, archive):
+    """Scan séquentiel, puis dans un pool de deux processus (dès le premier fichier)"""
+    return (
+        repository_class(archive, cache=DayFileCache()),
+        repository_class(archive, cache=DayFileCache(), parallel_workers=2, parallel_min_files=1),
+    )
+
+
+def test_parallel_scan_matches_serial(archive):
+    serial, parallel = _both(RaceRepository, archive)
+    races = serial.get_races_by_hippodrome("H31")
+    expected_days = [day for days in DAYS.values() for day in days for _ in ("R1C1", "R1C2")]
+    assert [race.date.strftime("%d_%m_%Y") for race in races] == expected_days
+    assert parallel.get_races_by_hippodrome("H31") == races
+    assert parallel.get_races_by_distance_range(3000, 4000) == serial.get_races_by_distance_range(3000, 4000)
+    assert parallel.get_all_hippodromes() == serial.get_all_hippodromes() == ["H31"]
+    # Les processus lisent les fichiers eux-mêmes, sans passer par le cache du parent
+    assert parallel.cache.stats()["misses"] == 0 and serial.cache.stats()["misses"] > 0
+
+    serial, parallel = _both(HorseRepository, archive)
+    for year in DAYS:
+        assert parallel.get_horses_by_trainer("ENTRAINEUR 153", year) == \
+            serial.get_horses_by_trainer("ENTRAINEUR 153", year)
+
+    serial, parallel = _both(ResultRepository, archive)
+    assert parallel.get_placed_horses(2024) == serial.get_placed_horses(2024)
+    assert parallel.get_winning_horses(2023) == serial.get_winning_horses(2023) == [1, 1]
@@ -0,0 +1,110 @@
+import os
+import json
+import shutil
+import http.client
+from datetime import date
+from threading import Thread
+
+import pytest
+
+from src.data_access.storage.snapshot_log import append_snapshot, write_json_atomic
+from src.models.prediction_service import ImpliedOddsModel, PredictionService, Predictor, make_server
+
+RACE_DATE = date(2024, 3, 2)
+
+
+def _service(raw_copy, predictor=None) -> PredictionService:
+    return PredictionService(predictor or Predictor(ImpliedOddsModel()), raw_copy, RACE_DATE, refresh_interval=0)
+
+
+def _cote(prediction, numero):
+    return next(p["cote"] for p in prediction["partants"] if p["numero"] == numero)
+
+
+def test_new_segment_recomputes_only_its_race(raw_copy):
+    service = _service(raw_copy)
+    assert service.preload() == 2
+    state = service.state()
+    r1c1 = state.race_features("R1C1")
+
+    day_file = service._get_file_path(RACE_DATE)
+    append_snapshot(day_file, {"R1C2": {"rapports": {"4": {"1709388300000": 5.5}}}})
+    prediction = service.predict("R1C2")
+    assert _cote(prediction, 4) == 5.5
+    assert state.race_features("R1C1") is r1c1
+    assert (state.full_loads, state.merged_segments) == (1, 1)
+
+
+def test_rewritten_file_reloads(raw_copy):
+    service = _service(raw_copy)
+    service.preload()
+    day_file = service._get_file_path(RACE_DATE)
+    with open(day_file, encoding="utf-8") as f:
+        data = json.load(f)
+    data["R1C2"]["rapports"]["4"]["1709388300000"] = 6.5
+    write_json_atomic(day_file, data)
+    stat = os.stat(day_file)
+    os.utime(day_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert _cote(service.predict("R1C2"), 4) == 6.5
+    assert service.state().full_loads == 2
+
+
+def test_day_change_during_prediction(raw_copy):
+    next_day = date(2024, 3, 3)
+    shutil.copy(os.path.join(raw_copy, "2024", "02_03_2024.json"), os.path.join(raw_copy, "2024", "03_03_2024.json"))
+
+    class DayChangingPredictor(Predictor):
+        def predict(self, features):
+            # Changement de jour pendant le calcul de la prédiction de la veille
+            if service.race_date == RACE_DATE:
+                service.race_date = next_day
+                service.state()
+            return super().predict(features)
+
+    service = _service(raw_copy, DayChangingPredictor(ImpliedOddsModel()))
+    assert service.predict("R1C1")["date"] == RACE_DATE.isoformat()
+    assert service.predict("R1C1")["date"] == next_day.isoformat()
+
+
+@pytest.fixture
+def server_url(raw_copy):
+    servers = []
+
+    def start(service):
+        server = make_server(service, port=0)
+        Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server.server_address[:2]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(address, path):
+    connection = http.client.HTTPConnection(*address, timeout=5)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    connection.close()
+    return response.status, body
+
+
+def test_http_paths(raw_copy, server_url):
+    address = server_url(_service(raw_copy))
+    status, body = _get(address, "/races/R1C1")
+    assert status == 200 and body["race_id"] == "R1C1"
+    assert _get(address, "/races/R9C9") == (404, {"erreur": "course inconnue R9C9"})
+    assert _get(address, "/inconnu")[0] == 404
+
+
+def test_http_model_error(raw_copy, server_url):
+    class BrokenModel(ImpliedOddsModel):
+        def predict_proba(self, X):
+            raise ValueError("modèle cassé")
+
+    address = server_url(_service(raw_copy, Predictor(BrokenModel())))
+    assert _get(address, "/races/R1C1") == (500, {"erreur": "modèle cassé"})
+    assert _get(address, "/health")[0] == 200
@@ -0,0 +1,90 @@
+import json
+import os
+import pickle
+from datetime import date
+
+import pytest
+
+from src.data_access.repositories import HorseRepository, RaceFilter, RaceRepository, ResultRepository
+from src.data_access.repositories import base_repository
+from src.data_access.storage.catalog import RaceCatalog
+
+START, END = date(2024, 3, 1), date(2024, 3, 31)
+
+FILTERS = [
+    RaceFilter(),
+    RaceFilter(hippodrome_code="H31"),
+    RaceFilter(hippodrome_code="H99"),
+    RaceFilter(min_distance=3000, max_distance=4000),
+    RaceFilter(max_distance=2000),
+    RaceFilter(hippodrome_code="H31", discipline="ATTELE"),
+    RaceFilter(hippodrome_code="INCONNU"),
+]
+
+
+@pytest.fixture
+def archive(raw_copy):
+    """Archive de deux jours : le fichier de test, et le lendemain sur un autre hippodrome"""
+    with open(os.path.join(raw_copy, "2024", "02_03_2024.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    for race_data in data.values():
+        race_data["hippodrome"] = {**race_data["hippodrome"], "code": "H99"}
+    with open(os.path.join(raw_copy, "2024", "03_03_2024.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return raw_copy
+
+
+@pytest.fixture
+def catalog(archive, tmp_path):
+    catalog = RaceCatalog(archive, str(tmp_path / "catalog.sqlite"))
+    catalog.refresh()
+    yield catalog
+    catalog.close()
+
+
+def _runs(archive, catalog, where):
+    """Résultats des trois générateurs, sans puis avec le catalogue pour restreindre les fichiers lus"""
+    runs = []
+    for repository_catalog in (None, catalog):
+        races = RaceRepository(archive, catalog=repository_catalog)
+        horses = HorseRepository(archive, catalog=repository_catalog)
+        results = ResultRepository(archive, catalog=repository_catalog)
+        runs.append((
+            [(race.date, race.id) for race in races.iter_races(START, END, where)],
+            [(race_date, horse.race_id, horse.numero) for race_date, horse in horses.iter_horses(START, END, where)],
+            [(race_date, result.race_id) for race_date, result in results.iter_results(START, END, where)],
+        ))
+    return runs
+
+
+@pytest.mark.parametrize("race_filter", FILTERS, ids=repr)
+def test_pushdown_matches_plain_filter(archive, catalog, race_filter):
+    without_catalog, with_catalog = _runs(archive, catalog, race_filter)
+    assert with_catalog == without_catalog
+
+
+def test_pushdown_skips_files(archive, catalog, monkeypatch):
+    loaded = []
+    load = base_repository.load_day_file
+    monkeypatch.setattr(base_repository, "load_day_file",
+                        lambda path: loaded.append(os.path.basename(path)) or load(path))
+
+    races = list(RaceRepository(archive, catalog=catalog).iter_races(START, END, RaceFilter(hippodrome_code="H99")))
+    assert [race.id for race in races] == ["R1C1", "R1C2"]
+    assert loaded == ["03_03_2024.json"]
+
+    loaded.clear()
+    assert list(RaceRepository(archive).iter_races(START, END, RaceFilter(hippodrome_code="H99"))) == races
+    assert loaded == ["02_03_2024.json", "03_03_2024.json"]
+
+
+def test_filter_on_raw_json():
+    race = {"hippodrome": {"code": "H31"}, "distance": 2700, "discipline": "ATTELE"}
+    assert RaceFilter(hippodrome_code="H31", min_distance=2700, max_distance=2700)(race)
+    assert not RaceFilter(discipline="MONTE")(race)
+    # Distance nulle : exclue des plages, retenue sans plage ; distance absente : 0
+    assert not RaceFilter(max_distance=5000)({**race, "distance": None})
+    assert RaceFilter(hippodrome_code="H31")({**race, "distance": None})
+    assert RaceFilter(max_distance=0)({"hippodrome": None})
+    # Envoyé tel quel aux processus de conversion
+    assert pickle.loads(pickle.dumps(RaceFilter(min_distance=2000))) == RaceFilter(min_distance=2000)
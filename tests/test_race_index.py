@@ -0,0 +1,56 @@
+import os
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from src.data_access.storage import race_index
+from src.data_access.storage.race_index import get_index_path, load_race, load_race_index
+
+
+def _copy_day(day_file, tmp_path) -> str:
+    path = str(tmp_path / os.path.basename(day_file))
+    shutil.copy(day_file, path)
+    return path
+
+
+def test_concurrent_index_builds(day_file, tmp_path):
+    path = _copy_day(day_file, tmp_path)
+    expected = json.loads(open(path, encoding="utf-8").read())["R1C2"]["distance"]
+    for _ in range(10):
+        try:
+            os.remove(get_index_path(path))
+        except FileNotFoundError:
+            pass
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            races = list(executor.map(lambda _: load_race(path, "R1C2", ["distance"]), range(16)))
+        assert all(race == {"distance": expected} for race in races)
+    assert [f for f in os.listdir(tmp_path) if f.endswith(".tmp")] == []
+
+
+def test_stale_index_rebuilt(day_file, tmp_path):
+    path = _copy_day(day_file, tmp_path)
+    assert load_race(path, "R1C2", ["distance"])["distance"] is not None
+
+    data = json.loads(open(path, encoding="utf-8").read())
+    data["R1C2"]["distance"] = 1234
+    data["R1C3"] = {"distance": 2100}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert load_race(path, "R1C2", ["distance"]) == {"distance": 1234}
+    assert load_race(path, "R1C3") == {"distance": 2100}
+
+
+def test_read_only_archive(day_file, tmp_path, monkeypatch):
+    path = _copy_day(day_file, tmp_path)
+
+    def read_only(*args, **kwargs):
+        raise PermissionError(13, "Permission denied")
+
+    # Un répertoire en lecture seule ne bloque pas root : l'écriture est refusée directement
+    monkeypatch.setattr(race_index, "write_json_atomic", read_only)
+    assert load_race_index(path) is not None
+    assert load_race(path, "R1C1", ["discipline"]) == {"discipline": "ATTELE"}
+    assert not os.path.exists(get_index_path(path))
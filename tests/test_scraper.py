@@ -0,0 +1,50 @@
+import asyncio
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+
+from scripts.benchmarks.pmu_stand_in import PMUStandIn, SyntheticProgram
+from scripts.scraping.scraper import EndpointTimer, get_day_filepath, scrap_day
+
+DAY = date(2024, 3, 2)  # jour passé : courses terminées
+LATENCY = 0.1
+
+
+@pytest.fixture
+def stand_in():
+    with PMUStandIn(latency=LATENCY, program=SyntheticProgram(meetings=1, races_per_meeting=3, runners=4)) as stand_in:
+        yield stand_in
+
+
+def test_all_endpoints_fetched_concurrently(stand_in, tmp_path):
+    timer = EndpointTimer()
+    start = time.perf_counter()
+    asyncio.run(scrap_day(DAY, str(tmp_path), timer=timer, base_url=stand_in.base_url))
+    elapsed = time.perf_counter() - start
+
+    counts = {endpoint: stats["count"] for endpoint, stats in timer.summary().items()}
+    assert counts == {"programme": 1, "participants": 3, "combinaisons": 3, "rapports-definitifs": 3}
+    # Programme puis les 9 requêtes des courses en même temps : deux latences, pas dix
+    assert elapsed < 5 * LATENCY
+
+    with open(get_day_filepath(DAY, str(tmp_path)), encoding="utf-8") as f:
+        data = json.load(f)
+    assert list(data) == ["R1C1", "R1C2", "R1C3"]
+    for race_data in data.values():
+        assert len(race_data["horse_features"]) == 4
+        assert set(race_data["rapports"]) == set(race_data["horse_features"])
+        assert race_data["ordreArrivee"] and race_data["rapportsDefinitifs"]
+
+
+def test_finished_day_not_fetched_again(stand_in, tmp_path):
+    asyncio.run(scrap_day(DAY, str(tmp_path), base_url=stand_in.base_url))
+    filepath = get_day_filepath(DAY, str(tmp_path))
+    mtime = os.stat(filepath).st_mtime_ns
+    requests = stand_in.requests
+
+    asyncio.run(scrap_day(DAY, str(tmp_path), base_url=stand_in.base_url))
+    assert stand_in.requests == requests + 1  # programme seulement
+    assert os.stat(filepath).st_mtime_ns == mtime
@@ -0,0 +1,57 @@
+import os
+
+from src.data_access.storage.enjeux_codec import is_packed
+from src.data_access.storage.snapshot_log import (
+    append_snapshot, compact_day, day_file_signature, get_log_dir, list_segments, load_day_file
+)
+
+TS_1, TS_2 = "1709386500000", "1709386800000"
+
+
+def _day_file(raw_copy):
+    return os.path.join(raw_copy, "2024", "02_03_2024.json")
+
+
+def test_segments_merged_in_order(raw_copy):
+    day_file = _day_file(raw_copy)
+    before = load_day_file(day_file)
+    signature = day_file_signature(day_file)
+
+    assert append_snapshot(day_file, {"R1C1": {"rapports": {}, "enjeux": {}}}) is None
+    append_snapshot(day_file, {
+        "R1C1": {"rapports": {"1": {TS_1: 50.1}}, "enjeux": {"E_SIMPLE_GAGNANT": {"1": {TS_1: 1000}}}},
+        "R9C9": {"rapports": {"1": {TS_1: 3.0}}},  # course absente du fichier jour : ignorée
+    })
+    append_snapshot(day_file, {"R1C1": {"rapports": {"1": {TS_1: 52.0, TS_2: 55.5}}}})
+    assert len(list_segments(day_file)) == 2
+    assert day_file_signature(day_file) != signature
+
+    data = load_day_file(day_file)
+    assert "R9C9" not in data
+    # Le segment le plus récent l'emporte, les relevés précédents du fichier jour sont gardés
+    assert data["R1C1"]["rapports"]["1"] == {**before["R1C1"]["rapports"]["1"], TS_1: 52.0, TS_2: 55.5}
+    assert data["R1C1"]["enjeux"] == {"E_SIMPLE_GAGNANT": {"1": {TS_1: 1000}}}
+    assert data["R1C2"] == before["R1C2"]
+
+
+def test_compaction_round_trip(raw_copy):
+    day_file = _day_file(raw_copy)
+    append_snapshot(day_file, {"R1C2": {"rapports": {"2": {TS_1: 30.0}}}})
+    append_snapshot(day_file, {"R1C2": {"enjeux": {"E_COUPLE_GAGNANT": {"2-4": {TS_1: 300}, "1-2": {TS_2: 120}}}}})
+    merged = load_day_file(day_file)
+
+    assert compact_day(day_file) == 2
+    assert list_segments(day_file) == [] and not os.path.exists(get_log_dir(day_file))
+    assert load_day_file(day_file) == merged
+    assert compact_day(day_file) == 0
+
+    # Enjeux compactés dans le fichier, puis un nouveau segment au format du scraper
+    assert compact_day(day_file, pack=True) == 0
+    with open(day_file, encoding="utf-8") as f:
+        assert f.read(2) != "{\n"
+    assert load_day_file(day_file)["R1C2"]["rapports"] == merged["R1C2"]["rapports"]
+    assert is_packed(load_day_file(day_file)["R1C2"]["enjeux"]["E_COUPLE_GAGNANT"])
+
+    append_snapshot(day_file, {"R1C2": {"enjeux": {"E_COUPLE_GAGNANT": {"2-4": {TS_2: 450}}}}})
+    enjeux = load_day_file(day_file)["R1C2"]["enjeux"]["E_COUPLE_GAGNANT"]
+    assert enjeux == {"1-2": {TS_2: 120}, "2-4": {TS_1: 300, TS_2: 450}}